@@ -1,156 +1,51 @@
 import functions_framework
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
 from datetime import datetime
-# Google Drive連携に必要
-from google.auth import default as google_auth_default
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-import os
-import gspread
-import platform
 import hashlib
-from google.cloud import storage
-import time
-from bs4 import BeautifulSoup, Comment
-import requests
+import importlib
 import json
-from PIL import Image
-import google.generativeai as genai
-from google.cloud import aiplatform
 from dotenv import load_dotenv
 import os
 import difflib
-from google.cloud import secretmanager
-import google.auth
-import google.auth.transport.requests
-from vertexai.generative_models import GenerativeModel
-
-# providersから新しいスクリーンショット用関数をインポート
-from providers import (
-    alibaba_handler,
-    anthropic_handler,
-    anyscale_handler,
-    aws_cloudprice,
-    azure_handler,
-    baseten_handler,
-    civo_handler,
-    coreweave_handler,
-    cudocompute_handler,
-    datacrunch_handler,
-    fireworks_handler,
-    fluidstack_handler,
-    genesiscloud_handler,
-    google_handler,
-    groq_handler,
-    hyperstack_handler,
-    koyeb_handler,
-    lambda_labs_handler,
-    liquidweb_handler,
-    modal_handler,
-    neevcloud_handler,
-    oblivus_handler,
-    openai_handler,
-    oracle_handler,
-    runpod_handler,
-    sakura_internet_handler,
-    sambanova_handler,
-    scaleway_handler,
-    seeweb_handler,
-    sesterce_handler,
-    soroban_highreso_handler,
-    tencentcloud_handler,
-    together_handler,
-    vast_ai_handler
-)
-
-load_dotenv()
-
-PROJECT_ID = 'device-streaming-6eaa1c05'
-
-def summarize_with_gemini(title: str, description: str, project_id: str, location: str, env: str, credentials=None) -> str:
-    """Gemini APIを使って、ブログタイトルから内容の要約を生成する"""
-    print(f"  -> Summarizing title with Gemini: '{title}'")
-    prompt = (
-        "あなたはIT分野の専門家です。以下のブログ記事のタイトルと概要から、"
-        "どのような内容の記事か、技術者向けに簡潔な日本語で3行の要約を生成してください。\n\n"
-        f"【タイトル】\n{title}\n\n"
-        f"【概要】\n{description}"
-    )
 
-    try:
-        # GCP環境（Cloud Runなど）で実行されているか判定
-        if env == 'gcp':
-            print("  -> Using Vertex AI (production mode)")
-            aiplatform.init(project=project_id, location=location, credentials=credentials)
-            model = GenerativeModel("gemini-2.5-flash")
-            response = model.generate_content(prompt)
-            return response.text.strip()
-        else:
-            print("  -> Using Google AI Studio API Key (local mode)")
-            # ローカル実行時は環境変数からAPIキーを読み込む
-            api_key = os.getenv('GEMINI_API_KEY')
-            if not api_key:
-                return "Error: GEMINI_API_KEY environment variable not set for local execution."
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel("gemini-1.5-flash-latest")
-            response = model.generate_content(prompt)
-            return response.text.strip()
+from utils import browser_profile, capture_policy, drive_folders, exchange_rates, lazy_import, price_history, price_record, secret_store, summarizer
 
-    except Exception as e:
-        print(f"  -> Gemini API call failed: {e}")
-        return f"Error summarizing title: {e}"
+# 重いSDKやモジュールは最初に使うときに読み込む（Cloud Runのコールドスタートを短くするため）
+# Google Drive連携に必要
+google_auth = lazy_import.lazy_module("google.auth")
+discovery = lazy_import.lazy_module("googleapiclient.discovery")
+gspread = lazy_import.lazy_module("gspread")
+requests = lazy_import.lazy_module("requests")
+baseline_store = lazy_import.lazy_module("utils.baseline_store")
+browser_pool = lazy_import.lazy_module("utils.browser_pool")
+drive_upload = lazy_import.lazy_module("utils.drive_upload")
+html_parse = lazy_import.lazy_module("utils.html_parse")
+page_wait = lazy_import.lazy_module("utils.page_wait")
+screenshot = lazy_import.lazy_module("utils.screenshot")
+screenshot_dedup = lazy_import.lazy_module("utils.screenshot_dedup")
+sheet_writer = lazy_import.lazy_module("utils.sheet_writer")
+
+# providers の各ハンドラ（実行する順）。モジュールは実行するときに読み込む
+HANDLER_MODULES = [
+    "alibaba_handler", "koyeb_handler", "civo_handler", "runpod_handler", "coreweave_handler", "cudocompute_handler", "lambda_labs_handler",
+    "neevcloud_handler", "oblivus_handler", "scaleway_handler", "seeweb_handler", "soroban_highreso_handler", "groq_handler", "openai_handler",
+    "fireworks_handler", "anyscale_handler", "fluidstack_handler", "genesiscloud_handler", "hyperstack_handler", "liquidweb_handler",
+    "modal_handler", "vast_ai_handler", "datacrunch_handler", "sakura_internet_handler", "sesterce_handler", "anthropic_handler", "aws_cloudprice",
+    "azure_handler", "baseten_handler", "google_handler", "oracle_handler", "sambanova_handler", "tencentcloud_handler", "together_handler"
+]
+
+def load_handlers(names=None):
+    """providers からハンドラのモジュールを読み込む。names を省略するとすべて"""
+    handlers = []
+    for name in names or HANDLER_MODULES:
+        try:
+            handlers.append(importlib.import_module(f"providers.{name}"))
+        except Exception as e:
+            print(f"ERROR: Failed to import handler {name}: {e}")
+    return handlers
 
-def take_scrolling_screenshot(driver, filepath):
-    """
-    ページをスクロールしながら複数のスクリーンショットを撮影し、1枚の画像に結合する。
-    """
-    print("  -> Taking scrolling screenshot...")
-    try:
-        driver.set_window_size(1920, 800) # まずは標準的なサイズに
-        time.sleep(1)
-        
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        viewport_height = driver.execute_script("return window.innerHeight")
-        
-        # 結合用の元となる空の画像を作成
-        stitched_image = Image.new('RGB', (1920, total_height))
-        
-        scroll_position = 0
-        while scroll_position < total_height:
-            driver.execute_script(f"window.scrollTo(0, {scroll_position});")
-            time.sleep(0.5) # スクロール後の描画を待つ
-            
-            # 一時ファイルとしてスクリーンショットを撮影
-            temp_screenshot_path = os.path.join(os.path.dirname(filepath), "temp_screenshot.png")
-            driver.save_screenshot(temp_screenshot_path)
-            
-            screenshot_part = Image.open(temp_screenshot_path)
-            
-            # 撮影した部分を結合用画像に貼り付け
-            stitched_image.paste(screenshot_part, (0, scroll_position))
-            
-            scroll_position += viewport_height
+load_dotenv()
 
-        # 結合した画像を保存
-        stitched_image.save(filepath)
-        print(f"  -> Scrolling screenshot saved to: {filepath}")
-        
-        # 一時ファイルを削除
-        if os.path.exists(temp_screenshot_path):
-            os.remove(temp_screenshot_path)
-            
-        return True
-    except Exception as e:
-        print(f"  -> Failed to take scrolling screenshot: {e}")
-        # 失敗した場合は、見える範囲だけでも撮影しておく
-        driver.save_screenshot(filepath)
-        return False
+PROJECT_ID = 'device-streaming-6eaa1c05'
 
 def execute_pre_action(driver, action_name):
     """
@@ -158,56 +53,81 @@ def execute_pre_action(driver, action_name):
     """
     print(f"  -> Executing pre-action: {action_name}")
     if action_name == "click_cudo_cookie_decline":
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
         try:
             wait = WebDriverWait(driver, 10)
             decline_button = wait.until(
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Decline optional cookies')]"))
             )
             decline_button.click()
-            time.sleep(2) # ポップアップが消えるのを待つ
+            page_wait.wait_for_dom_quiet(driver, timeout=2) # ポップアップが消えるのを待つ
             print("  -> Successfully clicked Cudo cookie decline button.")
         except TimeoutException:
             print("  -> Cudo cookie pop-up not found. Proceeding anyway.")
 
+def _get_ready_condition(page):
+    """
+    監視ターゲットのページ読み込み完了条件を返す。
+    "wait" が指定されていればそれを使い、なければ比較に使うセレクタの出現を待つ。
+    """
+    if "wait" in page:
+        return page["wait"]
+    selector = page.get("selector") or page.get("selectors", {}).get("title")
+    return {"selector": selector} if selector else {}
+
 # ===============================================================
 # Webサイト変更監視用ターゲット (JSONファイルから読み込み)
 # ===============================================================
-try:
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    json_path = os.path.join(script_dir, 'monitoring_targets.json')
-    
-    with open(json_path, 'r', encoding='utf-8') as f:
-        MONITORING_TARGETS = json.load(f)
-    print("Successfully loaded monitoring targets from monitoring_targets.json")
-
-except FileNotFoundError:
-    print("WARNING: monitoring_targets.json not found. Change detection will be skipped.")
-    MONITORING_TARGETS = {}
-except Exception as e:
-    print(f"ERROR: Failed to load monitoring_targets.json: {e}")
-    MONITORING_TARGETS = {}
-# ===============================================================
-
-def get_secret(project_id, secret_id, version_id="latest"):
-    """Secret Managerからシークレットの値を取得する"""
+MONITORING_TARGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'monitoring_targets.json')
+_monitoring_targets = None
+
+def get_monitoring_targets():
+    """監視対象を monitoring_targets.json から読み込む（最初に呼ばれたときに1度だけ）"""
+    global _monitoring_targets
+    if _monitoring_targets is not None:
+        return _monitoring_targets
     try:
-        client = secretmanager.SecretManagerServiceClient()
-        name = f"projects/{project_id}/secrets/{secret_id}/versions/{version_id}"
-        response = client.access_secret_version(request={"name": name})
-        return response.payload.data.decode("UTF-8")
+        with open(MONITORING_TARGETS_PATH, 'r', encoding='utf-8') as f:
+            _monitoring_targets = json.load(f)
+        print("Successfully loaded monitoring targets from monitoring_targets.json")
+
+    except FileNotFoundError:
+        print("WARNING: monitoring_targets.json not found. Change detection will be skipped.")
+        _monitoring_targets = {}
     except Exception as e:
-        print(f"  -> ERROR: Failed to access secret: {secret_id}. Reason: {e}")
-        # ローカル実行時など、フォールバックとして環境変数を試す
-        fallback = os.getenv(secret_id.upper())
-        if fallback:
-            print(f"  -> INFO: Using fallback environment variable for {secret_id.upper()}")
-            return fallback
-        raise e
+        print(f"ERROR: Failed to load monitoring_targets.json: {e}")
+        _monitoring_targets = {}
+    return _monitoring_targets
+
+MONITORING_BUCKET_NAME = "gcs-bucket-for-html" # 監視対象ページの前回の状態を保存するバケット
+LOCAL_MONITORING_PATH = os.path.join(os.getcwd(), "tmp_local_test") # ローカル検証用の保存先
+# ===============================================================
+
+def _load_monitoring_page(driver, page):
+    """監視対象ページを開き、準備ができるまで待ってから事前アクションを実行する"""
+    driver.get(page['url'])
+    page_wait.wait_for_page_ready(driver, **_get_ready_condition(page))
+
+    if pre_action := page.get("pre_action"):
+        execute_pre_action(driver, pre_action)
+
+def _capture_with_full_profile(driver, page, capture):
+    """
+    軽量プロファイルで読み込んだページは画像やフォントが欠けているため、
+    通常のプロファイルで読み込み直してから capture(driver) で撮影する。
+    """
+    with browser_profile.full_profile(driver) as was_lightweight:
+        if was_lightweight:
+            _load_monitoring_page(driver, page)
+        return capture(driver)
 
 def send_slack_notification(message, project_id):
     """Secret ManagerからWebhook URLを取得し、Slackに通知を送る"""
     try:
-        webhook_url = get_secret(project_id, "SLACK_WEBHOOK_URL")
+        webhook_url = secret_store.get_secret(project_id, "SLACK_WEBHOOK_URL")
 
         # Slackに送信するメッセージのペイロードを作成
         payload = {"text": message}
@@ -220,56 +140,43 @@ def send_slack_notification(message, project_id):
     except Exception as e:
         print(f"Failed to send Slack notification: {e}")
 
-def upload_monitoring_screenshots(drive_service, local_files, parent_folder_id):
-    """監視用スクリーンショットをプラットフォーム別のフォルダにアップロードする"""
+# true のとき、監視用スクリーンショットを /tmp に書き出さずメモリ上のPNGのままアップロードする
+STREAM_SCREENSHOTS = os.environ.get("STREAM_SCREENSHOTS", "false").lower() in ("1", "true", "yes")
+
+def _capture_monitoring_screenshot(driver, output_dir, filename):
+    """監視用スクリーンショットを撮影し、アップロード用のエントリ（ファイルパス、または (ファイル名, PNGバイト列)）を返す"""
+    if STREAM_SCREENSHOTS:
+        return (filename, screenshot.capture_full_page_png(driver))
+    filepath = os.path.join(output_dir, filename)
+    screenshot.capture_full_page(driver, filepath)
+    return filepath
+
+def upload_monitoring_screenshots(drive_service, local_files, parent_folder_id, creds=None):
+    """
+    監視用スクリーンショットをプラットフォーム別のフォルダ（MONITORING/プラットフォーム名）にアップロードする。
+    creds を渡すとスレッドごとにDriveサービスを作って並行アップロードする（渡さなければ drive_service で1件ずつ）。
+    """
     if not local_files:
         return
 
     print("\n--- Uploading monitoring screenshots to Google Drive ---")
     try:
-        # 1. "MONITORING" フォルダを探すか、なければ作成
-        query = f"'{parent_folder_id}' in parents and name='MONITORING' and mimeType='application/vnd.google-apps.folder' and trashed=false"
-        response = drive_service.files().list(q=query, spaces='drive', fields='files(id, name)', supportsAllDrives=True, includeItemsFromAllDrives=True).execute()
-        items = response.get('files', [])
-        
-        if not items:
-            print("Creating 'MONITORING' folder...")
-            folder_meta = {'name': 'MONITORING', 'mimeType': 'application/vnd.google-apps.folder', 'parents': [parent_folder_id]}
-            monitoring_folder = drive_service.files().create(body=folder_meta, fields='id', supportsAllDrives=True).execute()
-            monitoring_folder_id = monitoring_folder.get('id')
+        # ファイル名からプラットフォーム名を解析 (例: runpod_homepage_base.png)
+        uploads = [(("MONITORING", drive_upload.entry_name(entry).split('_')[0]), entry) for entry in local_files]
+        if creds is not None:
+            service_factory = lambda: discovery.build('drive', 'v3', credentials=creds, cache_discovery=False)
+            drive_upload.upload_files(service_factory, parent_folder_id, uploads, on_uploaded=screenshot_dedup.record_uploaded)
         else:
-            monitoring_folder_id = items[0].get('id')
-
-        # 2. 各ファイルをプラットフォームごとのサブフォルダにアップロード
-        for local_path in local_files:
-            # ファイル名からプラットフォーム名とベース名を解析 (例: runpod_homepage_base.png)
-            filename = os.path.basename(local_path)
-            parts = filename.split('_')
-            platform_name = parts[0]
-            
-            # プラットフォームごとのサブフォルダを探すか、なければ作成
-            query = f"'{monitoring_folder_id}' in parents and name='{platform_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
-            response = drive_service.files().list(q=query, spaces='drive', fields='files(id, name)', supportsAllDrives=True, includeItemsFromAllDrives=True).execute()
-            items = response.get('files', [])
-
-            if not items:
-                print(f"Creating '{platform_name}' subfolder...")
-                subfolder_meta = {'name': platform_name, 'mimeType': 'application/vnd.google-apps.folder', 'parents': [monitoring_folder_id]}
-                platform_folder = drive_service.files().create(body=subfolder_meta, fields='id', supportsAllDrives=True).execute()
-                platform_folder_id = platform_folder.get('id')
-            else:
-                platform_folder_id = items[0].get('id')
-
-            # ファイルをアップロード
-            print(f"Uploading {filename} to '{platform_name}' folder...")
-            media = MediaFileUpload(local_path, mimetype='image/png')
-            file_meta = {'name': filename, 'parents': [platform_folder_id]}
-            drive_service.files().create(body=file_meta, media_body=media, fields='id', supportsAllDrives=True).execute()
+            drive_upload.upload_files(lambda: drive_service, parent_folder_id, uploads, concurrency=1, on_uploaded=screenshot_dedup.record_uploaded)
             
     except Exception as e:
         print(f"An error occurred during monitoring screenshot upload: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        drive_folders.save_cache()
+        # アップロードに成功したスクリーンショットのハッシュだけを保存する
+        screenshot_dedup.save_index()
 
 def _clean_html_for_comparison(html_content: str, selector: str = None, ignore_selectors: list = None) -> str:
     """
@@ -280,7 +187,14 @@ def _clean_html_for_comparison(html_content: str, selector: str = None, ignore_s
     if not html_content:
         return ""
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # 比較範囲が単純なセレクタなら、その部分木だけをパースする（除外要素も単純なセレクタの場合のみ）
+        partial = selector if selector and html_parse.is_simple_selector(selector) and all(
+            html_parse.is_simple_selector(s) for s in (ignore_selectors or [])
+        ) else None
+        # 除外要素を decompose するので、その場合はキャッシュ済みの soup を使わない
+        soup = html_parse.parse_html(html_content, parse_only=partial, cache=not ignore_selectors)
+        if partial and soup.select_one(selector) is None:
+            soup = html_parse.parse_html(html_content, cache=not ignore_selectors)
 
         # まず、ページ全体から無視したい要素を完全に削除する
         if ignore_selectors and isinstance(ignore_selectors, list):
@@ -306,13 +220,73 @@ def _clean_html_for_comparison(html_content: str, selector: str = None, ignore_s
         import uuid
         return str(uuid.uuid4())
 
-def check_website_changes(driver, drive_service, targets, creds):
+def _get_baseline_hash(baseline, page):
+    """
+    前回のベースラインのハッシュ値を返す。
+    ポインタに同じ比較方法で計算したハッシュ値があればそれを使い、
+    なければ（旧形式のベースライン、または設定変更後）HTMLから計算し直す。
+    """
+    if baseline.content_hash:
+        return baseline.content_hash
+
+    print("  -> Baseline has no matching stored hash. Recomputing it from the stored HTML.")
+    content_yesterday = _clean_html_for_comparison(baseline.html, page.get("selector"), page.get("ignore_selectors"))
+    return hashlib.sha256(content_yesterday.encode('utf-8')).hexdigest()
+
+def _print_baseline_diff(baselines, platform, name, content_today, max_lines=20):
+    """変更を検知したときだけ、保存済みの正規化テキストと比較して差分の先頭を表示する"""
+    try:
+        content_yesterday = baselines.load_normalized_text(platform, name)
+        if content_yesterday is None:
+            return
+        diff = difflib.unified_diff(content_yesterday.split(' '), content_today.split(' '), lineterm='', n=3)
+        diff_lines = [line for line in diff if line.startswith(('+', '-')) and not line.startswith(('+++', '---'))]
+        if diff_lines:
+            print(f"  -> Diff ({len(diff_lines)} changed token(s)): " + " ".join(diff_lines[:max_lines]))
+    except Exception as e:
+        print(f"  -> WARNING: Could not compute diff against the stored baseline: {e}")
+
+def _resolve_notifications(notifications):
+    """
+    通知のリストを文字列にそろえる。ブログ更新の通知 (platform, name, url, タイトル, 要約の Future) は、
+    ここで要約を待ってメッセージを組み立てる（待つ時間は1件ごとに summarizer.wait_for_summary のタイムアウトまで）。
+    """
+    messages = []
+    for notification in notifications:
+        if isinstance(notification, str):
+            messages.append(notification)
+            continue
+        platform, name, url, latest_title, summary_future = notification
+        summary = summarizer.wait_for_summary(summary_future)
+        slack_message = (
+            f"【ブログ更新検知】\n"
+            f"プラットフォーム: {platform}\n"
+            f"ページ: {name} ({url})\n"
+            f"新タイトル: {latest_title}\n\n"
+            f"▼ Geminiによる内容予測:\n{summary}"
+        )
+        print(slack_message)
+        messages.append(slack_message)
+    return messages
+
+def check_website_changes(driver, drive_service, targets, creds, baselines=None):
+    """
+    baselines に prefetch 済みの GcsBaselineStore を渡すと、前回の状態をメモリから読む（閉じるのは呼び出し側）。
+    渡されなければここで取得を開始し、終わったら閉じる。
+    """
+    if baselines is not None:
+        return _check_website_changes(driver, drive_service, targets, creds, baselines)
+    baselines = baseline_store.GcsBaselineStore(MONITORING_BUCKET_NAME).prefetch(targets)
+    try:
+        return _check_website_changes(driver, drive_service, targets, creds, baselines)
+    finally:
+        baselines.close()
+
+def _check_website_changes(driver, drive_service, targets, creds, baselines):
     print("\n--- Starting Website Change Detection ---")
     gcp_project_id = "device-streaming-6eaa1c05"
     gcp_location = "asia-northeast1"
-    storage_client = storage.Client()
-    bucket_name = "gcs-bucket-for-html"
-    bucket = storage_client.bucket(bucket_name)
+    bucket = baselines.bucket
     
     output_dir = "/tmp"
     new_screenshots = []
@@ -325,11 +299,7 @@ def check_website_changes(driver, drive_service, targets, creds):
             
             try:
                 # 1. 今日のHTMLを取得
-                driver.get(url)
-                time.sleep(5)
-
-                if pre_action := page.get("pre_action"):
-                    execute_pre_action(driver, pre_action)
+                _load_monitoring_page(driver, page)
 
                 check_type = page.get("check_type", "hash") # デフォルトはhash
 
@@ -340,7 +310,7 @@ def check_website_changes(driver, drive_service, targets, creds):
                         print("  -> ERROR: 'latest_title' check type requires 'selectors' with at least a 'title'. Skipping.")
                         continue
 
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
+                    soup = html_parse.parse_html(driver.page_source)
                     title_elem = soup.select_one(selectors["title"])
 
                     if not title_elem:
@@ -362,9 +332,9 @@ def check_website_changes(driver, drive_service, targets, creds):
                     if latest_desc:
                         current_content += f"\nDESC: {latest_desc}"
 
-                    blob_path = f"{platform}/{name}_content.txt"
+                    blob_path = baseline_store.content_path(platform, name)
                     blob = bucket.blob(blob_path)
-                    previous_content = blob.download_as_text() if blob.exists() else ""
+                    previous_content = baselines.get(platform, page).text or ""
 
                     is_changed = previous_content != current_content
                     is_first_run = not previous_content
@@ -374,46 +344,35 @@ def check_website_changes(driver, drive_service, targets, creds):
                             print(f"  -> First run for {platform} - {name}. Saving baseline title.")
                         else:
                             print(f"  -> NEW BLOG POST DETECTED! Title: {latest_title}")
-                            summary = summarize_with_gemini(latest_title, latest_desc, gcp_project_id, gcp_location, 'gcp', credentials=creds)
-                            slack_message = (
-                                f"【ブログ更新検知】\n"
-                                f"プラットフォーム: {platform}\n"
-                                f"ページ: {name} ({url})\n"
-                                f"新タイトル: {latest_title}\n\n"
-                                f"▼ Geminiによる内容予測:\n{summary}"
-                            )
-                            notifications.append(slack_message)
-                            print(slack_message)
+                            # 要約はバックグラウンドで進め、通知をまとめるときに結果を待つ
+                            summary_future = summarizer.submit(latest_title, latest_desc, gcp_project_id, gcp_location, 'gcp', credentials=creds)
+                            notifications.append((platform, name, url, latest_title, summary_future))
                         
                         # スクリーンショット撮影と内容の保存
                         filename = f"{platform}_{name}_base.png" if is_first_run else f"{platform}_{name}_diff_{datetime.now().strftime('%Y%m%d-%H%M%S')}.png"
                         filepath = os.path.join(output_dir, filename)
-                        take_scrolling_screenshot(driver, filepath)
+                        _capture_with_full_profile(driver, page, lambda d: screenshot.capture_full_page(d, filepath))
 
                         blob.upload_from_string(current_content)
-                        print(f"  -> Content saved to GCS: gs://{bucket_name}/{blob_path}")
+                        print(f"  -> Content saved to GCS: gs://{bucket.name}/{blob_path}")
                     else:
                         print("  -> No new blog post detected.")
 
                 else:
                     html_today_raw = driver.page_source
 
-                    # 2. GCSから昨日のHTMLを取得
-                    blob_path = f"{platform}/{name}.html"
-                    blob = bucket.blob(blob_path)
-                    html_yesterday_raw = ""
-                    if blob.exists():
-                        html_yesterday_raw = blob.download_as_text()
-
-                    # 3. 両方のHTMLをクリーニングし、ハッシュ値を計算して比較
+                    # 2. 今日のHTMLをクリーニングしてハッシュ値を計算
                     content_today = _clean_html_for_comparison(html_today_raw, page.get("selector"), page.get("ignore_selectors"))
-                    content_yesterday = _clean_html_for_comparison(html_yesterday_raw, page.get("selector"), page.get("ignore_selectors"))
-
                     hash_today = hashlib.sha256(content_today.encode('utf-8')).hexdigest()
-                    hash_yesterday = hashlib.sha256(content_yesterday.encode('utf-8')).hexdigest()
 
-                    is_changed = hash_yesterday != hash_today
-                    is_first_run = not html_yesterday_raw
+                    # 3. 前回のハッシュ値（prefetch 済みのポインタ）と比較する
+                    baseline = baselines.get(platform, page)
+                    is_first_run = not baseline.exists
+                    hash_yesterday = None if is_first_run else _get_baseline_hash(baseline, page)
+
+                    is_changed = not is_first_run and hash_yesterday != hash_today
+                    if is_changed:
+                        _print_baseline_diff(baselines, platform, name, content_today)
 
                     if is_first_run or is_changed:
                         if is_first_run:
@@ -423,28 +382,33 @@ def check_website_changes(driver, drive_service, targets, creds):
                             notifications.append(f"【Webサイト更新検知】\nページ: {platform} {name}\nURL: {url}")
                         
                         filename = f"{platform}_{name}_base.png" if is_first_run else f"{platform}_{name}_diff_{datetime.now().strftime('%Y%m%d-%H%M%S')}.png"
-                        filepath = os.path.join(output_dir, filename)
-                        take_scrolling_screenshot(driver, filepath)
-                        new_screenshots.append(filepath)
+                        new_screenshots.append(_capture_with_full_profile(driver, page, lambda d: _capture_monitoring_screenshot(d, output_dir, filename)))
 
-                        blob.upload_from_string(html_today_raw, content_type='text/html')
-                        print(f"  -> HTML saved to GCS: gs://{bucket_name}/{blob_path}")
+                        # 変更があった場合、または初回実行時は今日のHTMLをスナップショットとして保存
+                        baselines.save_snapshot(platform, name, html_today_raw, hash_today, page, content_today)
                     else:
                         print(f"  -> No change detected.")
-
-                    # 変更があった場合、または初回実行時は今日のHTMLをGCSに保存
-                    if is_first_run or is_changed:
-                        blob.upload_from_string(html_today_raw, content_type='text/html')
+                        if not baseline.content_hash:
+                            # 旧形式のベースラインは、次回からハッシュ値だけで比較できるようスナップショットに移行する
+                            baselines.save_snapshot(platform, name, baseline.html, hash_today, page, content_today)
 
             except Exception as e:
                 print(f"  -> Error checking {platform} - {name}: {e}")
+
+    # バッチの件数に満たない要約もここで送り、スクリーンショットのアップロードと並行して進める
+    summarizer.flush()
     
     # 6. 新しく撮影したスクリーンショットをアップロード
+    # 見た目が前回とほぼ同じスクリーンショットはアップロードしない
+    new_screenshots = screenshot_dedup.filter_unchanged(new_screenshots)
     if new_screenshots:
         PARENT_DRIVE_FOLDER_ID = "1mA4YZ00FXIZ5aMeq15vagz1jtQbCDT1R" # 監視フォルダの親フォルダID
-        upload_monitoring_screenshots(drive_service, new_screenshots, PARENT_DRIVE_FOLDER_ID)
+        upload_monitoring_screenshots(drive_service, new_screenshots, PARENT_DRIVE_FOLDER_ID, creds=creds)
 
     # 7. 通知処理（実装は別途）
+    # バックグラウンドの要約の完了を待ってメッセージにする
+    notifications = _resolve_notifications(notifications)
+    summarizer.save_cache()
     if notifications:
         print("\n--- Sending Change Notifications to Slack ---")
 
@@ -457,12 +421,22 @@ def check_website_changes(driver, drive_service, targets, creds):
     else:
         print("\nNo website changes to notify.")
 
-def check_website_changes_local(driver, targets):
+def check_website_changes_local(driver, targets, baselines=None):
     """
     【ローカル検証用】GCSの代わりにローカルフォルダを使って変更検知を行う
+    baselines に prefetch 済みの LocalBaselineStore を渡すと、GCS版と同じく前回の状態をメモリから読む（閉じるのは呼び出し側）。
     """
+    if baselines is not None:
+        return _check_website_changes_local(driver, targets, baselines)
+    baselines = baseline_store.LocalBaselineStore(LOCAL_MONITORING_PATH).prefetch(targets)
+    try:
+        return _check_website_changes_local(driver, targets, baselines)
+    finally:
+        baselines.close()
+
+def _check_website_changes_local(driver, targets, baselines):
     print("\n--- Starting Website Change Detection (LOCAL TEST MODE) ---")
-    local_storage_path = os.path.join(os.getcwd(), "tmp_local_test")
+    local_storage_path = LOCAL_MONITORING_PATH
     os.makedirs(local_storage_path, exist_ok=True)
     print(f"Using local storage at: {local_storage_path}")
     notifications = []
@@ -477,11 +451,7 @@ def check_website_changes_local(driver, targets):
             print(f"Checking {platform} - {name} ({url})...")
             
             try:
-                driver.get(url)
-                time.sleep(5)
-
-                if pre_action := page.get("pre_action"):
-                    execute_pre_action(driver, pre_action)
+                _load_monitoring_page(driver, page)
                 
                 check_type = page.get("check_type", "hash")
                 
@@ -496,7 +466,7 @@ def check_website_changes_local(driver, targets):
                         print("  -> ERROR: 'latest_title' check type requires 'selectors' with at least a 'title'. Skipping.")
                         continue
 
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
+                    soup = html_parse.parse_html(driver.page_source)
                     title_elem = soup.select_one(selectors["title"])
 
                     if not title_elem:
@@ -520,44 +490,25 @@ def check_website_changes_local(driver, targets):
                     
                     # 前回の内容をローカルファイルから取得
                     content_file_path = os.path.join(platform_path, f"{name}_content.txt")
-                    previous_content = ""
-                    if os.path.exists(content_file_path):
-                        with open(content_file_path, 'r', encoding='utf-8') as f:
-                            previous_content = f.read()
+                    previous_content = baselines.get(platform, page).text or ""
 
                     is_changed = previous_content != current_content
                     is_first_run = not previous_content
 
                     if is_first_run or is_changed:
                         if is_first_run:
+                            # 初回は比較対象がないため要約しない（GCS版と同じ）
                             print(f"  -> First run for {platform} - {name}. Saving baseline title.")
-                            summary = summarize_with_gemini(latest_title, latest_desc, gcp_project_id, gcp_location, 'local')
-                            slack_message = (
-                                f"【ブログ更新検知】\n"
-                                f"プラットフォーム: {platform}\n"
-                                f"ページ: {name} ({url})\n"
-                                f"新タイトル: {latest_title}\n\n"
-                                f"▼ Geminiによる内容予測:\n{summary}"
-                            )
-                            notifications.append(slack_message)
-                            print(slack_message)
                         else:
                             print(f"  -> NEW BLOG POST DETECTED! Title: {latest_title}")
-                            summary = summarize_with_gemini(latest_title, latest_desc, gcp_project_id, gcp_location, 'local')
-                            slack_message = (
-                                f"【ブログ更新検知】\n"
-                                f"プラットフォーム: {platform}\n"
-                                f"ページ: {name} ({url})\n"
-                                f"新タイトル: {latest_title}\n\n"
-                                f"▼ Geminiによる内容予測:\n{summary}"
-                            )
-                            notifications.append(slack_message)
-                            print(slack_message)
+                            # 要約はバックグラウンドで進め、通知をまとめるときに結果を待つ
+                            summary_future = summarizer.submit(latest_title, latest_desc, gcp_project_id, gcp_location, 'local')
+                            notifications.append((platform, name, url, latest_title, summary_future))
                         
                         # スクリーンショット撮影と内容の保存
                         filename = f"{platform}_{name}_base.png" if is_first_run else f"{platform}_{name}_diff_{datetime.now().strftime('%Y%m%d-%H%M%S')}.png"
                         filepath = os.path.join(platform_path, filename)
-                        take_scrolling_screenshot(driver, filepath)
+                        _capture_with_full_profile(driver, page, lambda d: screenshot.capture_full_page(d, filepath))
 
                         with open(content_file_path, 'w', encoding='utf-8') as f:
                             f.write(current_content)
@@ -568,10 +519,7 @@ def check_website_changes_local(driver, targets):
                 else: # check_type == "hash"
                     html_today_raw = driver.page_source
                     html_file_path = os.path.join(platform_path, f"{name}.html")
-                    html_yesterday_raw = ""
-                    if os.path.exists(html_file_path):
-                        with open(html_file_path, 'r', encoding='utf-8') as f:
-                            html_yesterday_raw = f.read()
+                    html_yesterday_raw = baselines.get(platform, page).html or ""
 
                     content_today = _clean_html_for_comparison(html_today_raw, page.get("selector"), page.get("ignore_selectors", []))
                     content_yesterday = _clean_html_for_comparison(html_yesterday_raw, page.get("selector"), page.get("ignore_selectors", []))
@@ -610,7 +558,7 @@ def check_website_changes_local(driver, targets):
                         
                         filename = f"{platform}_{name}_base.png" if is_first_run else f"{platform}_{name}_diff_{datetime.now().strftime('%Y%m%d-%H%M%S')}.png"
                         filepath = os.path.join(platform_path, filename)
-                        take_scrolling_screenshot(driver, filepath)
+                        _capture_with_full_profile(driver, page, lambda d: screenshot.capture_full_page(d, filepath))
 
                         with open(html_file_path, 'w', encoding='utf-8') as f:
                             f.write(html_today_raw)
@@ -623,6 +571,9 @@ def check_website_changes_local(driver, targets):
                 import traceback
                 traceback.print_exc()
 
+    summarizer.flush()
+    notifications = _resolve_notifications(notifications)
+    summarizer.save_cache()
     if notifications:
         print("\n--- Change Notifications (Local Test) ---")
         full_message = "（ローカルテスト通知）\n" + "\n\n".join(notifications)
@@ -632,62 +583,36 @@ def check_website_changes_local(driver, targets):
     else:
         print("\nNo website changes to notify.")
 
+def _record_uploaded(entry):
+    """アップロードに成功したスクリーンショットのハッシュと、ハンドラの撮影記録を確定する"""
+    screenshot_dedup.record_uploaded(entry)
+    capture_policy.record_uploaded(entry)
+
 def upload_files_to_drive(local_files, parent_folder_id):
     try:
         print("Authenticating with Google Drive...")
         # Cloud Runの環境を自動で認識し、適切な認証情報を取得する
-        creds, project = google_auth_default(scopes=['https://www.googleapis.com/auth/drive'])
-        service = build('drive', 'v3', credentials=creds)
+        creds, project = google_auth.default(scopes=['https://www.googleapis.com/auth/drive'])
         print("Authentication successful.")
 
-        # 1. 今日の日付のフォルダ（例: "2025-08-08"）を作成
+        # 1. 今日の日付のフォルダ（例: "2025-08-08"）にアップロードする（フォルダIDはキャッシュから解決）
         today_str = datetime.now().strftime('%Y-%m-%d')
-        
-        # 同じ名前のフォルダが既にないか確認
-        query = f"'{parent_folder_id}' in parents and name='{today_str}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
-        response = service.files().list(
-            q=query, 
-            spaces='drive', 
-            fields='files(id, name)', 
-            supportsAllDrives=True, 
-            includeItemsFromAllDrives=True
-        ).execute()
-        items = response.get('files', [])
-
-        if not items:
-            print(f"Creating new folder for today: {today_str}")
-            folder_metadata = {
-                'name': today_str,
-                'mimeType': 'application/vnd.google-apps.folder',
-                'parents': [parent_folder_id]
-            }
-            folder = service.files().create(body=folder_metadata, fields='id', supportsAllDrives=True).execute()
-            target_folder_id = folder.get('id')
-        else:
-            print(f"Using existing folder for today: {today_str}")
-            target_folder_id = items[0].get('id')
+        print(f"Using folder for today: {today_str}")
             
-        # 2. スクリーンショットをアップロード
-        successful_uploads = 0
-        failed_uploads = 0
+        # 2. スクリーンショットを並行してアップロード
+        uploads = []
+        skipped_uploads = 0
         for file_path in local_files:
-            try:
-                if not file_path or not os.path.exists(file_path):
-                    print(f"Skipping upload for non-existent file: {file_path}")
-                    failed_uploads += 1
-                    continue
-                
-                file_name = os.path.basename(file_path)
-                print(f"Uploading {file_name} to Google Drive...")
-                media = MediaFileUpload(file_path, mimetype='image/png')
-                file_metadata = {'name': file_name, 'parents': [target_folder_id]}
-                service.files().create(body=file_metadata, media_body=media, fields='id', supportsAllDrives=True).execute()
-                successful_uploads += 1
-
-            except Exception as e:
-                print(f"!!! FAILED to upload {os.path.basename(file_path)}: {e}")
-                failed_uploads += 1
+            # メモリ上のPNG (ファイル名, バイト列) はそのままアップロードする
+            if not isinstance(file_path, tuple) and (not file_path or not os.path.exists(file_path)):
+                print(f"Skipping upload for non-existent file: {file_path}")
+                skipped_uploads += 1
                 continue
+            uploads.append(((today_str,), file_path))
+
+        service_factory = lambda: discovery.build('drive', 'v3', credentials=creds, cache_discovery=False)
+        successful_uploads, failed_uploads = drive_upload.upload_files(service_factory, parent_folder_id, uploads, on_uploaded=_record_uploaded)
+        failed_uploads += skipped_uploads
         
         print(f"Upload process completed. Successful: {successful_uploads}, Failed: {failed_uploads}")
         return True
@@ -698,6 +623,11 @@ def upload_files_to_drive(local_files, parent_folder_id):
         print(f"An error occurred during Google Drive upload: {e}")
         traceback.print_exc()
         return False
+    finally:
+        drive_folders.save_cache()
+        # アップロードに成功したスクリーンショットのハッシュと撮影記録だけを保存する
+        screenshot_dedup.save_index()
+        capture_policy.save_state()
 
 def save_data_to_spreadsheet(all_data, project_id, worksheet_name):
     """
@@ -706,12 +636,12 @@ def save_data_to_spreadsheet(all_data, project_id, worksheet_name):
     try:
         print("Authenticating with Google Sheets...")
         # Cloud Runの環境を自動で認識し、認証情報を取得
-        creds, project = google_auth_default(scopes=[
+        creds, project = google_auth.default(scopes=[
             'https://www.googleapis.com/auth/spreadsheets',
             'https://www.googleapis.com/auth/drive'
         ])
         gc = gspread.authorize(creds)
-        sheet_url = get_secret(project_id, "SHEET_URL")
+        sheet_url = secret_store.get_secret(project_id, "SHEET_URL")
         spreadsheet = gc.open_by_url(sheet_url)
         
         try:
@@ -723,47 +653,17 @@ def save_data_to_spreadsheet(all_data, project_id, worksheet_name):
         print(f"Successfully connected to worksheet: '{worksheet_name}'")
 
         # --- データの整形 ---
-        header = ['Date', 'Company', 'Variation', 'Region', 'GPU_Type', 'API_TYPE', 'Size', 'Price']
         today_str = datetime.now().strftime('%Y-%m-%d')
-        
-        rows_to_append = []
-        for data_dict in all_data:
-            is_api_data = data_dict.get("API_TYPE") and data_dict["API_TYPE"] != "N/A"
-            # runpod_handlerから取得した辞書のキーを、スプレッドシートのカラムにマッピング
-            if is_api_data:
-                # APIデータの場合の行を作成
-                row = [
-                    today_str,
-                    data_dict.get("Provider Name", "N/A"),
-                    data_dict.get("GPU Variant Name", "N/A"), # APIではN/A
-                    data_dict.get("Region", "N/A"),
-                    "", # GPU_Type は空
-                    data_dict.get("API_TYPE", "N/A"), # API_TYPE を設定
-                    data_dict.get("Period", "N/A"), # "Per 1M Tokens" など
-                    data_dict.get("Total Price ($)", "N/A")
-                ]
-            else:
-                row = [
-                    today_str,
-                    data_dict.get("Provider Name", "N/A"),
-                    data_dict.get("GPU Variant Name", "N/A"),
-                    data_dict.get("Region", "N/A"),
-                    data_dict.get("GPU (H100 or H200 or L40S)", "N/A"),
-                    "", # API_TYPE は空
-                    f'{data_dict.get("Number of Chips", "N/A")}x',
-                    data_dict.get("Total Price ($)", "N/A")
-                ]
-            rows_to_append.append(row)
+        # チップ数ごとの行への展開は書き込む直前に行う
+        rows_to_append = [record.to_sheet_row(today_str) for record in price_record.expand(price_record.from_rows(all_data))]
         
         # --- 書き込み処理 ---
-        # シートが空の場合、最初にヘッダーを書き込む
-        if not worksheet.get_all_values():
-            print("Worksheet is empty. Writing header.")
-            worksheet.append_row(header)
+        # シートが空の場合、最初にヘッダーを書き込む（1行目だけを確認する）
+        sheet_writer.ensure_header(worksheet, price_record.SHEET_HEADER)
         
         if rows_to_append:
             print(f"Appending {len(rows_to_append)} rows to the worksheet...")
-            worksheet.append_rows(rows_to_append, value_input_option='USER_ENTERED')
+            sheet_writer.append_rows_chunked(worksheet, rows_to_append)
             print("Successfully saved data to spreadsheet.")
         else:
             print("No data to save.")
@@ -773,97 +673,131 @@ def save_data_to_spreadsheet(all_data, project_id, worksheet_name):
         print(f"An error occurred during Google Sheets operation: {e}")
         traceback.print_exc()
 
+def _is_screenshot_run(request):
+    """リクエストパラメータ screenshots で、スクリーンショットを撮るかどうかを判定する（既定は撮る）"""
+    if request is None:
+        return True
+    value = request.args.get("screenshots", "true")
+    return value.lower() not in ("0", "false", "no", "off")
+
+def _selected_handler_names(request):
+    """リクエストパラメータ handlers で実行するハンドラを絞り込む（既定はすべて）"""
+    if request is None or not request.args.get("handlers"):
+        return HANDLER_MODULES
+    names = [name.strip() for name in request.args["handlers"].split(",") if name.strip()]
+    unknown = [name for name in names if name not in HANDLER_MODULES]
+    if unknown:
+        print(f"WARNING: Ignoring unknown handler(s): {', '.join(unknown)}")
+    return [name for name in names if name in HANDLER_MODULES]
+
 @functions_framework.http
 def screenshot_entry_point(request):
 
-    all_handlers = [
-        alibaba_handler, koyeb_handler, civo_handler, runpod_handler, coreweave_handler, cudocompute_handler, lambda_labs_handler,
-        neevcloud_handler, oblivus_handler, scaleway_handler, seeweb_handler, soroban_highreso_handler, groq_handler, openai_handler, 
-        fireworks_handler, anyscale_handler, fluidstack_handler, genesiscloud_handler, hyperstack_handler, liquidweb_handler, 
-        modal_handler, vast_ai_handler, datacrunch_handler, sakura_internet_handler, sesterce_handler, anthropic_handler, aws_cloudprice, 
-        azure_handler, baseten_handler, google_handler, oracle_handler, sambanova_handler, tencentcloud_handler, together_handler
-    ]
-    # 1. ブラウザを起動する
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage") # メモリ不足対策
-    options.add_argument("window-size=1920,1080") # ウィンドウサイズ指定
-    # 一般的なユーザーエージェントを設定してbot検出を避ける
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    
-    if platform.system() == "Linux":
-        # クラウド環境 (Linux) の場合、パスを明示的に指定
-        print("Running in Linux environment (Cloud Run). Setting explicit paths.")
-        options.binary_location = "/usr/bin/google-chrome"
-        service = Service(executable_path="/usr/bin/chromedriver")
-        driver = webdriver.Chrome(service=service, options=options)
-    else:
-        print("Running in local environment (Windows/Mac). Using automatic driver management.")
-        driver = webdriver.Chrome(options=options)
-
-    
-
+    # ?handlers=runpod_handler,openai_handler のように指定された場合は、そのハンドラだけを読み込んで実行する
+    all_handlers = load_handlers(_selected_handler_names(request))
+    html_parse.reset()
     # Google Drive/GCSへの接続情報を再利用するために先に定義
     try:
-        creds, project = google_auth_default(scopes=[
+        creds, project = google_auth.default(scopes=[
             'https://www.googleapis.com/auth/spreadsheets',
             'https://www.googleapis.com/auth/drive',
             'https://www.googleapis.com/auth/devstorage.read_write', # GCSのスコープを追加
             'https://www.googleapis.com/auth/cloud-platform'
         ])
-        drive_service = build('drive', 'v3', credentials=creds)
+        drive_service = discovery.build('drive', 'v3', credentials=creds)
     except Exception as e:
         print(f"Failed to authenticate with Google services: {e}")
-        driver.quit()
         return "Authentication failed.", 500
     
+    # Slackの通知先やシートのURLは、ハンドラの処理と並行して先に取得しておく（キャッシュ済みなら何もしない）
+    secret_store.prefetch(PROJECT_ID)
+
     output_dir = "/tmp" # 保存先
     saved_files = [] # 保存したファイルパスを記録するリスト
     all_scraped_data = []
 
-    # 2. 各ハンドラを呼び出し、ブラウザの操作権を渡す
-    print("--- Processing ---")
-    for handler in all_handlers:
-        handler_name = handler.__name__.split('.')[-1]
-        print(f"--- Processing {handler_name} ---")
-        
-        try:
-            screenshot_paths, scraped_data = handler.process_data_and_screenshot(driver, output_dir)
-
-            if screenshot_paths:
-                saved_files.extend(screenshot_paths)
-                print(f"  -> Got {len(screenshot_paths)} screenshot(s) from {handler_name}.")
-            
-            if scraped_data:
-                all_scraped_data.extend(scraped_data)
-                print(f"  -> Got {len(scraped_data)} data rows from {handler_name}.")
+    # ?screenshots=false で呼ばれた場合は価格データのみ取得する（HTTPで足りるハンドラはChromeを使わない）
+    capture_screenshots = _is_screenshot_run(request)
+    if not capture_screenshots:
+        print("Data-only run requested. Screenshots will be skipped.")
 
+    # 監視対象ページの前回の状態は、Chromeの起動やハンドラの処理と並行して先に取得しておく
+    monitoring_targets = get_monitoring_targets()
+    baselines = None
+    if monitoring_targets:
+        try:
+            baselines = baseline_store.GcsBaselineStore(MONITORING_BUCKET_NAME).prefetch(monitoring_targets)
+            # baselines = baseline_store.LocalBaselineStore(LOCAL_MONITORING_PATH).prefetch(monitoring_targets)
         except Exception as e:
-            # ハンドラ実行中に予期せぬエラーが起きた場合
-            print(f"!!! An unexpected error occurred in {handler_name}: {e}. Skipping.")
+            print(f"WARNING: Could not start baseline prefetch: {e}")
 
-    # === Webサイト変更監視処理 ===
-    if MONITORING_TARGETS:
-        check_website_changes(driver, drive_service, MONITORING_TARGETS, creds)
-        # check_website_changes_local(driver, MONITORING_TARGETS)
-        print('skip')
+    # 1. 各ハンドラをブラウザワーカーのプールに分散して実行する
+    handler_results = browser_pool.run_handlers_in_pool(all_handlers, output_dir, capture_screenshots=capture_screenshots)
 
-    # 3. ブラウザを閉じる
-    driver.quit()
+    # 2. ワーカーの結果をハンドラ順にまとめる
+    dedup_candidates = [] # 知覚ハッシュで重複を除いてよいスクリーンショット（最大日数による撮り直し分）
+    for handler_name, screenshot_paths, scraped_data, dedup_allowed in handler_results:
+        if screenshot_paths:
+            (dedup_candidates if dedup_allowed else saved_files).extend(screenshot_paths)
+            print(f"  -> Got {len(screenshot_paths)} screenshot(s) from {handler_name}.")
+        
+        # ハンドラが返した行の辞書は、ここで PriceRecord にそろえる
+        scraped_data = price_record.from_rows(scraped_data, handler_name)
+        if scraped_data:
+            all_scraped_data.extend(scraped_data)
+            print(f"  -> Got {len(scraped_data)} data rows from {handler_name}.")
 
+    # USD以外の価格は、共有の為替レートでここでまとめてUSDに変換する
+    all_scraped_data = exchange_rates.convert_records(all_scraped_data)
+
+    # === Webサイト変更監視処理 ===
+    if monitoring_targets:
+        driver = None
+        try:
+            driver = browser_pool.create_driver()
+            # 変更検知はDOMだけで判定し、スクリーンショットを撮るときだけ通常のプロファイルで読み込み直す
+            browser_profile.enable_lightweight_profile(driver)
+            check_website_changes(driver, drive_service, monitoring_targets, creds, baselines=baselines)
+            # check_website_changes_local(driver, monitoring_targets, baselines=baselines)
+        except Exception as e:
+            # 監視が失敗しても、取得済みの価格データのアップロードと保存は続ける
+            import traceback
+            print(f"ERROR: Website change detection failed: {e}. Skipping monitoring.")
+            traceback.print_exc()
+        finally:
+            # 3. ブラウザを閉じる
+            if driver is not None:
+                driver.quit()
+            if baselines is not None:
+                baselines.close()
+
+    # 最大日数による撮り直しのうち、見た目が前回とほぼ同じスクリーンショットはアップロードしない
+    # （価格データが変わったときの撮影は、数字だけの変化を知覚ハッシュで検知できないため必ずアップロードする）
+    screenshot_dedup.remember(saved_files)
+    changed_candidates = screenshot_dedup.filter_unchanged(dedup_candidates)
+    for entry in dedup_candidates:
+        if entry not in changed_candidates:
+            # 前回アップロードした画像と同じなので、アップロード済みとして撮影記録を確定する
+            capture_policy.record_uploaded(entry)
+    saved_files += changed_candidates
     if saved_files:
         print(f"\nAll screenshots taken. Uploading {len(saved_files)} files to Google Drive...")
         PARENT_FOLDER_ID = "1mA4YZ00FXIZ5aMeq15vagz1jtQbCDT1R"
         upload_files_to_drive(saved_files, PARENT_FOLDER_ID)
+    else:
+        capture_policy.save_state()
 
     if all_scraped_data:
-        print(f"\nSaving {len(all_scraped_data)} rows of pricing data to Google Sheets...")
+        num_rows = sum(record.row_count() for record in all_scraped_data)
+        print(f"\nSaving {num_rows} rows ({len(all_scraped_data)} offerings) of pricing data to Google Sheets...")
         WORKSHEET_NAME = "シート1"
         save_data_to_spreadsheet(all_scraped_data, PROJECT_ID, WORKSHEET_NAME)
+        # 分析用に、日付・プロバイダごとのParquetファイルにも保存する
+        price_history.write_rows(all_scraped_data)
+
+    html_parse.report_stats()
+    # パース結果のキャッシュを次のリクエストまで持ち越さない
+    html_parse.reset()
 
     return "Screenshot process completed.", 200
 
@@ -1,11 +1,7 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.alibabacloud.com/en/product/machine-learning/pricing?_p_lc=1"
 
@@ -70,15 +66,15 @@ def fetch_alibaba_data(soup):
             price = float(price_match.group(0)) if price_match else "N/A"
 
             # データをスプレッドシートの形式に合わせて辞書に格納
-            data_dict = {
-                "Provider Name": "Alibaba Cloud",
-                "GPU Variant Name": billing_item, # Variation
-                "Region": region,
-                "GPU (H100 or H200 or L40S)": gpu_type, # GPU_Type
-                "Number of Chips": 1, # Size (1xと仮定)
-                "Total Price ($)": price # Price
+            data_dict = PriceRecord(
+                provider_name="Alibaba Cloud",
+                gpu_variant=billing_item, # Variation
+                region=region,
+                gpu_family=gpu_type, # GPU_Type
+                num_chips=1, # Size (1xと仮定)
+                total_price=price # Price
                 # その他の固定値や取得できない情報はmain.py側で補完
-            }
+            )
             all_data.append(data_dict)
 
     except Exception as e:
@@ -102,23 +98,20 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver)
 
         # フルページのスクリーンショットを撮影
         print("Taking full-page screenshot...")
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
         print("Scraping pricing data from the same page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_alibaba_data(soup)
 
@@ -1,8 +1,8 @@
 # providers/anthropic_handler.py
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.anthropic.com/pricing#api"
 
@@ -61,15 +61,15 @@ def _parse_model_card(card):
             # シンプルな価格構造 (Opus, Haiku)
             price_per_mtok = _parse_price(price_spans[0]['data-price-full'])
             if price_per_mtok is not None:
-                data_rows.append({
-                    "Provider Name": STATIC_PROVIDER_NAME, "Currency": "USD",
-                    "Service Provided": STATIC_SERVICE_PROVIDED, "Region": "N/A",
-                    "API_TYPE": f"{model_name} - {io_type}",
-                    "GPU (H100 or H200 or L40S)": "", "GPU Variant Name": "N/A",
-                    "Number of Chips": "N/A", "Memory (GB)": "N/A", "Amount of Storage": "N/A",
-                    "Period": "Per 1M Tokens", "Total Price ($)": price_per_mtok,
-                    "Effective Hourly Rate ($/hr)": "N/A",
-                })
+                data_rows.append(PriceRecord(
+                    provider_name=STATIC_PROVIDER_NAME, currency="USD",
+                    service_provided=STATIC_SERVICE_PROVIDED, region="N/A",
+                    api_type=f"{model_name} - {io_type}",
+                    gpu_family="", gpu_variant="N/A",
+                    num_chips="N/A", memory_gb="N/A", amount_of_storage="N/A",
+                    period="Per 1M Tokens", total_price=price_per_mtok,
+                    hourly_rate="N/A",
+                ))
         elif len(price_spans) > 1:
             # 複雑な(階層的な)価格構造 (Sonnet)
             for i, span in enumerate(price_spans):
@@ -78,15 +78,15 @@ def _parse_model_card(card):
                 tier_desc = price_tier_descriptions[i].get_text(strip=True) if i < len(price_tier_descriptions) else ""
                 
                 if price_per_mtok is not None:
-                    data_rows.append({
-                        "Provider Name": STATIC_PROVIDER_NAME, "Currency": "USD",
-                        "Service Provided": STATIC_SERVICE_PROVIDED, "Region": "N/A",
-                        "API_TYPE": f"{model_name} - {io_type} ({tier_desc})",
-                        "GPU (H100 or H200 or L40S)": "", "GPU Variant Name": "N/A",
-                        "Number of Chips": "N/A", "Memory (GB)": "N/A", "Amount of Storage": "N/A",
-                        "Period": "Per 1M Tokens", "Total Price ($)": price_per_mtok,
-                        "Effective Hourly Rate ($/hr)": "N/A",
-                    })
+                    data_rows.append(PriceRecord(
+                        provider_name=STATIC_PROVIDER_NAME, currency="USD",
+                        service_provided=STATIC_SERVICE_PROVIDED, region="N/A",
+                        api_type=f"{model_name} - {io_type} ({tier_desc})",
+                        gpu_family="", gpu_variant="N/A",
+                        num_chips="N/A", memory_gb="N/A", amount_of_storage="N/A",
+                        period="Per 1M Tokens", total_price=price_per_mtok,
+                        hourly_rate="N/A",
+                    ))
 
     return data_rows
 
@@ -129,23 +129,19 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Anthropic Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver)
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping API pricing data...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data = _fetch_api_prices(soup)
         if scraped_data:
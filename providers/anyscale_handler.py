@@ -1,11 +1,11 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.anyscale.com/pricing"
 
@@ -67,14 +67,14 @@ def fetch_anyscale_data(soup):
             price_match = re.search(r'[\d\.]+', price_text)
             price = float(price_match.group(0)) if price_match else "N/A"
 
-            data_dict = {
-                "Provider Name": "Anyscale",
-                "GPU Variant Name": gpu_name,
-                "Region": "N/A", # ページに記載がないためN/A
-                "GPU (H100 or H200 or L40S)": gpu_type,
-                "Number of Chips": 1, # 1GPUあたりの価格なので1x
-                "Total Price ($)": price
-            }
+            data_dict = PriceRecord(
+                provider_name="Anyscale",
+                gpu_variant=gpu_name,
+                region="N/A", # ページに記載がないためN/A
+                gpu_family=gpu_type,
+                num_chips=1, # 1GPUあたりの価格なので1x
+                total_price=price
+            )
             all_data.append(data_dict)
 
     except Exception as e:
@@ -97,7 +97,7 @@ def process_data_and_screenshot(driver, output_directory):
         print(f"Navigating to: {PRICING_URL}")
         driver.get(PRICING_URL)
         # ページが読み込まれるのを待つ
-        time.sleep(3)
+        page_wait.wait_for_page_ready(driver, timeout=3)
 
         # --- Anyscale特有の操作 ---
         try:
@@ -112,26 +112,22 @@ def process_data_and_screenshot(driver, output_directory):
             
             print("'hr' button found. Clicking it.")
             hr_button.click()
-            time.sleep(2) # 価格が更新されるのを待つ
+            page_wait.wait_for_dom_quiet(driver, timeout=2) # 価格が更新されるのを待つ
         except TimeoutException:
             print("Could not find the 'hr' button. It might be active by default or the page structure has changed.")
         
         # --- スクリーンショット撮影とデータ取得 ---
         print("Taking full-page screenshot...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
         print("Scraping pricing data from the same page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_anyscale_data(soup)
 
@@ -1,10 +1,11 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 # --- URL定義 ---
 PRICING_URL_EC2 = "https://aws.amazon.com/jp/ec2/capacityblocks/pricing/"
+READY_CONDITION_EC2 = {"selector": "div.lb-tbl table"}
 PRICING_URL_SAGEMAKER = "https://aws.amazon.com/jp/sagemaker/pricing/"
 
 # --- 静的情報 ---
@@ -69,23 +70,23 @@ def _parse_ec2_capacity_blocks(soup):
         total_price = float(price_match.group(1))
         per_gpu_price = float(price_match.group(2))
         
-        data_rows.append({
-            "Provider Name": STATIC_PROVIDER_NAME,
-            "Service Provided": "EC2 Capacity Blocks",
-            "Currency": "USD",
-            "Region": region,
-            "GPU ID": f"aws_ec2_{instance_type.replace('.','-')}_{region.split(' ')[0]}",
-            "GPU (H100 or H200 or L40S)": base_chip,
-            "GPU Variant Name": gpu_variant,
-            "Display Name(GPU Type)": f"{num_chips}x {gpu_variant} ({instance_type})",
-            "Memory (GB)": vram,
-            "Amount of Storage": cols[7].get_text(strip=True),
-            "Number of Chips": num_chips,
-            "Period": "Per Hour",
-            "Total Price ($)": total_price,
-            "Effective Hourly Rate ($/hr)": per_gpu_price,
-            "API_TYPE": "", # GPUホスティングなのでAPI_TYPEは空
-        })
+        data_rows.append(PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME,
+            service_provided="EC2 Capacity Blocks",
+            currency="USD",
+            region=region,
+            gpu_id=f"aws_ec2_{instance_type.replace('.','-')}_{region.split(' ')[0]}",
+            gpu_family=base_chip,
+            gpu_variant=gpu_variant,
+            display_name=f"{num_chips}x {gpu_variant} ({instance_type})",
+            memory_gb=vram,
+            amount_of_storage=cols[7].get_text(strip=True),
+            num_chips=num_chips,
+            period="Per Hour",
+            total_price=total_price,
+            hourly_rate=per_gpu_price,
+            api_type="", # GPUホスティングなのでAPI_TYPEは空
+        ))
     return data_rows
 
 def _parse_sagemaker_api(soup):
@@ -110,28 +111,28 @@ def _parse_sagemaker_api(soup):
     if input_match:
         price_per_1k = float(input_match.group(1))
         price_per_1m = price_per_1k * 1000
-        data_rows.append({
-            "Provider Name": STATIC_PROVIDER_NAME,
-            "Service Provided": "SageMaker API", "Currency": "USD", "Region": "N/A",
-            "API_TYPE": "SageMaker Recommendations - Input",
-            "GPU (H100 or H200 or L40S)": "", "GPU Variant Name": "N/A",
-            "Number of Chips": "N/A", "Memory (GB)": "N/A", "Amount of Storage": "N/A",
-            "Period": "Per 1M Tokens", "Total Price ($)": price_per_1m,
-            "Effective Hourly Rate ($/hr)": "N/A",
-        })
+        data_rows.append(PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME,
+            service_provided="SageMaker API", currency="USD", region="N/A",
+            api_type="SageMaker Recommendations - Input",
+            gpu_family="", gpu_variant="N/A",
+            num_chips="N/A", memory_gb="N/A", amount_of_storage="N/A",
+            period="Per 1M Tokens", total_price=price_per_1m,
+            hourly_rate="N/A",
+        ))
 
     if output_match:
         price_per_1k = float(output_match.group(1))
         price_per_1m = price_per_1k * 1000
-        data_rows.append({
-            "Provider Name": STATIC_PROVIDER_NAME,
-            "Service Provided": "SageMaker API", "Currency": "USD", "Region": "N/A",
-            "API_TYPE": "SageMaker Recommendations - Output",
-            "GPU (H100 or H200 or L40S)": "", "GPU Variant Name": "N/A",
-            "Number of Chips": "N/A", "Memory (GB)": "N/A", "Amount of Storage": "N/A",
-            "Period": "Per 1M Tokens", "Total Price ($)": price_per_1m,
-            "Effective Hourly Rate ($/hr)": "N/A",
-        })
+        data_rows.append(PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME,
+            service_provided="SageMaker API", currency="USD", region="N/A",
+            api_type="SageMaker Recommendations - Output",
+            gpu_family="", gpu_variant="N/A",
+            num_chips="N/A", memory_gb="N/A", amount_of_storage="N/A",
+            period="Per 1M Tokens", total_price=price_per_1m,
+            hourly_rate="N/A",
+        ))
 
     return data_rows
 
@@ -143,23 +144,19 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to AWS EC2 Capacity Blocks: {PRICING_URL_EC2}")
         driver.get(PRICING_URL_EC2)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION_EC2)
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
         
         filename = create_timestamped_filename(PRICING_URL_EC2)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping GPU hosting data from EC2 page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data_list.extend(_parse_ec2_capacity_blocks(soup))
     except Exception as e:
         print(f"An error occurred during AWS EC2 processing: {e}")
@@ -168,23 +165,19 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to AWS SageMaker Pricing: {PRICING_URL_SAGEMAKER}")
         driver.get(PRICING_URL_SAGEMAKER)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver)
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
         
         filename = create_timestamped_filename(PRICING_URL_SAGEMAKER)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping API data from SageMaker page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data_list.extend(_parse_sagemaker_api(soup))
     except Exception as e:
         print(f"An error occurred during AWS SageMaker processing: {e}")
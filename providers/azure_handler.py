@@ -1,10 +1,13 @@
-import time
-from bs4 import BeautifulSoup
 import re
 import json
 from datetime import datetime
+from utils import html_parse, http_fetch, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://azure.microsoft.com/ja-jp/pricing/details/cognitive-services/openai-service/"
+READY_CONDITION = {"selector": "section#pricing"}
+# 価格は静的HTMLの data-amount 属性に含まれるため、データだけならChromeは不要
+FETCH_TIER = http_fetch.TIER_HTTP
 
 STATIC_PROVIDER_NAME = "Azure"
 STATIC_SERVICE_PROVIDED = "Azure OpenAI Service"
@@ -103,43 +106,48 @@ def _fetch_api_prices(soup):
                             elif "画像" in unit_text:
                                 period = "Per 100 Images"
 
-                        final_data.append({
-                            "Provider Name": STATIC_PROVIDER_NAME, "Currency": "USD",
-                            "Service Provided": STATIC_SERVICE_PROVIDED, "Region": "Multiple",
-                            "API_TYPE": api_type.strip(),
-                            "GPU (H100 or H200 or L40S)": "", "GPU Variant Name": "N/A",
-                            "Number of Chips": "N/A", "Memory (GB)": "N/A",
-                            "Amount of Storage": "N/A",
-                            "Period": period,
-                            "Total Price ($)": price,
-                            "Effective Hourly Rate ($/hr)": "N/A",
-                        })
+                        final_data.append(PriceRecord(
+                            provider_name=STATIC_PROVIDER_NAME, currency="USD",
+                            service_provided=STATIC_SERVICE_PROVIDED, region="Multiple",
+                            api_type=api_type.strip(),
+                            gpu_family="", gpu_variant="N/A",
+                            num_chips="N/A", memory_gb="N/A",
+                            amount_of_storage="N/A",
+                            period=period,
+                            total_price=price,
+                            hourly_rate="N/A",
+                        ))
 
     return final_data
 
+def process_data_http():
+    """Chromeを使わずにHTTPでページを取得し、価格データだけを返す"""
+    print(f"Fetching Azure OpenAI Pricing over HTTP: {PRICING_URL}")
+    html_source = http_fetch.fetch_html(PRICING_URL)
+    if not html_source:
+        return []
+    soup = html_parse.parse_html(html_source)
+    return _fetch_api_prices(soup)
+
 def process_data_and_screenshot(driver, output_directory):
     saved_files = []
     scraped_data_list = []
     try:
         print(f"Navigating to Azure OpenAI Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping API pricing data...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data = _fetch_api_prices(soup)
         if scraped_data:
@@ -1,9 +1,10 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.baseten.co/pricing/"
+READY_CONDITION = {"selector": "//p[text()='Dedicated Deployments']"}
 
 STATIC_PROVIDER_NAME = "Baseten"
 
@@ -55,23 +56,23 @@ def _parse_api_section(soup):
         output_price = _parse_price(cols[2].get_text(strip=True))
 
         if input_price is not None:
-            api_data.append({
-                "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "Model APIs",
-                "Currency": "USD", "Region": "N/A", "API_TYPE": f"{model_name} - Input",
-                "GPU (H100 or H200 or L40S)": "", "GPU Variant Name": "N/A",
-                "Number of Chips": "N/A", "Memory (GB)": "N/A", "Amount of Storage": "N/A",
-                "Period": "Per 1M Tokens", "Total Price ($)": input_price,
-                "Effective Hourly Rate ($/hr)": "N/A",
-            })
+            api_data.append(PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME, service_provided="Model APIs",
+                currency="USD", region="N/A", api_type=f"{model_name} - Input",
+                gpu_family="", gpu_variant="N/A",
+                num_chips="N/A", memory_gb="N/A", amount_of_storage="N/A",
+                period="Per 1M Tokens", total_price=input_price,
+                hourly_rate="N/A",
+            ))
         if output_price is not None:
-            api_data.append({
-                "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "Model APIs",
-                "Currency": "USD", "Region": "N/A", "API_TYPE": f"{model_name} - Output",
-                "GPU (H100 or H200 or L40S)": "", "GPU Variant Name": "N/A",
-                "Number of Chips": "N/A", "Memory (GB)": "N/A", "Amount of Storage": "N/A",
-                "Period": "Per 1M Tokens", "Total Price ($)": output_price,
-                "Effective Hourly Rate ($/hr)": "N/A",
-            })
+            api_data.append(PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME, service_provided="Model APIs",
+                currency="USD", region="N/A", api_type=f"{model_name} - Output",
+                gpu_family="", gpu_variant="N/A",
+                num_chips="N/A", memory_gb="N/A", amount_of_storage="N/A",
+                period="Per 1M Tokens", total_price=output_price,
+                hourly_rate="N/A",
+            ))
             
     return api_data
 
@@ -113,15 +114,15 @@ def _parse_gpu_section(soup):
             
         spec_text = cols[0].find('p', class_='text-b-fills-800').get_text(strip=True) if cols[0].find('p', class_='text-b-fills-800') else ""
 
-        gpu_data.append({
-            "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "Dedicated Deployments",
-            "Currency": "USD", "Region": "N/A", "GPU ID": f"baseten_{gpu_variant.replace(' ','_')}",
-            "GPU (H100 or H200 or L40S)": base_chip, "GPU Variant Name": gpu_variant,
-            "Display Name(GPU Type)": f"1x {gpu_variant}", "Memory (GB)": vram,
-            "Amount of Storage": "N/A", "Number of Chips": 1, "Period": "Per Hour",
-            "Total Price ($)": price, "Effective Hourly Rate ($/hr)": price,
-            "API_TYPE": "", "Notes / Features": spec_text,
-        })
+        gpu_data.append(PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME, service_provided="Dedicated Deployments",
+            currency="USD", region="N/A", gpu_id=f"baseten_{gpu_variant.replace(' ','_')}",
+            gpu_family=base_chip, gpu_variant=gpu_variant,
+            display_name=f"1x {gpu_variant}", memory_gb=vram,
+            amount_of_storage="N/A", num_chips=1, period="Per Hour",
+            total_price=price, hourly_rate=price,
+            api_type="", notes=spec_text,
+        ))
     return gpu_data
 
 def process_data_and_screenshot(driver, output_directory):
@@ -130,7 +131,7 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Baseten Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         # --- Seleniumで "Hour" ボタンをクリック ---
         try:
@@ -143,27 +144,23 @@ def process_data_and_screenshot(driver, output_directory):
             hour_button = section_container.find_element("xpath", ".//button[contains(., 'Hour')]")
             driver.execute_script("arguments[0].click();", hour_button)
             print("Successfully switched to hourly pricing.")
-            time.sleep(2) # 表示が切り替わるのを待つ
+            page_wait.wait_for_dom_quiet(driver, timeout=2) # 表示が切り替わるのを待つ
         except Exception as e:
             print(f"Could not switch to hourly pricing, might already be selected or page structure changed: {e}")
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         # --- スクリーンショット撮影 ---
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         # --- データ取得 ---
         print("Scraping data from the page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         # APIとGPUの両方のセクションを解析
         scraped_data_list.extend(_parse_api_section(soup))
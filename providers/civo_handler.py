@@ -1,9 +1,10 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.civo.com/pricing"
+READY_CONDITION = {"selector": "section#nvidia-gpus"}
 
 def get_canonical_variant_and_base_chip_civo(section_title, row_title):
     """
@@ -75,14 +76,14 @@ def fetch_civo_data(soup):
                 price_match = re.search(r'[\d\.]+', price_text)
                 price = float(price_match.group(0)) if price_match else "N/A"
 
-                data_dict = {
-                    "Provider Name": "Civo",
-                    "GPU Variant Name": variation,
-                    "Region": "US/EU",
-                    "GPU (H100 or H200 or L40S)": gpu_type,
-                    "Number of Chips": num_chips,
-                    "Total Price ($)": price
-                }
+                data_dict = PriceRecord(
+                    provider_name="Civo",
+                    gpu_variant=variation,
+                    region="US/EU",
+                    gpu_family=gpu_type,
+                    num_chips=num_chips,
+                    total_price=price
+                )
                 all_data.append(data_dict)
 
     except Exception as e:
@@ -104,23 +105,20 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5) # ページ読み込み待機
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION) # ページ読み込み待機
 
         # フルページのスクリーンショットを撮影
         print("Taking full-page screenshot...")
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
         print("Scraping pricing data from the same page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_civo_data(soup)
 
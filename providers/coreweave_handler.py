@@ -1,13 +1,10 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.coreweave.com/pricing"
+READY_CONDITION = {"selector": "div.table-v2.kubernetes-gpu-pricing", "timeout": 10}
 
 def get_canonical_variant_and_base_chip_coreweave(gpu_name_on_page):
     """
@@ -63,14 +60,14 @@ def fetch_coreweave_data(soup):
             count_match = re.search(r'(\d+)', gpu_count_text)
             num_chips = int(count_match.group(1)) if count_match else 1
             
-            data_dict = {
-                "Provider Name": "CoreWeave",
-                "GPU Variant Name": gpu_name,
-                "Region": "US", # サイトから US Data Centers と判断
-                "GPU (H100 or H200 or L40S)": gpu_type,
-                "Number of Chips": num_chips,
-                "Total Price ($)": price
-            }
+            data_dict = PriceRecord(
+                provider_name="CoreWeave",
+                gpu_variant=gpu_name,
+                region="US", # サイトから US Data Centers と判断
+                gpu_family=gpu_type,
+                num_chips=num_chips,
+                total_price=price
+            )
             all_data.append(data_dict)
 
     except Exception as e:
@@ -97,31 +94,22 @@ def process_data_and_screenshot(driver, output_directory):
         driver.get(PRICING_URL)
         
         # ページの主要な価格テーブルが表示されるまで待機
-        try:
-            print("Waiting for pricing table to load...")
-            wait = WebDriverWait(driver, 10)
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.table-v2.kubernetes-gpu-pricing")))
-            print("Pricing table loaded.")
-        except TimeoutException:
-            print("Pricing table did not load within 10 seconds. Proceeding anyway.")
+        print("Waiting for pricing table to load...")
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         # フルページのスクリーンショットを撮影
         print("Taking full-page screenshot...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
         # 価格テキストの取得
         print("Scraping pricing data from the same page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_coreweave_data(soup)
 
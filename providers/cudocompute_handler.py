@@ -1,11 +1,10 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.cudocompute.com/pricing"
 
@@ -65,14 +64,14 @@ def fetch_cudocompute_data(soup):
             price_match = re.search(r'[\d\.]+', price_text)
             price = float(price_match.group(0)) if price_match else "N/A"
 
-            data_dict = {
-                "Provider Name": "Cudo Compute",
-                "GPU Variant Name": variation,
-                "Region": "Global", # ページに個別記載がないため
-                "GPU (H100 or H200 or L40S)": gpu_type,
-                "Number of Chips": 1, # 1GPUあたりの価格
-                "Total Price ($)": price
-            }
+            data_dict = PriceRecord(
+                provider_name="Cudo Compute",
+                gpu_variant=variation,
+                region="Global", # ページに個別記載がないため
+                gpu_family=gpu_type,
+                num_chips=1, # 1GPUあたりの価格
+                total_price=price
+            )
             all_data.append(data_dict)
 
     except Exception as e:
@@ -107,7 +106,7 @@ def process_data_and_screenshot(driver, output_directory):
             decline_button.click()
             
             # ポップアップが消えるのを少し待つ
-            time.sleep(2)
+            page_wait.wait_for_dom_quiet(driver, timeout=2)
             print("Cookie pop-up dismissed.")
             
         except Exception as e:
@@ -116,20 +115,16 @@ def process_data_and_screenshot(driver, output_directory):
 
         # フルページのスクリーンショットを撮影
         print("Taking full-page screenshot...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         
         print("Scraping pricing data from the same page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_cudocompute_data(soup)
 
@@ -1,13 +1,11 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://datacrunch.io/products"
+READY_CONDITION = {"selector": "ul[data-groups] a"}
 
 def get_canonical_variant_and_base_chip_datacrunch(gpu_name_str):
     """
@@ -65,14 +63,14 @@ def fetch_datacrunch_data(soup, current_gpu_type):
             if price == "N/A":
                 continue
 
-            data_dict = {
-                "Provider Name": "DataCrunch",
-                "GPU Variant Name": variation,
-                "Region": "US/EU", # サイト情報から
-                "GPU (H100 or H200 or L40S)": current_gpu_type, # ボタンから取得した現在のGPUタイプ
-                "Number of Chips": num_chips,
-                "Total Price ($)": price
-            }
+            data_dict = PriceRecord(
+                provider_name="DataCrunch",
+                gpu_variant=variation,
+                region="US/EU", # サイト情報から
+                gpu_family=current_gpu_type, # ボタンから取得した現在のGPUタイプ
+                num_chips=num_chips,
+                total_price=price
+            )
             all_data.append(data_dict)
 
     except Exception as e:
@@ -97,7 +95,7 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5) 
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         # B200, H200, H100, L40S, A100 のボタンをすべて見つける
         gpu_buttons = driver.find_elements(By.XPATH, "//ul[@data-groups]//a")
@@ -114,25 +112,21 @@ def process_data_and_screenshot(driver, output_directory):
                 print(f"--- Processing {gpu_name} section ---")
                 # ボタンをクリックしてテーブルを更新
                 button.click()
-                time.sleep(3) # テーブルが更新されるのを待つ
+                page_wait.wait_for_dom_quiet(driver, timeout=3) # テーブルが更新されるのを待つ
 
                 # スクリーンショット撮影
                 print(f"Taking screenshot for {gpu_name}...")
-                driver.set_window_size(1920, 800)
-                total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-                driver.set_window_size(1920, total_height)
-                time.sleep(1)
 
                 filename = create_timestamped_filename(PRICING_URL, gpu_name)
                 filepath = f"{output_directory}/{filename}"
-                driver.save_screenshot(filepath)
+                screenshot.capture_full_page(driver, filepath)
                 print(f"Successfully saved screenshot to: {filepath}")
                 all_screenshot_paths.append(filepath)
 
                 # 価格データ取得
                 print(f"Scraping data for {gpu_name}...")
                 html_source = driver.page_source
-                soup = BeautifulSoup(html_source, "html.parser")
+                soup = html_parse.parse_html(html_source)
                 scraped_data = fetch_datacrunch_data(soup, gpu_name)
                 all_scraped_data.extend(scraped_data)
 
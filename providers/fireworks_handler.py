@@ -1,9 +1,10 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://fireworks.ai/pricing"
+READY_CONDITION = {"selector": "//h2[text()='Text and Vision']"}
 
 STATIC_PROVIDER_NAME = "Fireworks AI"
 
@@ -58,30 +59,30 @@ def _parse_api_section(soup):
             
             if input_match:
                 price = _parse_price(input_match.group(1))
-                api_data.append({
-                    "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "Serverless API",
-                    "Currency": "USD", "Region": "N/A", "API_TYPE": f"{model_name} - Input",
-                    "GPU (H100 or H200 or L40S)": "", "GPU Variant Name": "N/A", "Number of Chips": "N/A",
-                    "Period": "Per 1M Tokens", "Total Price ($)": price, "Effective Hourly Rate ($/hr)": "N/A",
-                })
+                api_data.append(PriceRecord(
+                    provider_name=STATIC_PROVIDER_NAME, service_provided="Serverless API",
+                    currency="USD", region="N/A", api_type=f"{model_name} - Input",
+                    gpu_family="", gpu_variant="N/A", num_chips="N/A",
+                    period="Per 1M Tokens", total_price=price, hourly_rate="N/A",
+                ))
             if output_match:
                 price = _parse_price(output_match.group(1))
-                api_data.append({
-                    "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "Serverless API",
-                    "Currency": "USD", "Region": "N/A", "API_TYPE": f"{model_name} - Output",
-                    "GPU (H100 or H200 or L40S)": "", "GPU Variant Name": "N/A", "Number of Chips": "N/A",
-                    "Period": "Per 1M Tokens", "Total Price ($)": price, "Effective Hourly Rate ($/hr)": "N/A",
-                })
+                api_data.append(PriceRecord(
+                    provider_name=STATIC_PROVIDER_NAME, service_provided="Serverless API",
+                    currency="USD", region="N/A", api_type=f"{model_name} - Output",
+                    gpu_family="", gpu_variant="N/A", num_chips="N/A",
+                    period="Per 1M Tokens", total_price=price, hourly_rate="N/A",
+                ))
         else:
             # 統一価格の場合
             price = _parse_price(price_text)
             if price is not None:
-                api_data.append({
-                    "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "Serverless API",
-                    "Currency": "USD", "Region": "N/A", "API_TYPE": f"{model_name}",
-                    "GPU (H100 or H200 or L40S)": "", "GPU Variant Name": "N/A", "Number of Chips": "N/A",
-                    "Period": "Per 1M Tokens", "Total Price ($)": price, "Effective Hourly Rate ($/hr)": "N/A",
-                })
+                api_data.append(PriceRecord(
+                    provider_name=STATIC_PROVIDER_NAME, service_provided="Serverless API",
+                    currency="USD", region="N/A", api_type=f"{model_name}",
+                    gpu_family="", gpu_variant="N/A", num_chips="N/A",
+                    period="Per 1M Tokens", total_price=price, hourly_rate="N/A",
+                ))
     return api_data
 
 def _parse_gpu_section(soup):
@@ -105,15 +106,15 @@ def _parse_gpu_section(soup):
         if not base_chip or price is None:
             continue
 
-        gpu_data.append({
-            "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "On-Demand GPU",
-            "Currency": "USD", "Region": "N/A", "GPU ID": f"fireworks_{gpu_variant.replace(' ','_')}",
-            "GPU (H100 or H200 or L40S)": base_chip, "GPU Variant Name": gpu_variant,
-            "Display Name(GPU Type)": f"1x {gpu_variant}", "Memory (GB)": vram,
-            "Number of Chips": 1, "Period": "Per Hour",
-            "Total Price ($)": price, "Effective Hourly Rate ($/hr)": price,
-            "API_TYPE": "",
-        })
+        gpu_data.append(PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME, service_provided="On-Demand GPU",
+            currency="USD", region="N/A", gpu_id=f"fireworks_{gpu_variant.replace(' ','_')}",
+            gpu_family=base_chip, gpu_variant=gpu_variant,
+            display_name=f"1x {gpu_variant}", memory_gb=vram,
+            num_chips=1, period="Per Hour",
+            total_price=price, hourly_rate=price,
+            api_type="",
+        ))
     return gpu_data
 
 def process_data_and_screenshot(driver, output_directory):
@@ -122,23 +123,19 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Fireworks AI Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping data from the page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         # APIとGPUの両方のセクションを解析
         scraped_data_list.extend(_parse_api_section(soup))
@@ -1,9 +1,10 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.fluidstack.io/pricing"
+READY_CONDITION = {"selector": "div.framer-67kbit"}
 
 def get_canonical_variant_and_base_chip_fluidstack(gpu_name):
     """
@@ -64,14 +65,14 @@ def fetch_fluidstack_data(soup):
             if price == "N/A":
                 continue
 
-            data_dict = {
-                "Provider Name": "FluidStack",
-                "GPU Variant Name": variation,
-                "Region": "Global", # ページに個別記載がないため
-                "GPU (H100 or H200 or L40S)": gpu_type,
-                "Number of Chips": 1, # 1GPUあたりの価格
-                "Total Price ($)": price
-            }
+            data_dict = PriceRecord(
+                provider_name="FluidStack",
+                gpu_variant=variation,
+                region="Global", # ページに個別記載がないため
+                gpu_family=gpu_type,
+                num_chips=1, # 1GPUあたりの価格
+                total_price=price
+            )
             all_data.append(data_dict)
 
     except Exception as e:
@@ -96,25 +97,21 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5) 
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         # フルページのスクリーンショットを撮影
         print("Taking full-page screenshot...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
         # 価格テキストの取得
         print("Scraping pricing data from the same page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_fluidstack_data(soup)
 
@@ -1,10 +1,10 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.genesiscloud.com/pricing"
 
@@ -70,14 +70,14 @@ def fetch_genesiscloud_data(soup):
             # GPU単価とチップ数を掛け合わせて、合計価格を計算します
             total_price = price * num_chips if price != "N/A" and isinstance(num_chips, int) else price
             
-            data_dict = {
-                "Provider Name": "Genesis Cloud",
-                "GPU Variant Name": variation,
-                "Region": region,
-                "GPU (H100 or H200 or L40S)": gpu_type,
-                "Number of Chips": num_chips,
-                "Total Price ($)": round(total_price, 4) if isinstance(total_price, float) else total_price
-            }
+            data_dict = PriceRecord(
+                provider_name="Genesis Cloud",
+                gpu_variant=variation,
+                region=region,
+                gpu_family=gpu_type,
+                num_chips=num_chips,
+                total_price=round(total_price, 4) if isinstance(total_price, float) else total_price
+            )
             all_data.append(data_dict)
 
     except Exception as e:
@@ -117,28 +117,24 @@ def process_data_and_screenshot(driver, output_directory):
             close_button.click()
             
             # 処理が完了するのを少し待ちます
-            time.sleep(2)
+            page_wait.wait_for_dom_quiet(driver, timeout=2)
         except Exception as e:
             # その他のエラーが発生した場合
             print(f"Could not close popup. Proceeding anyway. Error: {e}")
 
         # フルページのスクリーンショットを撮影
         print("Taking full-page screenshot...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
         # 価格テキストの取得
         print("Scraping pricing data from the same page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_genesiscloud_data(soup)
 
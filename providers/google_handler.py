@@ -1,78 +1,23 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-from PIL import Image
-import os
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 # --- URL定義 ---
 URL_VERTEX_AI = "https://cloud.google.com/vertex-ai/generative-ai/pricing?hl=en"
 URL_COMPUTE_GPUS = "https://cloud.google.com/compute/gpus-pricing?hl=en"
 
+# --- ページ読み込み完了の条件 ---
+READY_CONDITION_VERTEX_AI = {"selector": "//*[contains(text(), 'Gemini')]", "timeout": 15}
+READY_CONDITION_COMPUTE_GPUS = {"selector": "cloudx-pricing-table", "timeout": 15}
+
+# ページ本体は main.devsite-main-content の内部でスクロールし、固定ヘッダー/フッターが写り込むため非表示にする
+SCREENSHOT_OPTIONS = {"container_selector": "main.devsite-main-content", "hide_selectors": ["devsite-header", "devsite-footer"]}
+
 # --- 静的情報 ---
 STATIC_PROVIDER_NAME = "Google Cloud"
 CHARS_PER_TOKEN_ESTIMATE = 4 # 1トークンあたりの文字数の推定値
 
-def _take_scrolling_screenshot_gcp(driver, filepath):
-    """
-    Google Cloudのページ特有の内部スクロールと固定ヘッダーに対応した、
-    スクロール＆結合スクリーンショットを撮影する。
-    """
-    print("Taking scrolling screenshot for GCP page...")
-
-    try:
-        driver.execute_script("const header = document.querySelector('devsite-header'); if (header) header.style.display = 'none';")
-        driver.execute_script("const footer = document.querySelector('devsite-footer'); if (footer) footer.style.display = 'none';")
-    except Exception as e:
-        print(f"Could not hide header/footer, screenshot may have repeated elements: {e}")
-
-    try:
-        driver.set_window_size(1920, 1080)
-        time.sleep(2)
-        
-        scroll_container_selector = "document.querySelector('main.devsite-main-content')"
-        total_height = driver.execute_script(f"const el = {scroll_container_selector}; return el ? el.scrollHeight : document.body.parentNode.scrollHeight")
-        viewport_height = driver.execute_script("return window.innerHeight")
-        
-        stitched_image = Image.new('RGB', (1920, total_height))
-        
-        scroll_position = 0
-        while scroll_position < total_height:
-            driver.execute_script(f"const el = {scroll_container_selector}; if (el) el.scrollTo(0, {scroll_position}); else window.scrollTo(0, {scroll_position});")
-            time.sleep(0.5)
-
-            temp_screenshot_path = os.path.join(os.path.dirname(filepath), "temp_screenshot.png")
-            driver.save_screenshot(temp_screenshot_path)
-            
-            screenshot_part = Image.open(temp_screenshot_path)
-            
-            paste_height = min(viewport_height, total_height - scroll_position)
-            screenshot_part = screenshot_part.crop((0, 0, 1920, paste_height))
-
-            stitched_image.paste(screenshot_part, (0, scroll_position))
-            
-            scroll_position += viewport_height
-
-        stitched_image.save(filepath)
-        print(f"Scrolling screenshot saved to: {filepath}")
-        
-        if os.path.exists(temp_screenshot_path):
-            os.remove(temp_screenshot_path)
-            
-    except Exception as e:
-        print(f"Failed to take scrolling screenshot: {e}")
-        driver.save_screenshot(filepath)
-    finally:
-        try:
-            driver.execute_script("const header = document.querySelector('devsite-header'); if (header) header.style.display = 'block';")
-            driver.execute_script("const footer = document.querySelector('devsite-footer'); if (footer) footer.style.display = 'block';")
-        except Exception:
-            pass
-
 def create_timestamped_filename(url):
     url_without_query = url.split('?')[0]
     base_name = url_without_query.replace("https://", "").replace("http://", "").replace("www.", "")
@@ -150,13 +95,13 @@ def _parse_vertex_ai_api(soup):
                 else: # 1M tokens or 1k characters
                     final_price = input_price_val if "token" in price_unit_text else (input_price_val * CHARS_PER_TOKEN_ESTIMATE * 1000)
 
-                api_data.append({
-                    "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "Vertex AI API",
-                    "Currency": "USD", "Region": "Multiple",
-                    "API_TYPE": f"{model_name} ({feature}) - Input",
-                    "GPU (H100 or H200 or L40S)": "", "Period": period,
-                    "Total Price ($)": round(final_price, 6),
-                })
+                api_data.append(PriceRecord(
+                    provider_name=STATIC_PROVIDER_NAME, service_provided="Vertex AI API",
+                    currency="USD", region="Multiple",
+                    api_type=f"{model_name} ({feature}) - Input",
+                    gpu_family="", period=period,
+                    total_price=round(final_price, 6),
+                ))
 
             # --- Output価格の処理 (Inputと同様) ---
             if (output_price_val := _parse_price(output_text)) is not None:
@@ -172,13 +117,13 @@ def _parse_vertex_ai_api(soup):
                 else: # 1M tokens or 1k characters
                     final_price = output_price_val if "token" in price_unit_text else (output_price_val * CHARS_PER_TOKEN_ESTIMATE * 1000)
 
-                api_data.append({
-                    "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "Vertex AI API",
-                    "Currency": "USD", "Region": "Multiple",
-                    "API_TYPE": f"{model_name} ({feature}) - Output",
-                    "GPU (H100 or H200 or L40S)": "", "Period": period,
-                    "Total Price ($)": round(final_price, 6),
-                })
+                api_data.append(PriceRecord(
+                    provider_name=STATIC_PROVIDER_NAME, service_provided="Vertex AI API",
+                    currency="USD", region="Multiple",
+                    api_type=f"{model_name} ({feature}) - Output",
+                    gpu_family="", period=period,
+                    total_price=round(final_price, 6),
+                ))
     return api_data
 
 def _parse_compute_engine_gpu(soup):
@@ -200,15 +145,15 @@ def _parse_compute_engine_gpu(soup):
         ondemand_price = _parse_price(cols[2].get_text(strip=True))
 
         if "H100" in gpu_model and ondemand_price is not None:
-            gpu_data.append({
-                "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "Compute Engine GPU",
-                "Currency": "USD", "Region": region, "GPU ID": f"gcp_{gpu_model.replace(' ','-')}",
-                "GPU (H100 or H200 or L40S)": "H100", "GPU Variant Name": "H100 80GB",
-                "Display Name(GPU Type)": f"1x {gpu_model}", "Memory (GB)": 80,
-                "Number of Chips": 1, "Period": "Per Hour",
-                "Total Price ($)": ondemand_price, "Effective Hourly Rate ($/hr)": ondemand_price,
-                "API_TYPE": "",
-            })
+            gpu_data.append(PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME, service_provided="Compute Engine GPU",
+                currency="USD", region=region, gpu_id=f"gcp_{gpu_model.replace(' ','-')}",
+                gpu_family="H100", gpu_variant="H100 80GB",
+                display_name=f"1x {gpu_model}", memory_gb=80,
+                num_chips=1, period="Per Hour",
+                total_price=ondemand_price, hourly_rate=ondemand_price,
+                api_type="",
+            ))
     return gpu_data
 
 def process_data_and_screenshot(driver, output_directory):
@@ -220,24 +165,17 @@ def process_data_and_screenshot(driver, output_directory):
         print(f"Navigating to Google Vertex AI Pricing: {URL_VERTEX_AI}")
         driver.get(URL_VERTEX_AI)
         print("Waiting for Vertex AI pricing table to load...")
-        try:
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Gemini')]"))
-            )
-            print("Pricing table loaded.")
-        except TimeoutException:
+        if not page_wait.wait_for_page_ready(driver, **READY_CONDITION_VERTEX_AI):
             print("WARNING (Google Vertex AI): Timed out waiting for pricing table to load. Scraping may fail.")
         
-        time.sleep(3)
-        
         filename = create_timestamped_filename(URL_VERTEX_AI)
         filepath = f"{output_directory}/{filename}"
-        _take_scrolling_screenshot_gcp(driver, filepath)
+        screenshot.capture_full_page(driver, filepath, **SCREENSHOT_OPTIONS)
         saved_files.append(filepath)
 
         print("Scraping API data from Vertex AI page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data_list.extend(_parse_vertex_ai_api(soup))
     except Exception as e:
         print(f"An error occurred during Google Vertex AI processing: {e}")
@@ -247,25 +185,18 @@ def process_data_and_screenshot(driver, output_directory):
         print(f"Navigating to Google Compute Engine GPU Pricing: {URL_COMPUTE_GPUS}")
         driver.get(URL_COMPUTE_GPUS)
 
-        try:
-            # このページは<cloudx-pricing-table>というカスタム要素が読み込まれるのを待つ
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "cloudx-pricing-table"))
-            )
-            print("Pricing table loaded.")
-        except TimeoutException:
+        # このページは<cloudx-pricing-table>というカスタム要素が読み込まれるのを待つ
+        if not page_wait.wait_for_page_ready(driver, **READY_CONDITION_COMPUTE_GPUS):
             print("WARNING (Google Compute GPU): Timed out waiting for pricing table to load. Scraping may fail.")
-
-        time.sleep(3)
         
         filename = create_timestamped_filename(URL_COMPUTE_GPUS)
         filepath = f"{output_directory}/{filename}"
-        _take_scrolling_screenshot_gcp(driver, filepath)
+        screenshot.capture_full_page(driver, filepath, **SCREENSHOT_OPTIONS)
         saved_files.append(filepath)
 
         print("Scraping GPU hosting data from Compute Engine page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data_list.extend(_parse_compute_engine_gpu(soup))
     except Exception as e:
         print(f"An error occurred during Google Compute Engine processing: {e}")
@@ -1,9 +1,10 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://groq.com/pricing"
+READY_CONDITION = {"selector": "#pricing-table-llms table"}
 
 STATIC_PROVIDER_NAME = "Groq"
 CHARS_PER_TOKEN_ESTIMATE = 4 # 1トークンあたりの文字数の推定値
@@ -39,17 +40,17 @@ def _parse_llm_table(soup):
         output_price = _parse_price(cols[3].get_text(strip=True))
 
         if input_price is not None:
-            llm_data.append({
-                "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "LLM API",
-                "Currency": "USD", "API_TYPE": f"{model_name} - Input",
-                "Period": "Per 1M Tokens", "Total Price ($)": input_price,
-            })
+            llm_data.append(PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME, service_provided="LLM API",
+                currency="USD", api_type=f"{model_name} - Input",
+                period="Per 1M Tokens", total_price=input_price,
+            ))
         if output_price is not None:
-            llm_data.append({
-                "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "LLM API",
-                "Currency": "USD", "API_TYPE": f"{model_name} - Output",
-                "Period": "Per 1M Tokens", "Total Price ($)": output_price,
-            })
+            llm_data.append(PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME, service_provided="LLM API",
+                currency="USD", api_type=f"{model_name} - Output",
+                period="Per 1M Tokens", total_price=output_price,
+            ))
     return llm_data
 
 def _parse_tts_table(soup):
@@ -69,12 +70,12 @@ def _parse_tts_table(soup):
             # 100万文字あたりの価格を、100万トークンあたりの価格に推定変換
             price_per_m_tokens = price_per_m_chars * CHARS_PER_TOKEN_ESTIMATE
             
-            tts_data.append({
-                "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "TTS API",
-                "Currency": "USD", "API_TYPE": f"{model_name} (TTS)",
-                "Period": "Per 1M Tokens (from Chars)", "Total Price ($)": price_per_m_tokens,
-                "Notes / Features": f"Original price: ${price_per_m_chars}/1M Chars"
-            })
+            tts_data.append(PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME, service_provided="TTS API",
+                currency="USD", api_type=f"{model_name} (TTS)",
+                period="Per 1M Tokens (from Chars)", total_price=price_per_m_tokens,
+                notes=f"Original price: ${price_per_m_chars}/1M Chars"
+            ))
     return tts_data
 
 def _parse_asr_table(soup):
@@ -91,11 +92,11 @@ def _parse_asr_table(soup):
         price_per_hour = _parse_price(cols[2].get_text(strip=True))
 
         if price_per_hour is not None:
-            asr_data.append({
-                "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "ASR API",
-                "Currency": "USD", "API_TYPE": f"{model_name} (ASR)",
-                "Period": "Per Hour Transcribed", "Total Price ($)": price_per_hour,
-            })
+            asr_data.append(PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME, service_provided="ASR API",
+                currency="USD", api_type=f"{model_name} (ASR)",
+                period="Per Hour Transcribed", total_price=price_per_hour,
+            ))
     return asr_data
 
 def process_data_and_screenshot(driver, output_directory):
@@ -104,23 +105,19 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Groq Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping data from the page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         # 各セクションを解析してデータを結合
         scraped_data_list.extend(_parse_llm_table(soup))
@@ -1,10 +1,11 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
 from selenium.webdriver.common.by import By
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://lambda.ai/service/gpu-cloud"
+READY_CONDITION = {"selector": "button.comp-tabbed-content__tab-btn"}
 
 # --- Helper Functions (コメントアウトされていたものを活用・修正) ---
 
@@ -86,14 +87,14 @@ def fetch_lambda_labs_data(soup):
             # インスタンス全体の時間単価を計算
             total_instance_price = num_chips * price_per_gpu_hr
             
-            data_dict = {
-                "Provider Name": "Lambda Labs",
-                "GPU Variant Name": gpu_name_full_str,
-                "Region": "US (TX, CA, UT)", # サイト情報から
-                "GPU (H100 or H200 or L40S)": gpu_family,
-                "Number of Chips": num_chips,
-                "Total Price ($)": round(total_instance_price, 2)
-            }
+            data_dict = PriceRecord(
+                provider_name="Lambda Labs",
+                gpu_variant=gpu_name_full_str,
+                region="US (TX, CA, UT)", # サイト情報から
+                gpu_family=gpu_family,
+                num_chips=num_chips,
+                total_price=round(total_instance_price, 2)
+            )
             all_data.append(data_dict)
             
     return all_data
@@ -111,7 +112,7 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5) 
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         # 1. 8x, 4x, 2x, 1x のタブボタンをすべて見つける
         tab_buttons = driver.find_elements(By.CSS_SELECTOR, "button.comp-tabbed-content__tab-btn")
@@ -126,14 +127,10 @@ def process_data_and_screenshot(driver, output_directory):
                 # ボタンをクリックして表示を切り替え
                 driver.execute_script("arguments[0].click();", button)
                 # 表示が切り替わるのを少し待つ
-                time.sleep(2)
+                page_wait.wait_for_dom_quiet(driver, timeout=2)
 
                 # フルページのスクリーンショットを撮影
                 print(f"Taking full-page screenshot for {tab_name} tab...")
-                driver.set_window_size(1920, 800)
-                total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-                driver.set_window_size(1920, total_height)
-                time.sleep(1)
 
                 # タブ名を含めたユニークなファイル名を生成
                 base_name = PRICING_URL.replace("https://", "").replace("www.", "").replace("/", "_")
@@ -141,7 +138,7 @@ def process_data_and_screenshot(driver, output_directory):
                 filename = f"{base_name}_{tab_name}_{timestamp}.png"
                 filepath = f"{output_directory}/{filename}"
                 
-                driver.save_screenshot(filepath)
+                screenshot.capture_full_page(driver, filepath)
                 print(f"Successfully saved screenshot to: {filepath}")
                 
                 # 成功したファイルパスをリストに追加
@@ -153,7 +150,7 @@ def process_data_and_screenshot(driver, output_directory):
         # 価格テキストの取得（これは1回だけでOK。全タブのHTMLは最初から読み込まれているため）
         print("Scraping pricing data from the page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data_list = fetch_lambda_labs_data(soup)
 
         # 収集したファイルパスのリストと、価格データのリストを返す
@@ -1,9 +1,10 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.liquidweb.com/gpu-hosting/"
+READY_CONDITION = {"selector": "div.kt-row-column-wrap"}
 
 def get_canonical_variant_and_base_chip_liquidweb(gpu_name):
     """
@@ -68,14 +69,14 @@ def fetch_liquidweb_data(soup):
             size_match = re.search(r"\(x(\d+)\)", variation, re.IGNORECASE)
             num_chips = int(size_match.group(1)) if size_match else 1
             
-            data_dict = {
-                "Provider Name": "Liquid Web",
-                "GPU Variant Name": variation,
-                "Region": "US/EU", # データセンター情報から
-                "GPU (H100 or H200 or L40S)": gpu_type,
-                "Number of Chips": num_chips,
-                "Total Price ($)": price
-            }
+            data_dict = PriceRecord(
+                provider_name="Liquid Web",
+                gpu_variant=variation,
+                region="US/EU", # データセンター情報から
+                gpu_family=gpu_type,
+                num_chips=num_chips,
+                total_price=price
+            )
             all_data.append(data_dict)
 
     except Exception as e:
@@ -100,25 +101,21 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5) 
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         # フルページのスクリーンショットを撮影
         print("Taking full-page screenshot...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
         # 価格テキストの取得
         print("Scraping pricing data from the same page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_liquidweb_data(soup)
 
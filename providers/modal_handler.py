@@ -1,11 +1,11 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://modal.com/pricing"
 
@@ -68,14 +68,14 @@ def fetch_modal_data(soup):
             size_match = re.match(r'(\d+)x', variation, re.IGNORECASE)
             num_chips = int(size_match.group(1)) if size_match else 1
 
-            data_dict = {
-                "Provider Name": "Modal",
-                "GPU Variant Name": variation,
-                "Region": "Global", # ページに個別記載がないため
-                "GPU (H100 or H200 or L40S)": gpu_type,
-                "Number of Chips": num_chips,
-                "Total Price ($)": price
-            }
+            data_dict = PriceRecord(
+                provider_name="Modal",
+                gpu_variant=variation,
+                region="Global", # ページに個別記載がないため
+                gpu_family=gpu_type,
+                num_chips=num_chips,
+                total_price=price
+            )
             all_data.append(data_dict)
 
     except Exception as e:
@@ -100,7 +100,7 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(3)
+        page_wait.wait_for_page_ready(driver, timeout=3)
 
         # --- Modal特有の操作 ---
         try:
@@ -119,26 +119,22 @@ def process_data_and_screenshot(driver, output_directory):
             
             print("'Per hour' button found. Clicking it.")
             hour_button.click()
-            time.sleep(2) # 価格が更新されるのを待つ
+            page_wait.wait_for_dom_quiet(driver, timeout=2) # 価格が更新されるのを待つ
         except TimeoutException:
             print("Could not find the 'Per hour' button. It might be active by default or the page structure has changed.")
             
         # --- スクリーンショット撮影とデータ取得 ---
         print("Taking full-page screenshot...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
         print("Scraping pricing data from the same page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_modal_data(soup)
 
@@ -1,11 +1,11 @@
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.neevcloud.com/pricing.php"
 
@@ -78,14 +78,14 @@ def fetch_neevcloud_data(soup):
                 # インスタンス全体の価格を計算 (価格は per GPU 表記のため)
                 total_instance_price = price * num_chips
 
-                data_dict = {
-                    "Provider Name": "NeevCloud",
-                    "GPU Variant Name": variation,
-                    "Region": "US, India", # サイト情報から
-                    "GPU (H100 or H200 or L40S)": gpu_type,
-                    "Number of Chips": num_chips,
-                    "Total Price ($)": round(total_instance_price, 2)
-                }
+                data_dict = PriceRecord(
+                    provider_name="NeevCloud",
+                    gpu_variant=variation,
+                    region="US, India", # サイト情報から
+                    gpu_family=gpu_type,
+                    num_chips=num_chips,
+                    total_price=round(total_instance_price, 2)
+                )
                 all_data.append(data_dict)
 
     except Exception as e:
@@ -121,26 +121,22 @@ def process_data_and_screenshot(driver, output_directory):
             )
             print("Pop-up found. Clicking the close button.")
             close_button.click()
-            time.sleep(2)
+            page_wait.wait_for_dom_quiet(driver, timeout=2)
         except TimeoutException:
             print("Pop-up not found. Proceeding anyway.")
             
         # --- スクリーンショット撮影とデータ取得 ---
         print("Taking full-page screenshot...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
         print("Scraping pricing data from the same page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_neevcloud_data(soup)
 
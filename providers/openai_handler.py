@@ -1,7 +1,7 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://openai.com/ja-JP/api/pricing/"
 
@@ -57,14 +57,14 @@ def _parse_cards_section(soup, section_header_text):
                 if "ファインチューニング" in section_header_text:
                     api_type_prefix += " - Fine-tuning"
 
-                data.append({
-                    "Provider Name": STATIC_PROVIDER_NAME,
-                    "Service Provided": "OpenAI API",
-                    "Currency": "USD",
-                    "API_TYPE": f"{api_type_prefix} - {price_type}",
-                    "Period": "Per 1M Tokens",
-                    "Total Price ($)": price,
-                })
+                data.append(PriceRecord(
+                    provider_name=STATIC_PROVIDER_NAME,
+                    service_provided="OpenAI API",
+                    currency="USD",
+                    api_type=f"{api_type_prefix} - {price_type}",
+                    period="Per 1M Tokens",
+                    total_price=price,
+                ))
     return data
 
 def _parse_our_api_section(soup):
@@ -117,14 +117,14 @@ def _parse_our_api_section(soup):
                     else: continue
 
                     if price is not None:
-                        data.append({
-                            "Provider Name": STATIC_PROVIDER_NAME,
-                            "Service Provided": "OpenAI API",
-                            "Currency": "USD",
-                            "API_TYPE": f"{api_name} - {modality_name} - {model_name} - {price_type}",
-                            "Period": "Per 1M Tokens",
-                            "Total Price ($)": price,
-                        })
+                        data.append(PriceRecord(
+                            provider_name=STATIC_PROVIDER_NAME,
+                            service_provided="OpenAI API",
+                            currency="USD",
+                            api_type=f"{api_name} - {modality_name} - {model_name} - {price_type}",
+                            period="Per 1M Tokens",
+                            total_price=price,
+                        ))
 
     return data
 
@@ -134,23 +134,19 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to OpenAI Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver)
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping data from the page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         # 各セクションを解析してデータを結合
         scraped_data_list.extend(_parse_cards_section(soup, "フラッグシップモデル"))
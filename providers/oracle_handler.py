@@ -1,9 +1,10 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.oracle.com/artificial-intelligence/generative-ai/generative-ai-service/pricing/"
+READY_CONDITION = {"selector": "table[aria-labelledby='apex']"}
 
 STATIC_PROVIDER_NAME = "Oracle"
 STATIC_SERVICE_PROVIDED = "OCI Generative AI"
@@ -63,14 +64,14 @@ def _fetch_api_prices(soup):
         else:
              model_name = model_name_raw
 
-        api_data.append({
-            "Provider Name": STATIC_PROVIDER_NAME,
-            "Service Provided": STATIC_SERVICE_PROVIDED,
-            "Currency": "USD",
-            "API_TYPE": f"{model_name} - {price_type}",
-            "Period": "Per 1M Tokens",
-            "Total Price ($)": price,
-        })
+        api_data.append(PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME,
+            service_provided=STATIC_SERVICE_PROVIDED,
+            currency="USD",
+            api_type=f"{model_name} - {price_type}",
+            period="Per 1M Tokens",
+            total_price=price,
+        ))
 
     return api_data
 
@@ -80,23 +81,19 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Oracle AI Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping data from the page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data = _fetch_api_prices(soup)
         
@@ -1,11 +1,14 @@
-import requests
-import json
-from bs4 import BeautifulSoup
 import re
-from datetime import datetime, timezone
-import time
+from datetime import datetime
+from utils import html_parse, http_fetch, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 RUNPOD_PRICING_URL = "https://www.runpod.io/pricing"
+READY_CONDITION = {"selector": ".gpu-pricing-table__list .gpu-pricing-row"}
+# 価格はサーバー側で描画済みのHTML (data-secure-cloud-price) に含まれるため、データだけならChromeは不要
+FETCH_TIER = http_fetch.TIER_HTTP
+# The old script generated rows for 1, 2, 4, 8 chips. We continue this for on-demand.
+CHIP_COUNTS = (1, 2, 4, 8)
 HOURS_IN_MONTH = 730 # Maintained for consistency, though not used for price calculation
 
 # --- Static text and helper functions remain largely the same ---
@@ -101,39 +104,30 @@ def fetch_runpod_data(soup):
             six_month_discount_hourly = "N/A"
             twelve_month_discount_hourly = "N/A"
             
-            base_info_for_row = {
-                "Provider Name": provider_name_for_sheet,
-                "Currency": "USD",
-                "Service Provided": STATIC_SERVICE_PROVIDED_RUNPOD,
-                "Region": STATIC_REGION_INFO_RUNPOD,
-                "GPU ID": gpu_id_from_runpod,
-                "GPU (H100 or H200 or L40S)": base_chip_category,
-                "Memory (GB)": specs['vram'],
-                "Display Name(GPU Type)": display_name_from_runpod,
-                "GPU Variant Name": canonical_variant_name,
-                "Storage Option": STATIC_STORAGE_OPTION_RUNPOD,
-                "Amount of Storage": STATIC_AMOUNT_OF_STORAGE_RUNPOD,
-                "Network Performance (Gbps)": STATIC_NETWORK_PERFORMANCE_RUNPOD,
-                "Commitment Discount - 1 Month Price ($/hr per GPU)": one_month_discount_hourly,
-                "Commitment Discount - 3 Month Price ($/hr per GPU)": three_month_discount_hourly,
-                "Commitment Discount - 6 Month Price ($/hr per GPU)": six_month_discount_hourly,
-                "Commitment Discount - 12 Month Price ($/hr per GPU)": twelve_month_discount_hourly,
-                "Notes / Features": f"Variant: {canonical_variant_name}. System RAM: {specs['ram']}GB. vCPUs: {specs['vcpu']}."
-            }
-
-            # --- Generate rows for different chip counts and periods ---
-            # The old script generated rows for 1, 2, 4, 8 chips. We continue this for on-demand.
-            for num_chips_to_calc in [1, 2, 4, 8]:
-                # --- Per Hour ---
-                total_hourly_price_numeric = base_1x_hourly_price * num_chips_to_calc
-                row_hourly_data = {
-                    **base_info_for_row,
-                    "Number of Chips": num_chips_to_calc,
-                    "Period": "Per Hour",
-                    "Total Price ($)": round(total_hourly_price_numeric, 4),
-                    "Effective Hourly Rate ($/hr)": round(base_1x_hourly_price, 4)
-                }
-                final_sheet_rows_unpivoted.append(row_hourly_data)
+            base_record = PriceRecord(
+                provider_name=provider_name_for_sheet,
+                currency="USD",
+                service_provided=STATIC_SERVICE_PROVIDED_RUNPOD,
+                region=STATIC_REGION_INFO_RUNPOD,
+                gpu_id=gpu_id_from_runpod,
+                gpu_family=base_chip_category,
+                memory_gb=specs['vram'],
+                display_name=display_name_from_runpod,
+                gpu_variant=canonical_variant_name,
+                storage_option=STATIC_STORAGE_OPTION_RUNPOD,
+                amount_of_storage=STATIC_AMOUNT_OF_STORAGE_RUNPOD,
+                network_performance=STATIC_NETWORK_PERFORMANCE_RUNPOD,
+                commitment_1_month=one_month_discount_hourly,
+                commitment_3_month=three_month_discount_hourly,
+                commitment_6_month=six_month_discount_hourly,
+                commitment_12_month=twelve_month_discount_hourly,
+                notes=f"Variant: {canonical_variant_name}. System RAM: {specs['ram']}GB. vCPUs: {specs['vcpu']}.",
+                period="Per Hour",
+                hourly_rate=base_1x_hourly_price,
+                # 1, 2, 4, 8 chips の行は出力時に展開する（ここでは1GPUあたりの行だけを持つ）
+                chip_counts=CHIP_COUNTS
+            )
+            final_sheet_rows_unpivoted.append(base_record)
         
         except Exception as e:
             print(f"ERROR (RunPod): Failed to process a row. DisplayName: {display_name_from_runpod}. Error: {e}")
@@ -141,8 +135,8 @@ def fetch_runpod_data(soup):
             traceback.print_exc()
 
     if final_sheet_rows_unpivoted:
-        num_base_offerings = len(set(row["GPU ID"] for row in final_sheet_rows_unpivoted))
-        print(f"RunPod: Processed and unpivoted data for {num_base_offerings} base GPU offerings, generating {len(final_sheet_rows_unpivoted)} total rows.")
+        num_rows = sum(record.row_count() for record in final_sheet_rows_unpivoted)
+        print(f"RunPod: Processed {len(final_sheet_rows_unpivoted)} base GPU offerings ({num_rows} rows once expanded by chip count).")
     else:
         print("RunPod: No target GPU offerings (H100, H200, L40S) found in the new HTML.")
         
@@ -153,6 +147,15 @@ def create_timestamped_filename(url):
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     return f"{base_name}_{timestamp}.png"
 
+def process_data_http():
+    """Chromeを使わずにHTTPでページを取得し、価格データだけを返す"""
+    print(f"Fetching RunPod over HTTP: {RUNPOD_PRICING_URL}")
+    html_source = http_fetch.fetch_html(RUNPOD_PRICING_URL)
+    if not html_source:
+        return []
+    soup = html_parse.parse_html(html_source)
+    return fetch_runpod_data(soup)
+
 def process_data_and_screenshot(driver, output_directory):
     filepath = None
     scraped_data_list = []
@@ -160,25 +163,22 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to RunPod: {RUNPOD_PRICING_URL}")
         driver.get(RUNPOD_PRICING_URL)
-        time.sleep(5) # ページ読み込み待機
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION) # ページ読み込み待機
 
         # フルページのスクリーンショットを撮影
         print("Taking full-page screenshot of RunPod...")
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(RUNPOD_PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved RunPod screenshot to: {filepath}")
 
         # --- 2. 価格テキストの取得 ---
         print("Scraping pricing data from the same page...")
         # 今見ているページのHTMLを取得
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_runpod_data(soup)
         
@@ -1,13 +1,13 @@
 # providers/sakura_internet_handler.py
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-from currency_converter import CurrencyConverter
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 # --- URL定義 ---
 # こちらのページからのみ価格を取得する
 SAKURA_CLOUD_GPU_URL = "https://cloud.sakura.ad.jp/products/server/gpu/" 
+READY_CONDITION_CLOUD_GPU = {"selector": "table.price-list_02"}
 # こちらのページは価格情報がないため、スクリーンショットのみ
 SAKURA_KOUKARYOKU_URL = "https://www.sakura.ad.jp/koukaryoku-phy/"
 
@@ -66,24 +66,20 @@ def _fetch_cloud_gpu_data(soup):
             hourly_price_match = re.search(r'([\d,]+)円', hourly_price_text)
             hourly_price = float(hourly_price_match.group(1).replace(',', '')) if hourly_price_match else 0
             
-            base_info_for_row = {
-                "Provider Name": STATIC_PROVIDER_NAME,
-                "Currency": "JPY",
-                "Service Provided": STATIC_SERVICE_PROVIDED,
-                "Region": STATIC_REGION_INFO,
-                "GPU ID": display_name,
-                "GPU (H100 or H200 or L40S)": base_chip_category,
-                "Display Name(GPU Type)": display_name,
-                "GPU Variant Name": gpu_variant_name,
-            }
-            
-            row_hourly_data = {
-                **base_info_for_row,
-                "Number of Chips": num_chips,
-                "Period": "Per Hour",
-                "Total Price ($)": hourly_price, # JPY
-                "Effective Hourly Rate ($/hr)": hourly_price / num_chips # JPY
-            }
+            row_hourly_data = PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME,
+                currency="JPY",
+                service_provided=STATIC_SERVICE_PROVIDED,
+                region=STATIC_REGION_INFO,
+                gpu_id=display_name,
+                gpu_family=base_chip_category,
+                display_name=display_name,
+                gpu_variant=gpu_variant_name,
+                num_chips=num_chips,
+                period="Per Hour",
+                total_price=hourly_price, # JPY
+                hourly_rate=hourly_price / num_chips # JPY
+            )
             final_sheet_rows_unpivoted.append(row_hourly_data)
 
         except Exception as e:
@@ -97,29 +93,24 @@ def _fetch_cloud_gpu_data(soup):
 def process_data_and_screenshot(driver, output_directory):
     saved_files = []
     scraped_data_list = []
-    c = CurrencyConverter()
 
     # --- 1. さくらのクラウドGPU ---
     try:
         print(f"Navigating to SAKURA Cloud GPU: {SAKURA_CLOUD_GPU_URL}")
         driver.get(SAKURA_CLOUD_GPU_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION_CLOUD_GPU)
 
         print("Taking full-page screenshot of SAKURA Cloud GPU...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(SAKURA_CLOUD_GPU_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping pricing data from SAKURA Cloud GPU page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         # データ取得関数を呼び出し
         scraped_data = _fetch_cloud_gpu_data(soup)
@@ -135,17 +126,13 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to SAKURA Koukaryoku PHY: {SAKURA_KOUKARYOKU_URL}")
         driver.get(SAKURA_KOUKARYOKU_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver)
         
         print("Taking full-page screenshot of SAKURA Koukaryoku PHY...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(SAKURA_KOUKARYOKU_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
         
@@ -154,26 +141,5 @@ def process_data_and_screenshot(driver, output_directory):
         import traceback
         traceback.print_exc()
 
-    # --- 3. 通貨変換処理 ---
-    final_data_usd = []
-    if scraped_data_list:
-        print(f"Converting {len(scraped_data_list)} rows from JPY to USD...")
-        for data in scraped_data_list:
-            try:
-                # 元の価格を取得
-                original_price = data["Total Price ($)"]
-                original_rate = data["Effective Hourly Rate ($/hr)"]
-                
-                # USDに変換
-                usd_price = c.convert(original_price, 'JPY', 'USD')
-                usd_rate = c.convert(original_rate, 'JPY', 'USD')
-                
-                # データをUSDの値で更新
-                data["Total Price ($)"] = round(usd_price, 4)
-                data["Effective Hourly Rate ($/hr)"] = round(usd_rate, 4)
-                data["Currency"] = "USD"
-                final_data_usd.append(data)
-            except Exception as e:
-                print(f"Currency conversion failed for row {data.get('GPU ID')}: {e}. Skipping row.")
-
+    # JPYの価格は main でまとめてUSDに変換する（utils.exchange_rates）
     return saved_files, scraped_data_list
\ No newline at end of file
@@ -1,75 +1,16 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-from PIL import Image
-import os 
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://cloud.sambanova.ai/plans/pricing"
+READY_CONDITION = {"selector": "div.MuiDataGrid-root"}
+# このページのスクロールは <div class="MuiBox-root mui-1xhhxu7"> で行われるため、サイドバーを除いたその部分だけを撮影する
+SCREENSHOT_OPTIONS = {"container_selector": "div.mui-1xhhxu7", "clip_to_container": True}
 
 STATIC_PROVIDER_NAME = "SambaNova"
 STATIC_SERVICE_PROVIDED = "SambaNova API"
 
-def _take_scrolling_screenshot_samba(driver, filepath):
-    """
-    SambaNovaのページ特有の内部スクロールとレイアウトに対応した、
-    スクロール＆結合スクリーンショットを撮影する。
-    """
-    print("Taking scrolling screenshot for SambaNova page...")
-    try:
-        driver.set_window_size(1920, 1080)
-        time.sleep(2)
-        
-        # --- スクロール対象のコンテナを特定 ---
-        # このページのスクロールは <div class="MuiBox-root mui-1xhhxu7"> で行われる
-        scroll_container_selector = "document.querySelector('div.mui-1xhhxu7')"
-        
-        # スクロール領域の高さを取得
-        total_height = driver.execute_script(f"return {scroll_container_selector}.scrollHeight")
-        viewport_height = driver.execute_script("return window.innerHeight")
-
-        # サイドバーの幅を除いたメインコンテンツの幅を取得
-        main_content_width = driver.execute_script(f"return {scroll_container_selector}.clientWidth")
-        
-        stitched_image = Image.new('RGB', (main_content_width, total_height))
-        
-        scroll_position = 0
-        while scroll_position < total_height:
-            # --- 特定のコンテナをスクロールさせる ---
-            driver.execute_script(f"{scroll_container_selector}.scrollTo(0, {scroll_position});")
-            time.sleep(0.5)
-
-            temp_screenshot_path = os.path.join(os.path.dirname(filepath), "temp_screenshot.png")
-            # ページ全体のスクリーンショットを一旦撮る
-            driver.save_screenshot(temp_screenshot_path)
-            
-            full_screenshot = Image.open(temp_screenshot_path)
-
-            # --- サイドバーを除外し、スクロール領域のみを切り出す ---
-            # スクロールコンテナの位置とサイズを取得
-            rect = driver.execute_script(f"return {scroll_container_selector}.getBoundingClientRect();")
-            left, top, right, bottom = rect['left'], rect['top'], rect['right'], rect['bottom']
-
-            # 貼り付け対象のパーツを切り出す
-            screenshot_part = full_screenshot.crop((left, top, right, bottom))
-
-            # 結合用画像に貼り付け
-            stitched_image.paste(screenshot_part, (0, scroll_position))
-            
-            scroll_position += screenshot_part.height
-
-        # 最終的な画像の高さを調整
-        stitched_image = stitched_image.crop((0, 0, main_content_width, total_height))
-        stitched_image.save(filepath)
-        print(f"Scrolling screenshot saved to: {filepath}")
-        
-        if os.path.exists(temp_screenshot_path):
-            os.remove(temp_screenshot_path)
-            
-    except Exception as e:
-        print(f"Failed to take scrolling screenshot: {e}")
-        driver.save_screenshot(filepath) # フォールバック
-
 def create_timestamped_filename(url):
     base_name = url.replace("https://", "").replace("http://", "").replace("www.", "").replace("/", "_")
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -124,25 +65,25 @@ def _fetch_api_prices(soup):
             # ASRモデル (Whisper) のような時間単位の価格を特別処理
             if "per hour" in input_text.lower():
                 if input_price is not None:
-                    api_data.append({
-                        "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": STATIC_SERVICE_PROVIDED,
-                        "Currency": "USD", "API_TYPE": f"{current_group} - {model_name} (ASR)",
-                        "Period": "Per Hour Transcribed", "Total Price ($)": input_price,
-                    })
+                    api_data.append(PriceRecord(
+                        provider_name=STATIC_PROVIDER_NAME, service_provided=STATIC_SERVICE_PROVIDED,
+                        currency="USD", api_type=f"{current_group} - {model_name} (ASR)",
+                        period="Per Hour Transcribed", total_price=input_price,
+                    ))
             else:
                 # 通常のトークン単位の価格
                 if input_price is not None:
-                    api_data.append({
-                        "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": STATIC_SERVICE_PROVIDED,
-                        "Currency": "USD", "API_TYPE": f"{current_group} - {model_name} - Input",
-                        "Period": "Per 1M Tokens", "Total Price ($)": input_price,
-                    })
+                    api_data.append(PriceRecord(
+                        provider_name=STATIC_PROVIDER_NAME, service_provided=STATIC_SERVICE_PROVIDED,
+                        currency="USD", api_type=f"{current_group} - {model_name} - Input",
+                        period="Per 1M Tokens", total_price=input_price,
+                    ))
                 if output_price is not None:
-                     api_data.append({
-                        "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": STATIC_SERVICE_PROVIDED,
-                        "Currency": "USD", "API_TYPE": f"{current_group} - {model_name} - Output",
-                        "Period": "Per 1M Tokens", "Total Price ($)": output_price,
-                    })
+                     api_data.append(PriceRecord(
+                        provider_name=STATIC_PROVIDER_NAME, service_provided=STATIC_SERVICE_PROVIDED,
+                        currency="USD", api_type=f"{current_group} - {model_name} - Output",
+                        period="Per 1M Tokens", total_price=output_price,
+                    ))
 
     return api_data
 
@@ -153,16 +94,16 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to SambaNova Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
-        _take_scrolling_screenshot_samba(driver, filepath)
+        screenshot.capture_full_page(driver, filepath, **SCREENSHOT_OPTIONS)
         saved_files.append(filepath)
 
         print("Scraping data from the page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data = _fetch_api_prices(soup)
         
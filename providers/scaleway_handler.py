@@ -1,8 +1,7 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-from currency_converter import CurrencyConverter
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 # --- URL定義 ---
 SCALEWAY_H100_URL = "https://www.scaleway.com/en/h100-pcie-try-it-now/"
@@ -75,29 +74,25 @@ def _fetch_h100_data(soup):
         if hourly_price is None:
             continue
 
-        base_info_for_row = {
-            "Provider Name": STATIC_PROVIDER_NAME,
-            "Currency": "EUR", # 通貨をEURと明記
-            "Service Provided": STATIC_SERVICE_PROVIDED,
-            "Region": STATIC_REGION_INFO,
-            "GPU ID": instance_name,
-            "GPU (H100 or H200 or L40S)": base_chip_category,
-            "Memory (GB)": 80, # H100は80GB
-            "Display Name(GPU Type)": instance_name,
-            "GPU Variant Name": gpu_variant_name,
-            "Storage Option": STATIC_STORAGE_OPTION,
-            "Amount of Storage": "Up to 12.8TB Scratch Storage",
-            "Network Performance (Gbps)": "Up to 20 Gbps",
-        }
-
-        row_hourly_data = {
-            **base_info_for_row,
-            "Number of Chips": num_chips,
-            "Period": "Per Hour",
+        row_hourly_data = PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME,
+            currency="EUR", # 通貨をEURと明記
+            service_provided=STATIC_SERVICE_PROVIDED,
+            region=STATIC_REGION_INFO,
+            gpu_id=instance_name,
+            gpu_family=base_chip_category,
+            memory_gb=80, # H100は80GB
+            display_name=instance_name,
+            gpu_variant=gpu_variant_name,
+            storage_option=STATIC_STORAGE_OPTION,
+            amount_of_storage="Up to 12.8TB Scratch Storage",
+            network_performance="Up to 20 Gbps",
+            num_chips=num_chips,
+            period="Per Hour",
             # Total Price ($)列にユーロの値を格納
-            "Total Price ($)": hourly_price,
-            "Effective Hourly Rate ($/hr)": hourly_price / num_chips,
-        }
+            total_price=hourly_price,
+            hourly_rate=hourly_price / num_chips,
+        )
         final_sheet_rows_unpivoted.append(row_hourly_data)
         
     return final_sheet_rows_unpivoted
@@ -138,29 +133,25 @@ def _fetch_l40s_data(soup):
         if hourly_price is None:
             continue
             
-        base_info_for_row = {
-            "Provider Name": STATIC_PROVIDER_NAME,
-            "Currency": "EUR", # 通貨をEURと明記
-            "Service Provided": STATIC_SERVICE_PROVIDED,
-            "Region": STATIC_REGION_INFO,
-            "GPU ID": instance_name,
-            "GPU (H100 or H200 or L40S)": base_chip_category,
-            "Memory (GB)": 48, # L40Sは48GB
-            "Display Name(GPU Type)": instance_name,
-            "GPU Variant Name": gpu_variant_name,
-            "Storage Option": STATIC_STORAGE_OPTION,
-            "Amount of Storage": "1.6TB Scratch Storage",
-            "Network Performance (Gbps)": "2.5 Gbps",
-        }
-
-        row_hourly_data = {
-            **base_info_for_row,
-            "Number of Chips": num_chips,
-            "Period": "Per Hour",
+        row_hourly_data = PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME,
+            currency="EUR", # 通貨をEURと明記
+            service_provided=STATIC_SERVICE_PROVIDED,
+            region=STATIC_REGION_INFO,
+            gpu_id=instance_name,
+            gpu_family=base_chip_category,
+            memory_gb=48, # L40Sは48GB
+            display_name=instance_name,
+            gpu_variant=gpu_variant_name,
+            storage_option=STATIC_STORAGE_OPTION,
+            amount_of_storage="1.6TB Scratch Storage",
+            network_performance="2.5 Gbps",
+            num_chips=num_chips,
+            period="Per Hour",
             # Total Price ($)列にユーロの値を格納
-            "Total Price ($)": hourly_price,
-            "Effective Hourly Rate ($/hr)": hourly_price / num_chips,
-        }
+            total_price=hourly_price,
+            hourly_rate=hourly_price / num_chips,
+        )
         final_sheet_rows_unpivoted.append(row_hourly_data)
         
     return final_sheet_rows_unpivoted
@@ -168,29 +159,24 @@ def _fetch_l40s_data(soup):
 def process_data_and_screenshot(driver, output_directory):
     saved_files = []
     scraped_data_list = []
-    c = CurrencyConverter()
 
     # --- 1. H100 ページの処理 ---
     try:
         print(f"Navigating to Scaleway H100: {SCALEWAY_H100_URL}")
         driver.get(SCALEWAY_H100_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver)
 
         print("Taking full-page screenshot of Scaleway H100...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(SCALEWAY_H100_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved H100 screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping pricing data from H100 page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data = _fetch_h100_data(soup)
         if scraped_data:
             scraped_data_list.extend(scraped_data)
@@ -204,23 +190,19 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Scaleway L40S: {SCALEWAY_L40S_URL}")
         driver.get(SCALEWAY_L40S_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver)
 
         print("Taking full-page screenshot of Scaleway L40S...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(SCALEWAY_L40S_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved L40S screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping pricing data from L40S page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data = _fetch_l40s_data(soup)
         if scraped_data:
             scraped_data_list.extend(scraped_data)
@@ -230,26 +212,5 @@ def process_data_and_screenshot(driver, output_directory):
         import traceback
         traceback.print_exc()
 
-    # --- 3. 通貨変換処理 ---
-    final_data_usd = []
-    if scraped_data_list:
-        print(f"Converting {len(scraped_data_list)} rows from EUR to USD...")
-        for data in scraped_data_list:
-            try:
-                # 元の価格を取得
-                original_price = data["Total Price ($)"]
-                original_rate = data["Effective Hourly Rate ($/hr)"]
-                
-                # USDに変換
-                usd_price = c.convert(original_price, 'EUR', 'USD')
-                usd_rate = c.convert(original_rate, 'EUR', 'USD')
-
-                # データをUSDの値で更新
-                data["Total Price ($)"] = round(usd_price, 4)
-                data["Effective Hourly Rate ($/hr)"] = round(usd_rate, 4)
-                data["Currency"] = "USD"
-                final_data_usd.append(data)
-            except Exception as e:
-                print(f"Currency conversion failed for row {data.get('GPU ID')}: {e}. Skipping row.")
-
+    # EURの価格は main でまとめてUSDに変換する（utils.exchange_rates）
     return saved_files, scraped_data_list
\ No newline at end of file
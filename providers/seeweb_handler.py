@@ -1,11 +1,11 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-from currency_converter import CurrencyConverter
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import NUM_CHIPS_PLACEHOLDER, PriceRecord
 
 # --- URL定義 ---
 SEEWEB_CLOUD_GPU_URL = "https://www.seeweb.it/en/products/cloud-server-gpu"
+READY_CONDITION = {"selector": "div.cont-table.config div.cardType"}
 SEEWEB_SERVERLESS_GPU_URL = "https://www.seeweb.it/en/products/serverless-gpu"
 
 # --- 静的情報 ---
@@ -89,55 +89,51 @@ def _parse_seeweb_page(soup, page_identifier):
         if not chip_counts:
             chip_counts = [1] # ドロップダウンがなければ1とする
 
-        # --- チップ数ごとにデータ行を生成 ---
-        for num_chips in chip_counts:
-            total_hourly_price = per_gpu_hourly_price * num_chips
-            
-            base_info_for_row = {
-                "Provider Name": STATIC_PROVIDER_NAME,
-                "Currency": "EUR", # この時点ではEUR
-                "Service Provided": f"{STATIC_SERVICE_PROVIDED} ({page_identifier})",
-                "Region": STATIC_REGION_INFO,
-                "GPU ID": f"seeweb_{page_identifier.lower()}_{num_chips}x_{gpu_variant_name.replace(' ','_')}",
-                "GPU (H100 or H200 or L40S)": base_chip_category,
-                "Memory (GB)": vram,
-                "Display Name(GPU Type)": f"{num_chips}x {gpu_variant_name} ({cpu_cores} vCPU, {ram_gb}GB RAM)",
-                "GPU Variant Name": gpu_variant_name,
-                "Storage Option": STATIC_STORAGE_OPTION,
-                "Amount of Storage": disk_space,
-                "Network Performance (Gbps)": "10 Gbps",
-                "Commitment Discount - 3 Month Price ($/hr per GPU)": commit_prices.get('3m'),
-                "Commitment Discount - 6 Month Price ($/hr per GPU)": commit_prices.get('6m'),
-                "Commitment Discount - 12 Month Price ($/hr per GPU)": commit_prices.get('12m'),
-                "Number of Chips": num_chips,
-                "Period": "Per Hour",
-                "Total Price ($)": total_hourly_price, # インスタンス全体のEUR価格
-                "Effective Hourly Rate ($/hr)": per_gpu_hourly_price, # GPU単価のEUR価格
-            }
-            final_sheet_rows_unpivoted.append(base_info_for_row)
+        # --- 1GPUあたりの価格で1行だけ作り、チップ数ごとの行は出力時に展開する ---
+        # GPU ID と Display Name のチップ数の部分は、展開時に各行のチップ数に置き換わる
+        row_hourly_data = PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME,
+            currency="EUR", # この時点ではEUR
+            service_provided=f"{STATIC_SERVICE_PROVIDED} ({page_identifier})",
+            region=STATIC_REGION_INFO,
+            gpu_id=f"seeweb_{page_identifier.lower()}_{NUM_CHIPS_PLACEHOLDER}x_{gpu_variant_name.replace(' ','_')}",
+            gpu_family=base_chip_category,
+            memory_gb=vram,
+            display_name=f"{NUM_CHIPS_PLACEHOLDER}x {gpu_variant_name} ({cpu_cores} vCPU, {ram_gb}GB RAM)",
+            gpu_variant=gpu_variant_name,
+            storage_option=STATIC_STORAGE_OPTION,
+            amount_of_storage=disk_space,
+            network_performance="10 Gbps",
+            commitment_3_month=commit_prices.get('3m'),
+            commitment_6_month=commit_prices.get('6m'),
+            commitment_12_month=commit_prices.get('12m'),
+            period="Per Hour",
+            hourly_rate=per_gpu_hourly_price, # GPU単価のEUR価格（Total Price はチップ数を掛けて展開時に求める）
+            chip_counts=tuple(chip_counts),
+        )
+        final_sheet_rows_unpivoted.append(row_hourly_data)
             
     return final_sheet_rows_unpivoted
 
 def process_data_and_screenshot(driver, output_directory):
     saved_files = []
     scraped_data_list_eur = []
-    c = CurrencyConverter()
 
     # --- 1. Cloud Server GPU ページの処理 ---
     try:
         print(f"Navigating to Seeweb Cloud Server GPU: {SEEWEB_CLOUD_GPU_URL}")
         driver.get(SEEWEB_CLOUD_GPU_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         filename = create_timestamped_filename(SEEWEB_CLOUD_GPU_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_viewport(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping pricing data from Cloud Server GPU page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data = _parse_seeweb_page(soup, "CloudServerGPU")
         if scraped_data:
             scraped_data_list_eur.extend(scraped_data)
@@ -149,23 +145,20 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Seeweb Serverless GPU: {SEEWEB_SERVERLESS_GPU_URL}")
         driver.get(SEEWEB_SERVERLESS_GPU_URL)
-        time.sleep(5)
+        # Cloud Server GPU ページのセレクタがあるとは限らないため、DOMの変更が止まるまでだけ待つ
+        page_wait.wait_for_page_ready(driver)
 
         print("Taking full-page screenshot of Scaleway H100...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(SEEWEB_SERVERLESS_GPU_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping pricing data from Serverless GPU page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data = _parse_seeweb_page(soup, "ServerlessGPU")
         if scraped_data:
             scraped_data_list_eur.extend(scraped_data)
@@ -173,28 +166,5 @@ def process_data_and_screenshot(driver, output_directory):
     except Exception as e:
         print(f"An error occurred during Seeweb Serverless GPU processing: {e}")
 
-    # --- 3. 通貨変換処理 (EUR -> USD) ---
-    final_data_usd = []
-    if scraped_data_list_eur:
-        print(f"Converting {len(scraped_data_list_eur)} rows from EUR to USD...")
-        for data in scraped_data_list_eur:
-            try:
-                # 価格に関連するすべてのキーをリストアップ
-                price_keys = [
-                    "Total Price ($)", "Effective Hourly Rate ($/hr)",
-                    "Commitment Discount - 3 Month Price ($/hr per GPU)",
-                    "Commitment Discount - 6 Month Price ($/hr per GPU)",
-                    "Commitment Discount - 12 Month Price ($/hr per GPU)"
-                ]
-                for key in price_keys:
-                    original_price = data.get(key)
-                    if isinstance(original_price, (int, float)):
-                        usd_price = c.convert(original_price, 'EUR', 'USD')
-                        data[key] = round(usd_price, 4)
-                
-                data["Currency"] = "USD"
-                final_data_usd.append(data)
-            except Exception as e:
-                print(f"Currency conversion failed for row {data.get('GPU ID')}: {e}. Skipping row.")
-    
-    return saved_files, final_data_usd
\ No newline at end of file
+    # EURの価格は main でまとめてUSDに変換する（utils.exchange_rates）
+    return saved_files, scraped_data_list_eur
\ No newline at end of file
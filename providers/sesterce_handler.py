@@ -1,11 +1,12 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 # --- URL定義 ---
 PRICING_URL = "https://www.sesterce.com/pricing"
 COMPUTE_URL = "https://cloud.sesterce.com/compute"
+READY_CONDITION_COMPUTE = {"selector": "div.pb-4 > dl.group"}
 
 # --- 静的情報 ---
 STATIC_PROVIDER_NAME = "Sesterce"
@@ -26,22 +27,16 @@ def _take_full_page_screenshot_robust(driver, filepath):
         driver.execute_script(
             f"const el = {scroll_container_selector}; if (el) {{ el.style.maxHeight = 'none'; el.style.overflowY = 'visible'; }}"
         )
-        time.sleep(1) # スタイルの反映を待つ
+        page_wait.wait_for_dom_quiet(driver, timeout=1) # スタイルの反映を待つ
 
-        # 2. これでページの全長が正しく取得できるようになったはず
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        
-        # 3. ウィンドウサイズを変更して撮影
-        driver.set_window_size(1920, total_height)
-        time.sleep(2) # レンダリング待機
-        
-        driver.save_screenshot(filepath)
+        # 2. これでページが自然な全長になったので、ページ全体を1回で撮影する
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
     except Exception as e:
         print(f"Failed to take robust screenshot: {e}")
         # 失敗した場合は、従来の方法で試みる
-        driver.save_screenshot(filepath)
+        screenshot.capture_viewport(driver, filepath)
         print(f"Saved a standard screenshot as fallback to: {filepath}")
 
 def create_timestamped_filename(url):
@@ -98,22 +93,22 @@ def _parse_pricing_page(soup):
         price = _parse_price(specs.get("price", ""))
         if price is None: continue
 
-        data_rows.append({
-            "Provider Name": STATIC_PROVIDER_NAME,
-            "Currency": "USD",
-            "Service Provided": STATIC_SERVICE_PROVIDED,
-            "Region": "Global", # このページには詳細なリージョン情報なし
-            "GPU ID": f"sesterce_pricing_{gpu_variant.replace(' ','_')}",
-            "GPU (H100 or H200 or L40S)": base_chip,
-            "Memory (GB)": vram,
-            "Display Name(GPU Type)": f"1x {gpu_variant}",
-            "GPU Variant Name": gpu_variant,
-            "Amount of Storage": "N/A",
-            "Number of Chips": 1,
-            "Period": "Per Hour",
-            "Total Price ($)": price,
-            "Effective Hourly Rate ($/hr)": price, # 1GPUあたりの価格なので同額
-        })
+        data_rows.append(PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME,
+            currency="USD",
+            service_provided=STATIC_SERVICE_PROVIDED,
+            region="Global", # このページには詳細なリージョン情報なし
+            gpu_id=f"sesterce_pricing_{gpu_variant.replace(' ','_')}",
+            gpu_family=base_chip,
+            memory_gb=vram,
+            display_name=f"1x {gpu_variant}",
+            gpu_variant=gpu_variant,
+            amount_of_storage="N/A",
+            num_chips=1,
+            period="Per Hour",
+            total_price=price,
+            hourly_rate=price, # 1GPUあたりの価格なので同額
+        ))
     return data_rows
 
 def _parse_compute_page(soup):
@@ -165,22 +160,22 @@ def _parse_compute_page(soup):
                 examples = ", ".join(country_codes[:3])
                 region_text = f"{total_regions}+ Global (e.g. {examples})"
 
-        data_rows.append({
-            "Provider Name": STATIC_PROVIDER_NAME,
-            "Currency": "USD",
-            "Service Provided": STATIC_SERVICE_PROVIDED,
-            "Region": region_text,
-            "GPU ID": f"sesterce_compute_{num_chips}x_{gpu_variant.replace(' ','_')}",
-            "GPU (H100 or H200 or L40S)": base_chip,
-            "Memory (GB)": vram,
-            "Display Name(GPU Type)": f"{num_chips}x {gpu_variant}",
-            "GPU Variant Name": gpu_variant,
-            "Amount of Storage": "N/A",
-            "Number of Chips": num_chips,
-            "Period": "Per Hour",
-            "Total Price ($)": round(total_price, 4),
-            "Effective Hourly Rate ($/hr)": round(per_gpu_price, 4),
-        })
+        data_rows.append(PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME,
+            currency="USD",
+            service_provided=STATIC_SERVICE_PROVIDED,
+            region=region_text,
+            gpu_id=f"sesterce_compute_{num_chips}x_{gpu_variant.replace(' ','_')}",
+            gpu_family=base_chip,
+            memory_gb=vram,
+            display_name=f"{num_chips}x {gpu_variant}",
+            gpu_variant=gpu_variant,
+            amount_of_storage="N/A",
+            num_chips=num_chips,
+            period="Per Hour",
+            total_price=round(total_price, 4),
+            hourly_rate=round(per_gpu_price, 4),
+        ))
     return data_rows
 
 def process_data_and_screenshot(driver, output_directory):
@@ -191,7 +186,7 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Sesterce Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
@@ -200,7 +195,7 @@ def process_data_and_screenshot(driver, output_directory):
 
         print("Scraping data from pricing page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data = _parse_pricing_page(soup)
         if scraped_data:
             scraped_data_list.extend(scraped_data)
@@ -211,7 +206,7 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Sesterce Compute: {COMPUTE_URL}")
         driver.get(COMPUTE_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION_COMPUTE)
 
         filename = create_timestamped_filename(COMPUTE_URL)
         filepath = f"{output_directory}/{filename}"
@@ -220,7 +215,7 @@ def process_data_and_screenshot(driver, output_directory):
 
         print("Scraping data from compute page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data = _parse_compute_page(soup)
         if scraped_data:
             scraped_data_list.extend(scraped_data)
@@ -1,8 +1,7 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-from currency_converter import CurrencyConverter
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 # --- URL定義 ---
 PRICING_URL_AISPACON = "https://soroban.highreso.jp/aispacon"
@@ -81,23 +80,23 @@ def _parse_aispacon_page(soup):
         per_gpu_hourly_price = (monthly_price_jpy / num_chips) / HOURS_IN_MONTH
         total_hourly_price = monthly_price_jpy / HOURS_IN_MONTH
 
-        data_rows.append({
-            "Provider Name": STATIC_PROVIDER_NAME,
-            "Currency": "JPY",
-            "Service Provided": f"{STATIC_SERVICE_PROVIDED} (AISPACON)",
-            "Region": STATIC_REGION_INFO,
-            "GPU ID": f"soroban_aispacon_{num_chips}x_{gpu_variant.replace(' ','_')}",
-            "GPU (H100 or H200 or L40S)": base_chip,
-            "Memory (GB)": vram,
-            "Display Name(GPU Type)": f"{num_chips}x {gpu_variant} (Single Node)",
-            "GPU Variant Name": gpu_variant,
-            "Amount of Storage": specs.get("ストレージ／ノード", "N/A"),
-            "Number of Chips": num_chips,
-            "Period": "Per Hour",
-            "Total Price ($)": round(total_hourly_price, 4),
-            "Effective Hourly Rate ($/hr)": round(per_gpu_hourly_price, 4),
-            "Notes / Features": f"Monthly Price: ¥{monthly_price_jpy:,.0f}"
-        })
+        data_rows.append(PriceRecord(
+            provider_name=STATIC_PROVIDER_NAME,
+            currency="JPY",
+            service_provided=f"{STATIC_SERVICE_PROVIDED} (AISPACON)",
+            region=STATIC_REGION_INFO,
+            gpu_id=f"soroban_aispacon_{num_chips}x_{gpu_variant.replace(' ','_')}",
+            gpu_family=base_chip,
+            memory_gb=vram,
+            display_name=f"{num_chips}x {gpu_variant} (Single Node)",
+            gpu_variant=gpu_variant,
+            amount_of_storage=specs.get("ストレージ／ノード", "N/A"),
+            num_chips=num_chips,
+            period="Per Hour",
+            total_price=round(total_hourly_price, 4),
+            hourly_rate=round(per_gpu_hourly_price, 4),
+            notes=f"Monthly Price: ¥{monthly_price_jpy:,.0f}"
+        ))
     return data_rows
 
 def _parse_compute_page(soup):
@@ -137,23 +136,23 @@ def _parse_compute_page(soup):
             
             per_gpu_hourly_price = hourly_price_jpy / num_chips
 
-            data_rows.append({
-                "Provider Name": STATIC_PROVIDER_NAME,
-                "Currency": "JPY",
-                "Service Provided": f"{STATIC_SERVICE_PROVIDED} (Compute)",
-                "Region": STATIC_REGION_INFO,
-                "GPU ID": f"soroban_compute_{num_chips}x_{gpu_variant.replace(' ','_')}",
-                "GPU (H100 or H200 or L40S)": base_chip,
-                "Memory (GB)": vram,
-                "Display Name(GPU Type)": f"{num_chips}x {gpu_variant}",
-                "GPU Variant Name": gpu_variant,
-                "Amount of Storage": "100GB+",
-                "Number of Chips": num_chips,
-                "Period": "Per Hour",
-                "Total Price ($)": round(hourly_price_jpy, 4),
-                "Effective Hourly Rate ($/hr)": round(per_gpu_hourly_price, 4),
-                "Notes / Features": f"Monthly Price available: ¥{monthly_price_jpy:,.0f}" if monthly_price_jpy else ""
-            })
+            data_rows.append(PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME,
+                currency="JPY",
+                service_provided=f"{STATIC_SERVICE_PROVIDED} (Compute)",
+                region=STATIC_REGION_INFO,
+                gpu_id=f"soroban_compute_{num_chips}x_{gpu_variant.replace(' ','_')}",
+                gpu_family=base_chip,
+                memory_gb=vram,
+                display_name=f"{num_chips}x {gpu_variant}",
+                gpu_variant=gpu_variant,
+                amount_of_storage="100GB+",
+                num_chips=num_chips,
+                period="Per Hour",
+                total_price=round(hourly_price_jpy, 4),
+                hourly_rate=round(per_gpu_hourly_price, 4),
+                notes=f"Monthly Price available: ¥{monthly_price_jpy:,.0f}" if monthly_price_jpy else ""
+            ))
         except IndexError:
             continue # 列が存在しない場合はスキップ
             
@@ -162,29 +161,24 @@ def _parse_compute_page(soup):
 def process_data_and_screenshot(driver, output_directory):
     saved_files = []
     scraped_data_list_jpy = []
-    c = CurrencyConverter()
 
     # --- 1. /aispacon ページの処理 ---
     try:
         print(f"Navigating to Soroban AISPACON: {PRICING_URL_AISPACON}")
         driver.get(PRICING_URL_AISPACON)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver)
 
         print("Taking full-page screenshot of Scaleway H100...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL_AISPACON)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping data from AISPACON page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data_list_jpy.extend(_parse_aispacon_page(soup))
     except Exception as e:
         print(f"An error occurred during Soroban AISPACON processing: {e}")
@@ -193,39 +187,22 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Soroban Compute: {PRICING_URL_COMPUTE}")
         driver.get(PRICING_URL_COMPUTE)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver)
 
         print("Taking full-page screenshot of Scaleway H100...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL_COMPUTE)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping data from Compute page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         scraped_data_list_jpy.extend(_parse_compute_page(soup))
     except Exception as e:
         print(f"An error occurred during Soroban Compute processing: {e}")
 
-    # --- 3. 通貨変換処理 (JPY -> USD) ---
-    final_data_usd = []
-    if scraped_data_list_jpy:
-        print(f"Converting {len(scraped_data_list_jpy)} rows from JPY to USD...")
-        for data in scraped_data_list_jpy:
-            try:
-                # 通貨変換が必要なキーの値を変換
-                data["Total Price ($)"] = round(c.convert(data["Total Price ($)"], 'JPY', 'USD'), 4)
-                data["Effective Hourly Rate ($/hr)"] = round(c.convert(data["Effective Hourly Rate ($/hr)"], 'JPY', 'USD'), 4)
-                data["Currency"] = "USD"
-                final_data_usd.append(data)
-            except Exception as e:
-                print(f"Currency conversion failed for row {data.get('GPU ID')}: {e}. Skipping row.")
-
-    return saved_files, final_data_usd
\ No newline at end of file
+    # JPYの価格は main でまとめてUSDに変換する（utils.exchange_rates）
+    return saved_files, scraped_data_list_jpy
\ No newline at end of file
@@ -1,9 +1,10 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.tencentcloud.com/jp/document/product/1111/47656"
+READY_CONDITION = {"selector": "h3#api-call-price"}
 
 STATIC_PROVIDER_NAME = "Tencent Cloud"
 STATIC_SERVICE_PROVIDED = "TDMQ for CMQ"
@@ -57,15 +58,15 @@ def _fetch_api_prices(soup):
             price = _parse_price(price_cells[i].get_text(strip=True))
 
             if price is not None:
-                api_data.append({
-                    "Provider Name": STATIC_PROVIDER_NAME,
-                    "Service Provided": STATIC_SERVICE_PROVIDED,
-                    "Currency": "USD",
-                    "Region": region_name,
-                    "API_TYPE": "API Call",
-                    "Period": "Per 1M Calls", # 単位を明確にする
-                    "Total Price ($)": price,
-                })
+                api_data.append(PriceRecord(
+                    provider_name=STATIC_PROVIDER_NAME,
+                    service_provided=STATIC_SERVICE_PROVIDED,
+                    currency="USD",
+                    region=region_name,
+                    api_type="API Call",
+                    period="Per 1M Calls", # 単位を明確にする
+                    total_price=price,
+                ))
         except IndexError:
             # リージョンと価格の数が合わない場合はスキップ
             continue
@@ -79,23 +80,19 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Tencent Cloud Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping data from the page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data = _fetch_api_prices(soup)
         
@@ -1,9 +1,10 @@
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://www.together.ai/pricing"
+READY_CONDITION = {"selector": "//h2[text()='Serverless Inference']"}
 
 STATIC_PROVIDER_NAME = "Together AI"
 
@@ -68,24 +69,24 @@ def _parse_api_section(soup):
         output_price = _parse_price(cols[2].get_text(strip=True))
         
         if input_price is not None:
-            api_data.append({
-                "Provider Name": STATIC_PROVIDER_NAME,
-                "Service Provided": "Serverless API",
-                "Currency": "USD",
-                "API_TYPE": f"{model_name} - Input",
-                "Period": "Per 1M Tokens",
-                "Total Price ($)": input_price
-            })
+            api_data.append(PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME,
+                service_provided="Serverless API",
+                currency="USD",
+                api_type=f"{model_name} - Input",
+                period="Per 1M Tokens",
+                total_price=input_price
+            ))
 
         if output_price is not None:
-            api_data.append({
-                "Provider Name": STATIC_PROVIDER_NAME,
-                "Service Provided": "Serverless API",
-                "Currency": "USD",
-                "API_TYPE": f"{model_name} - Output",
-                "Period": "Per 1M Tokens",
-                "Total Price ($)": output_price
-            })
+            api_data.append(PriceRecord(
+                provider_name=STATIC_PROVIDER_NAME,
+                service_provided="Serverless API",
+                currency="USD",
+                api_type=f"{model_name} - Output",
+                period="Per 1M Tokens",
+                total_price=output_price
+            ))
 
     return api_data
 
@@ -115,14 +116,14 @@ def _parse_gpu_section(soup):
             base_chip, gpu_variant, vram = _get_gpu_info(gpu_name_raw)
 
             if base_chip and price_per_hour is not None:
-                gpu_data.append({
-                    "Provider Name": STATIC_PROVIDER_NAME, "Service Provided": "Dedicated GPU",
-                    "Currency": "USD", "Region": "N/A", "GPU ID": f"together_{gpu_variant.replace(' ','_')}",
-                    "GPU (H100 or H200 or L40S)": base_chip, "GPU Variant Name": gpu_variant,
-                    "Display Name(GPU Type)": f"1x {gpu_variant}", "Memory (GB)": vram,
-                    "Number of Chips": 1, "Period": "Per Hour",
-                    "Total Price ($)": price_per_hour, "Effective Hourly Rate ($/hr)": price_per_hour, "API_TYPE": ""
-                })
+                gpu_data.append(PriceRecord(
+                    provider_name=STATIC_PROVIDER_NAME, service_provided="Dedicated GPU",
+                    currency="USD", region="N/A", gpu_id=f"together_{gpu_variant.replace(' ','_')}",
+                    gpu_family=base_chip, gpu_variant=gpu_variant,
+                    display_name=f"1x {gpu_variant}", memory_gb=vram,
+                    num_chips=1, period="Per Hour",
+                    total_price=price_per_hour, hourly_rate=price_per_hour, api_type=""
+                ))
     return gpu_data
 
 
@@ -132,23 +133,19 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to Together AI Pricing: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(5)
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         print("Taking full-page screenshot")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
         saved_files.append(filepath)
 
         print("Scraping data from the page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         # APIとGPUの両方のセクションを解析
         scraped_data_list.extend(_parse_api_section(soup))
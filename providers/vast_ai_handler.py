@@ -1,15 +1,16 @@
 # providers/vast_ai_handler.py
 
-import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 import re
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from utils import html_parse, page_wait, screenshot
+from utils.price_record import PriceRecord
 
 PRICING_URL = "https://console.vast.ai/create/"
+READY_CONDITION = {"selector": "div.machine-row", "timeout": 10} # このページは初期読み込みに時間がかかるため長めに待つ
 
 def get_canonical_variant_and_base_chip_vast(gpu_model_from_page):
     """
@@ -64,14 +65,14 @@ def fetch_vast_ai_data(soup):
             location_tag = row.find(style=re.compile("font-size: 11px"))
             region = location_tag.get_text(strip=True) if location_tag else "N/A"
 
-            data_dict = {
-                "Provider Name": "Vast.ai",
-                "GPU Variant Name": variation,
-                "Region": region,
-                "GPU (H100 or H200 or L40S)": gpu_type,
-                "Number of Chips": num_chips,
-                "Total Price ($)": price
-            }
+            data_dict = PriceRecord(
+                provider_name="Vast.ai",
+                gpu_variant=variation,
+                region=region,
+                gpu_family=gpu_type,
+                num_chips=num_chips,
+                total_price=price
+            )
             all_data.append(data_dict)
         except Exception:
             # 個別の行でエラーが発生しても処理を続ける
@@ -94,7 +95,7 @@ def process_data_and_screenshot(driver, output_directory):
     try:
         print(f"Navigating to: {PRICING_URL}")
         driver.get(PRICING_URL)
-        time.sleep(10) # このページは初期読み込みに時間がかかるため長めに待つ
+        page_wait.wait_for_page_ready(driver, **READY_CONDITION)
 
         # --- "Show More" ボタンを繰り返しクリック ---
         max_clicks = 1 # 無限ループを防ぐための最大クリック回数
@@ -108,27 +109,23 @@ def process_data_and_screenshot(driver, output_directory):
                 # JavaScriptでクリックする方が確実
                 driver.execute_script("arguments[0].click();", show_more_button)
                 print("Clicked 'Show More'. Waiting for content to load...")
-                time.sleep(3) # 新しいコンテンツが読み込まれるのを待つ
+                page_wait.wait_for_dom_quiet(driver, timeout=3) # 新しいコンテンツが読み込まれるのを待つ
             except TimeoutException:
                 print("'Show More' button not found. Assuming all content is loaded.")
                 break # ボタンが見つからなければループを抜ける
         
         # --- スクリーンショット撮影とデータ取得 ---
         print("Taking full-page screenshot of all loaded content...")
-        driver.set_window_size(1920, 800)
-        total_height = driver.execute_script("return document.body.parentNode.scrollHeight")
-        driver.set_window_size(1920, total_height)
-        time.sleep(2)
 
         filename = create_timestamped_filename(PRICING_URL)
         filepath = f"{output_directory}/{filename}"
         
-        driver.save_screenshot(filepath)
+        screenshot.capture_full_page(driver, filepath)
         print(f"Successfully saved screenshot to: {filepath}")
 
         print("Scraping pricing data from the fully loaded page...")
         html_source = driver.page_source
-        soup = BeautifulSoup(html_source, "html.parser")
+        soup = html_parse.parse_html(html_source)
         
         scraped_data_list = fetch_vast_ai_data(soup)
 
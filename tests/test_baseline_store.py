@@ -0,0 +1,81 @@
+import gzip
+
+import pytest
+
+pytest.importorskip("google.cloud.storage")
+pytest.importorskip("bs4")
+
+from google.api_core.exceptions import NotFound, PreconditionFailed
+from google.cloud import storage
+
+from utils import baseline_store
+
+PAGE = {"name": "pricing", "url": "https://example.com/pricing", "selector": "main"}
+LEGACY_HTML = "<html><body><main>H100 $2.49/hr</main></body></html>"
+
+class FakeBlob:
+    def __init__(self, objects, path):
+        self._objects = objects
+        self._path = path
+
+    def download_as_bytes(self):
+        if self._path not in self._objects:
+            raise NotFound(self._path)
+        return self._objects[self._path]
+
+    def download_as_text(self):
+        return self.download_as_bytes().decode("utf-8")
+
+    def upload_from_string(self, data, content_type=None, if_generation_match=None):
+        if if_generation_match == 0 and self._path in self._objects:
+            raise PreconditionFailed(self._path)
+        self._objects[self._path] = data.encode("utf-8") if isinstance(data, str) else data
+
+class FakeBucket:
+    """GCSのバケットの代わりに、パス -> バイト列 をメモリに持つ"""
+
+    name = "test-bucket"
+
+    def __init__(self):
+        self.objects = {}
+
+    def blob(self, path):
+        return FakeBlob(self.objects, path)
+
+class FakeClient:
+    def __init__(self, bucket):
+        self._bucket = bucket
+
+    def bucket(self, name):
+        return self._bucket
+
+@pytest.fixture
+def bucket(monkeypatch):
+    fake = FakeBucket()
+    monkeypatch.setattr(storage, "Client", lambda: FakeClient(fake))
+    return fake
+
+def test_legacy_baseline_without_pointer_is_migrated_to_snapshot(bucket):
+    bucket.objects[baseline_store.html_path("runpod", "pricing")] = LEGACY_HTML.encode("utf-8")
+    store = baseline_store.GcsBaselineStore("test-bucket")
+
+    # ポインタのない旧形式のベースラインは、HTMLを取得してパースし直す
+    baseline = store.get("runpod", PAGE)
+    assert baseline.exists
+    assert baseline.html == LEGACY_HTML
+    assert baseline.content_hash is None
+
+    # 変化がなければ、旧形式のHTMLをスナップショットに移行する（main.check_website_changes と同じ呼び方）
+    pointer = store.save_snapshot("runpod", "pricing", baseline.html, "content-hash", PAGE)
+    assert gzip.decompress(bucket.objects[pointer["snapshot"]]).decode("utf-8") == LEGACY_HTML
+
+    # 次回からはポインタのハッシュ値だけで比較し、HTMLは取得しない
+    migrated = baseline_store.GcsBaselineStore("test-bucket").get("runpod", PAGE)
+    assert migrated.exists
+    assert migrated.content_hash == "content-hash"
+    assert migrated.html is None
+    assert [entry["snapshot"] for entry in store.load_history("runpod", "pricing")] == [pointer["snapshot"]]
+
+def test_missing_baseline(bucket):
+    baseline = baseline_store.GcsBaselineStore("test-bucket").get("runpod", PAGE)
+    assert not baseline.exists
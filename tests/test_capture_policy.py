@@ -0,0 +1,58 @@
+import pytest
+
+from utils import capture_policy
+
+ROWS = [{"Provider Name": "RunPod", "GPU ID": "h100", "Effective Hourly Rate ($/hr)": 2.5}]
+
+class FakeBlob:
+    """GCSの撮影記録のblobの代わりに、保存した内容をメモリに持つ"""
+
+    def __init__(self):
+        self.text = None
+
+    def exists(self):
+        return self.text is not None
+
+    def download_as_text(self):
+        return self.text
+
+    def upload_from_string(self, payload, content_type=None):
+        self.text = payload
+
+@pytest.fixture
+def blob(monkeypatch):
+    fake = FakeBlob()
+    monkeypatch.setattr(capture_policy, "_state_blob", lambda: fake)
+    capture_policy.load_state()
+    return fake
+
+def _capture_run(handler_name, entries):
+    """撮影が必要なら撮影記録を保留し、アップロード対象を結びつける（browser_pool の処理と同じ順番）"""
+    capture, reason = capture_policy.should_capture(handler_name, ROWS)
+    if capture:
+        capture_policy.record_capture(handler_name, ROWS)
+        capture_policy.track_uploads(handler_name, entries)
+    return capture, reason
+
+def test_failed_upload_captures_again_on_next_run(blob):
+    assert _capture_run("runpod_handler", ["/tmp/runpod.webp"]) == (True, "no previous capture")
+    # アップロードが失敗したので record_uploaded は呼ばれない
+    capture_policy.save_state()
+
+    capture_policy.load_state()
+    assert _capture_run("runpod_handler", ["/tmp/runpod.webp"]) == (True, "no previous capture")
+
+def test_successful_upload_skips_next_run(blob):
+    _capture_run("runpod_handler", ["/tmp/runpod.webp", ("runpod_2.webp", b"...")])
+    capture_policy.record_uploaded("/tmp/runpod.webp")
+    capture_policy.save_state()
+    # 1枚でもアップロードされていなければ、撮影記録は確定しない
+    assert blob.text is None
+
+    capture_policy.record_uploaded(("runpod_2.webp", b"..."))
+    capture_policy.save_state()
+
+    capture_policy.load_state()
+    capture, reason = _capture_run("runpod_handler", ["/tmp/runpod.webp"])
+    assert not capture
+    assert reason.startswith("pricing data unchanged")
@@ -0,0 +1,43 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from utils import import_report
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# main を import するのに最低限必要なパッケージ（なければこのテストはスキップ）
+pytestmark = pytest.mark.skipif(
+    any(importlib.util.find_spec(name) is None for name in ("functions_framework", "dotenv")),
+    reason="main's runtime dependencies are not installed",
+)
+
+# コールドスタートでは読み込まず、最初に使うときに読み込むモジュール
+LAZY_MODULES = ["google.cloud.storage", "gspread", "pyarrow", "selenium", "PIL", "googleapiclient.discovery"]
+
+def test_main_import_time_is_within_budget():
+    entries = import_report.measure("main", cwd=PROJECT_ROOT)
+    total_us, ranked = import_report.summarize(entries)
+    budget_ms = import_report.get_budget_ms()
+    slowest = ", ".join(f"{package} {cumulative_us / 1000:.0f} ms" for package, cumulative_us in ranked[:5])
+    assert total_us / 1000 <= budget_ms, f"import main took {total_us / 1000:.0f} ms (budget {budget_ms:.0f} ms): {slowest}"
+
+def test_main_import_does_not_load_heavy_modules():
+    code = (
+        "import json, sys\n"
+        "import main\n"
+        f"lazy = {LAZY_MODULES!r}\n"
+        "print(json.dumps({\n"
+        "    'lazy': [name for name in lazy if name in sys.modules],\n"
+        "    'providers': sorted(name for name in sys.modules if name.startswith('providers.')),\n"
+        "}))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    assert loaded["lazy"] == []
+    assert loaded["providers"] == []
@@ -0,0 +1,193 @@
+import abc
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from utils import html_parse
+
+DEFAULT_PREFETCH_WORKERS = 16
+SNAPSHOT_PREFIX = "snapshots" # 内容のハッシュ値をキーにしたHTMLスナップショット（gzip圧縮）
+HISTORY_MAX_ENTRIES = 500
+
+@dataclass
+class Baseline:
+    """監視対象ページ1つ分の前回の状態"""
+    exists: bool = False
+    content_hash: str = None  # ポインタに保存済みのハッシュ値（比較方法が同じ場合のみ）
+    html: str = None          # ハッシュ値が使えない場合にだけ取得するHTML本体
+    text: str = None          # latest_title 用の前回のタイトル・概要
+    pointer: dict = field(default_factory=dict)
+
+def comparison_config_key(page):
+    """比較方法（セレクタ・除外セレクタ・パーサ）が変わった場合に、保存済みのハッシュ値を使わないためのキー"""
+    config = json.dumps({
+        "selector": page.get("selector"),
+        "ignore_selectors": page.get("ignore_selectors") or [],
+        "parser": html_parse.PARSER,
+    }, sort_keys=True)
+    return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+
+def html_path(platform, name):
+    return f"{platform}/{name}.html"
+
+def content_path(platform, name):
+    return f"{platform}/{name}_content.txt"
+
+def normalized_text_path(platform, name):
+    return f"{platform}/{name}_normalized.txt"
+
+def pointer_path(platform, name):
+    return f"{platform}/{name}.pointer.json"
+
+def history_path(platform, name):
+    return f"{platform}/{name}.history.json"
+
+def snapshot_path(raw_sha256):
+    return f"{SNAPSHOT_PREFIX}/{raw_sha256}.html.gz"
+
+class _PrefetchingStore(abc.ABC):
+    """全ターゲットの前回の状態をスレッドプールでまとめて取得し、比較ループではメモリから読む"""
+
+    def __init__(self, max_workers=None):
+        self._max_workers = max_workers or int(os.getenv("BASELINE_PREFETCH_WORKERS", DEFAULT_PREFETCH_WORKERS))
+        self._executor = None
+        self._futures = {}
+
+    def prefetch(self, targets):
+        """バックグラウンドで取得を開始してすぐに戻る（Chromeの起動などと並行して進む）"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="baseline-prefetch")
+        for platform, pages in targets.items():
+            for page in pages:
+                key = (platform, page['name'])
+                if key not in self._futures:
+                    self._futures[key] = self._executor.submit(self._fetch, platform, page)
+        print(f"Prefetching {len(self._futures)} monitoring baseline(s) in the background...")
+        return self
+
+    def get(self, platform, page):
+        """前回の状態を返す。取得が終わっていなければ待つ。prefetch されていないページはその場で取得する"""
+        future = self._futures.get((platform, page['name']))
+        if future is None:
+            return self._fetch(platform, page)
+        return future.result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @abc.abstractmethod
+    def _fetch(self, platform, page):
+        """ページ1つ分の前回の状態 (Baseline) を取得する"""
+
+class GcsBaselineStore(_PrefetchingStore):
+    """
+    GCSバケットに保存されたベースライン。
+    HTMLは snapshots/{sha256}.html.gz に1つだけ保存し、ページごとに
+    {platform}/{name}.pointer.json（最新のスナップショット）と {platform}/{name}.history.json（履歴）を持つ。
+    """
+
+    def __init__(self, bucket_name, max_workers=None):
+        super().__init__(max_workers)
+        from google.cloud import storage
+        self.bucket = storage.Client().bucket(bucket_name)
+
+    def _download_text(self, path):
+        from google.api_core.exceptions import NotFound
+        try:
+            return self.bucket.blob(path).download_as_text()
+        except NotFound:
+            return None
+
+    def _fetch(self, platform, page):
+        name = page['name']
+        if page.get("check_type", "hash") == "latest_title":
+            text = self._download_text(content_path(platform, name))
+            if text is None:
+                return Baseline()
+            return Baseline(exists=True, text=text)
+
+        # ポインタに同じ比較方法のハッシュ値があれば、スナップショット本体は取得しない
+        pointer_text = self._download_text(pointer_path(platform, name))
+        if pointer_text is not None:
+            pointer = json.loads(pointer_text)
+            if pointer.get("content-sha256") and pointer.get("compare-config") == comparison_config_key(page):
+                return Baseline(exists=True, content_hash=pointer["content-sha256"], pointer=pointer)
+            return Baseline(exists=True, html=self.load_snapshot(pointer["snapshot"]), pointer=pointer)
+
+        # 旧形式: {platform}/{name}.html にHTMLをそのまま保存していたベースライン（比較のために毎回パースし直す）
+        html = self._download_text(html_path(platform, name))
+        if html is None:
+            return Baseline()
+        return Baseline(exists=True, html=html)
+
+    def load_snapshot(self, path):
+        return gzip.decompress(self.bucket.blob(path).download_as_bytes()).decode('utf-8')
+
+    def load_normalized_text(self, platform, name):
+        return self._download_text(normalized_text_path(platform, name))
+
+    def save_snapshot(self, platform, name, html, content_hash, page, normalized_text=None):
+        """
+        HTMLを内容のハッシュ値をキーにして gzip で保存し、ページごとのポインタと履歴を更新する。
+        同じ内容のスナップショットが既にあればアップロードしない。
+        """
+        from google.api_core.exceptions import PreconditionFailed
+
+        raw_sha256 = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        path = snapshot_path(raw_sha256)
+        try:
+            # if_generation_match=0: オブジェクトがまだ存在しない場合だけ書き込む
+            self.bucket.blob(path).upload_from_string(gzip.compress(html.encode('utf-8')), content_type='application/gzip', if_generation_match=0)
+            print(f"  -> Snapshot saved to GCS: gs://{self.bucket.name}/{path}")
+        except PreconditionFailed:
+            print(f"  -> Snapshot already stored: gs://{self.bucket.name}/{path}")
+
+        pointer = {
+            "snapshot": path,
+            "content-sha256": content_hash,
+            "compare-config": comparison_config_key(page),
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.bucket.blob(pointer_path(platform, name)).upload_from_string(json.dumps(pointer), content_type='application/json')
+
+        history = json.loads(self._download_text(history_path(platform, name)) or "[]")
+        history.append(pointer)
+        self.bucket.blob(history_path(platform, name)).upload_from_string(
+            json.dumps(history[-HISTORY_MAX_ENTRIES:], indent=1), content_type='application/json'
+        )
+
+        if normalized_text is not None:
+            self.bucket.blob(normalized_text_path(platform, name)).upload_from_string(normalized_text, content_type='text/plain; charset=utf-8')
+        return pointer
+
+    def load_history(self, platform, name):
+        """保存されているスナップショットの履歴（古い順）を返す。各要素の "snapshot" を load_snapshot() に渡すと当時のHTMLを取得できる"""
+        return json.loads(self._download_text(history_path(platform, name)) or "[]")
+
+class LocalBaselineStore(_PrefetchingStore):
+    """【ローカル検証用】check_website_changes_local と同じフォルダ構成のベースライン"""
+
+    def __init__(self, root, max_workers=None):
+        super().__init__(max_workers)
+        self.root = root
+
+    def _read(self, relative_path):
+        path = os.path.join(self.root, *relative_path.split("/"))
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def _fetch(self, platform, page):
+        name = page['name']
+        if page.get("check_type", "hash") == "latest_title":
+            text = self._read(content_path(platform, name))
+            return Baseline(exists=bool(text), text=text or "")
+        html = self._read(html_path(platform, name))
+        return Baseline(exists=bool(html), html=html or "")
@@ -0,0 +1,252 @@
+import os
+import platform
+import queue
+import threading
+import traceback
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+
+from utils import browser_profile, capture_policy, http_fetch, image_compress, screenshot
+
+DEFAULT_MAX_WORKERS = 4
+PAGE_LOAD_TIMEOUT_SECONDS = 90 # 1ページの読み込みでワーカーが止まり続けないための上限
+
+def get_worker_count(num_handlers):
+    """
+    ブラウザワーカー数を決める。
+    環境変数 BROWSER_WORKERS があればそれを優先し、なければCPU数（最大4）を使う。
+    """
+    env_value = os.getenv("BROWSER_WORKERS")
+    if env_value:
+        try:
+            count = int(env_value)
+        except ValueError:
+            print(f"WARNING: Invalid BROWSER_WORKERS value '{env_value}'. Falling back to default.")
+            count = min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+    else:
+        count = min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+    return max(1, min(count, num_handlers))
+
+def create_driver():
+    """ヘッドレスChromeを起動してWebDriverを返す"""
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage") # メモリ不足対策
+    options.add_argument("window-size=1920,1080") # ウィンドウサイズ指定
+    # 一般的なユーザーエージェントを設定してbot検出を避ける
+    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    if platform.system() == "Linux":
+        # クラウド環境 (Linux) の場合、パスを明示的に指定
+        options.binary_location = "/usr/bin/google-chrome"
+        service = Service(executable_path="/usr/bin/chromedriver")
+        driver = webdriver.Chrome(service=service, options=options)
+    else:
+        driver = webdriver.Chrome(options=options)
+
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT_SECONDS)
+    return driver
+
+def _is_driver_alive(driver):
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+def _quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"  -> WARNING: Failed to quit WebDriver cleanly: {e}")
+
+def _try_http_tier(worker_id, handler, handler_name):
+    """
+    HTTPだけでデータを取得できるハンドラを、Chromeを使わずに処理する。
+    データが取れなかった場合は None を返し、呼び出し側でブラウザ処理にフォールバックする。
+    """
+    try:
+        scraped_data = handler.process_data_http()
+    except Exception as e:
+        print(f"[worker {worker_id}] HTTP tier failed for {handler_name}: {e}")
+        return None
+    if not scraped_data:
+        print(f"[worker {worker_id}] HTTP tier returned no data for {handler_name}. Falling back to the browser.")
+        return None
+    return scraped_data
+
+def _run_handler(worker_id, handler, handler_name, driver, worker_dir):
+    """ハンドラをブラウザで実行する。予期せぬエラーの場合は空の結果を返す"""
+    try:
+        screenshot_paths, scraped_data = handler.process_data_and_screenshot(driver, worker_dir)
+    except Exception as e:
+        # ハンドラ実行中に予期せぬエラーが起きた場合
+        print(f"[worker {worker_id}] !!! An unexpected error occurred in {handler_name}: {e}. Skipping.")
+        traceback.print_exc()
+        return [], []
+    # 撮影をスキップしたパスでは、ハンドラが返したファイルが存在しない
+    existing_paths = [path for path in (screenshot_paths or []) if path and os.path.exists(path)]
+    return existing_paths, scraped_data or []
+
+def _run_with_capture_policy(worker_id, handler, handler_name, get_driver, worker_dir):
+    """
+    まずスクリーンショットなしでデータだけを取得し、前回の撮影時と比べて必要な場合だけ撮影し直す。
+    データ取得は可能ならHTTPで、ブラウザの場合は軽量プロファイルで行う。
+    """
+    scraped_data = None
+    if http_fetch.get_fetch_tier(handler) == http_fetch.TIER_HTTP:
+        print(f"[worker {worker_id}] --- Processing {handler_name} (HTTP tier, data only) ---")
+        scraped_data = _try_http_tier(worker_id, handler, handler_name)
+
+    if scraped_data is None:
+        driver = get_driver()
+        print(f"[worker {worker_id}] --- Processing {handler_name} (data only) ---")
+        browser_profile.enable_lightweight_profile(driver)
+        try:
+            with screenshot.capture_suppressed():
+                _, scraped_data = _run_handler(worker_id, handler, handler_name, driver, worker_dir)
+        finally:
+            browser_profile.restore_full_profile(driver)
+
+    capture, reason = capture_policy.should_capture(handler_name, scraped_data)
+    if not capture:
+        print(f"[worker {worker_id}] Skipping screenshots for {handler_name}: {reason}.")
+        return [], scraped_data, False
+
+    print(f"[worker {worker_id}] --- Capturing {handler_name} ({reason}) ---")
+    screenshot_paths, captured_data = _run_handler(worker_id, handler, handler_name, get_driver(), worker_dir)
+    if screenshot_paths:
+        capture_policy.record_capture(handler_name, captured_data or scraped_data)
+    # 撮影時のデータが取れなかった場合は、データ取得パスの結果を使う
+    # 最大日数が経ったための撮り直しの場合だけ、見た目が前回と同じならアップロードを省いてよい
+    return screenshot_paths, captured_data or scraped_data, capture_policy.is_max_age_recapture(reason)
+
+def _with_compression(compression_pool, handler_name, screenshot_paths, scraped_data, dedup_allowed=False):
+    """スクリーンショットの圧縮をプロセスプールで開始し、次のハンドラの処理と並行させる"""
+    futures = [image_compress.submit(compression_pool, path) for path in screenshot_paths]
+    return (handler_name, (futures, screenshot_paths), scraped_data, dedup_allowed)
+
+class _DriverUnavailable(Exception):
+    pass
+
+def _worker_loop(worker_id, task_queue, results, output_dir, capture_screenshots, use_capture_policy, compression_pool):
+    """キューからハンドラを取り出して、このワーカー専用のChromeで順番に処理する"""
+    # 一時ファイル名が他のワーカーと衝突しないよう、ワーカーごとに保存先を分ける
+    worker_dir = os.path.join(output_dir, f"worker_{worker_id}")
+    os.makedirs(worker_dir, exist_ok=True)
+    driver = None
+
+    def get_driver():
+        # Chromeは必要になったときに起動する
+        nonlocal driver
+        # クラッシュしたブラウザは次のハンドラの前に作り直す
+        if driver is not None and not _is_driver_alive(driver):
+            print(f"[worker {worker_id}] WebDriver is no longer responsive. Restarting Chrome.")
+            _quit_driver(driver)
+            driver = None
+        if driver is None:
+            try:
+                print(f"[worker {worker_id}] Launching Chrome...")
+                driver = create_driver()
+                if not capture_screenshots:
+                    # スクリーンショットを撮らない実行では、画像やフォントを読み込まない
+                    browser_profile.enable_lightweight_profile(driver)
+            except Exception as e:
+                raise _DriverUnavailable(e) from e
+        return driver
+
+    try:
+        while True:
+            try:
+                index, handler = task_queue.get_nowait()
+            except queue.Empty:
+                return
+
+            handler_name = handler.__name__.split('.')[-1]
+
+            try:
+                if use_capture_policy:
+                    screenshot_paths, scraped_data, dedup_allowed = _run_with_capture_policy(worker_id, handler, handler_name, get_driver, worker_dir)
+                    results[index] = _with_compression(compression_pool, handler_name, screenshot_paths, scraped_data, dedup_allowed)
+                    continue
+
+                # スクリーンショットが不要で、HTTPだけで足りるハンドラはChromeを使わない
+                if not capture_screenshots and http_fetch.get_fetch_tier(handler) == http_fetch.TIER_HTTP:
+                    print(f"[worker {worker_id}] --- Processing {handler_name} (HTTP tier) ---")
+                    scraped_data = _try_http_tier(worker_id, handler, handler_name)
+                    if scraped_data is not None:
+                        results[index] = _with_compression(compression_pool, handler_name, [], scraped_data)
+                        continue
+
+                browser = get_driver()
+                print(f"[worker {worker_id}] --- Processing {handler_name} ---")
+                results[index] = _with_compression(compression_pool, handler_name, *_run_handler(worker_id, handler, handler_name, browser, worker_dir))
+            except _DriverUnavailable as e:
+                # Chromeが起動できないワーカーは終了し、残りのハンドラは他のワーカーに任せる
+                print(f"[worker {worker_id}] !!! Failed to launch Chrome: {e}. Returning {handler_name} to the queue.")
+                task_queue.put((index, handler))
+                return
+    finally:
+        if driver is not None:
+            _quit_driver(driver)
+
+def run_handlers_in_pool(handlers, output_dir, num_workers=None, capture_screenshots=True):
+    """
+    ハンドラを複数のChromeワーカーに分散して実行する。
+    capture_screenshots が False の場合、FETCH_TIER = "http" のハンドラはChromeを使わずに処理する。
+    capture_screenshots が True の場合も、取得データが前回の撮影時から変わっていないハンドラは撮影しない
+    （capture_policy を参照。SCREENSHOT_POLICY=always で無効化）。撮影記録はアップロード後に capture_policy.save_state() で保存する。
+    戻り値は (ハンドラ名, スクリーンショットのパス一覧, 取得データ, 知覚ハッシュでの重複除外の可否) のリストで、handlers と同じ順番に並ぶ。
+    重複除外してよいのは、データは変わらず最大日数が経ったために撮り直したスクリーンショットだけ。
+    """
+    if num_workers is None:
+        num_workers = get_worker_count(len(handlers))
+    print(f"--- Processing {len(handlers)} handlers with {num_workers} browser worker(s) ---")
+
+    task_queue = queue.Queue()
+    for index, handler in enumerate(handlers):
+        task_queue.put((index, handler))
+
+    # スクリーンショットを撮る実行では、データが前回の撮影時から変わったハンドラだけを撮影する
+    use_capture_policy = capture_screenshots and capture_policy.is_enabled()
+    if use_capture_policy:
+        capture_policy.load_state()
+
+    # 撮影したスクリーンショットは、ブラウザ処理と並行して別プロセスで圧縮する
+    compression_pool = image_compress.start_pool() if capture_screenshots else None
+
+    results = {}
+    threads = [
+        threading.Thread(target=_worker_loop, args=(worker_id, task_queue, results, output_dir, capture_screenshots, use_capture_policy, compression_pool), name=f"browser-worker-{worker_id}")
+        for worker_id in range(num_workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ordered_results = []
+    try:
+        for index, handler in enumerate(handlers):
+            if index in results:
+                handler_name, (futures, original_paths), scraped_data, dedup_allowed = results[index]
+                screenshot_paths = image_compress.resolve(futures, original_paths, handler_name)
+                if use_capture_policy:
+                    # 撮影記録は、これらのスクリーンショットのアップロードが成功してから確定する
+                    capture_policy.track_uploads(handler_name, screenshot_paths)
+                ordered_results.append((handler_name, screenshot_paths, scraped_data, dedup_allowed))
+            else:
+                # 全ワーカーでChromeが起動できなかった場合など
+                handler_name = handler.__name__.split('.')[-1]
+                print(f"!!! {handler_name} was not processed by any worker.")
+                ordered_results.append((handler_name, [], [], False))
+    finally:
+        if compression_pool is not None:
+            compression_pool.shutdown()
+    return ordered_results
@@ -0,0 +1,84 @@
+import os
+import weakref
+from contextlib import contextmanager
+
+# スクリーンショットを撮らないパスでは、DOMの取得に不要な重いリソースを読み込まない
+BLOCKED_RESOURCE_PATTERNS = [
+    # 画像
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*",
+    # フォント
+    "*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*",
+    # 動画・音声
+    "*.mp4*", "*.webm*", "*.mov*", "*.m3u8*", "*.mp3*",
+]
+
+# 価格やページ内容に関係しない計測・広告・チャット系のドメイン
+BLOCKED_TRACKER_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googleadservices.com*",
+    "*facebook.net*",
+    "*connect.facebook.com*",
+    "*hotjar.com*",
+    "*segment.com*",
+    "*segment.io*",
+    "*intercom.io*",
+    "*intercomcdn.com*",
+    "*hs-scripts.com*",
+    "*hs-analytics.net*",
+    "*clarity.ms*",
+    "*linkedin.com/px*",
+    "*snap.licdn.com*",
+    "*ads-twitter.com*",
+    "*youtube.com/embed*",
+    "*vimeo.com*",
+]
+
+# 環境変数 LIGHTWEIGHT_BROWSING=false で無効化できる（ブロックが原因で表示が崩れるサイトの調査用）
+LIGHTWEIGHT_BROWSING_ENABLED = os.environ.get("LIGHTWEIGHT_BROWSING", "true").lower() not in ("0", "false", "no")
+
+_lightweight_drivers = weakref.WeakSet()
+
+def is_lightweight(driver):
+    return driver in _lightweight_drivers
+
+def enable_lightweight_profile(driver):
+    """
+    CDPの Network.setBlockedURLs で画像・フォント・動画とトラッカーの読み込みを止める。
+    DOMだけが必要なパス（データ取得のみ、変更検知）で使う。戻り値は有効にできたかどうか。
+    """
+    if not LIGHTWEIGHT_BROWSING_ENABLED:
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_PATTERNS + BLOCKED_TRACKER_PATTERNS})
+        _lightweight_drivers.add(driver)
+        return True
+    except Exception as e:
+        print(f"  -> WARNING: Could not enable lightweight browsing profile: {e}")
+        return False
+
+def restore_full_profile(driver):
+    """ブロックを解除して、すべてのリソースを読み込む通常のプロファイルに戻す"""
+    try:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+    except Exception as e:
+        print(f"  -> WARNING: Could not restore full browsing profile: {e}")
+    _lightweight_drivers.discard(driver)
+
+@contextmanager
+def full_profile(driver):
+    """
+    スクリーンショットを撮る間だけ通常のプロファイルに戻す。
+    軽量プロファイルが有効だった場合は、抜けるときに再び有効にする。
+    ブロックを解除しても読み込み済みのページには反映されないため、呼び出し側でページを読み込み直すこと。
+    """
+    was_lightweight = is_lightweight(driver)
+    if was_lightweight:
+        restore_full_profile(driver)
+    try:
+        yield was_lightweight
+    finally:
+        if was_lightweight:
+            enable_lightweight_profile(driver)
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from utils import price_record
+
+# 前回スクリーンショットを撮ったときの取得データ（のハッシュ）をハンドラごとに保存しておく
+STATE_BUCKET = "gcs-bucket-for-html"
+STATE_BLOB_PATH = "capture_state/handlers.json"
+
+# データが変わっていなくても、この日数が経ったらスクリーンショットを撮り直す
+DEFAULT_MAX_AGE_DAYS = 7
+
+_state = {}
+_state_dirty = False
+_pending = {} # ハンドラ名 -> [撮影記録, アップロード待ちのファイル名の集合]。すべてアップロードされたら _state に記録する
+_state_lock = threading.Lock()
+
+def is_enabled():
+    """環境変数 SCREENSHOT_POLICY=always のときは、従来どおり毎回スクリーンショットを撮る"""
+    return os.environ.get("SCREENSHOT_POLICY", "changed").lower() != "always"
+
+def get_max_age():
+    env_value = os.getenv("SCREENSHOT_MAX_AGE_DAYS")
+    try:
+        days = float(env_value) if env_value else DEFAULT_MAX_AGE_DAYS
+    except ValueError:
+        print(f"WARNING: Invalid SCREENSHOT_MAX_AGE_DAYS value '{env_value}'. Falling back to default.")
+        days = DEFAULT_MAX_AGE_DAYS
+    return timedelta(days=days)
+
+def rows_fingerprint(rows):
+    """取得データの行リストから、順番や辞書のキー順に依存しないハッシュ値を作る"""
+    normalized = sorted(json.dumps(price_record.to_dict(row), sort_keys=True, ensure_ascii=False, default=str) for row in rows)
+    return hashlib.sha256("\n".join(normalized).encode("utf-8")).hexdigest()
+
+def _state_blob():
+    from google.cloud import storage
+    return storage.Client().bucket(STATE_BUCKET).blob(STATE_BLOB_PATH)
+
+def load_state():
+    """GCSから前回の撮影記録を読み込む。読み込めない場合は記録なし（全ハンドラで撮影）として扱う"""
+    global _state, _state_dirty
+    loaded = {}
+    try:
+        blob = _state_blob()
+        if blob.exists():
+            loaded = json.loads(blob.download_as_text())
+    except Exception as e:
+        print(f"WARNING: Could not load screenshot capture state: {e}. Capturing all handlers.")
+    with _state_lock:
+        _state = loaded
+        _state_dirty = False
+        _pending.clear()
+
+def save_state():
+    """アップロードまで終わった撮影記録をGCSに保存する（アップロードの後に呼ぶ。記録がなければ何もしない）"""
+    global _state_dirty
+    with _state_lock:
+        if not _state_dirty:
+            return
+        payload = json.dumps(_state, ensure_ascii=False, indent=2)
+        _state_dirty = False
+    try:
+        _state_blob().upload_from_string(payload, content_type="application/json")
+        print(f"Screenshot capture state saved to gs://{STATE_BUCKET}/{STATE_BLOB_PATH}")
+    except Exception as e:
+        print(f"WARNING: Could not save screenshot capture state: {e}")
+
+# データは変わっていないが、最大日数が経ったので撮り直す場合の理由
+MAX_AGE_REASON_PREFIX = "last capture is older than"
+
+def is_max_age_recapture(reason):
+    """
+    should_capture の理由が「最大日数が経ったための撮り直し」かどうか。
+    この場合だけ、見た目が前回と同じスクリーンショットのアップロードを省いてよい
+    （価格の数字だけの変化は知覚ハッシュでは検知できないため、データが変わったときの撮影は必ずアップロードする）。
+    """
+    return bool(reason) and reason.startswith(MAX_AGE_REASON_PREFIX)
+
+def should_capture(handler_name, rows):
+    """
+    スクリーンショットを撮るべきかどうかと、その理由を返す。
+    データが取れなかった場合、前回撮影時からデータが変わった場合、前回の撮影から最大日数が経った場合に撮る。
+    """
+    if not rows:
+        return True, "no data parsed"
+
+    with _state_lock:
+        previous = _state.get(handler_name)
+    if not previous:
+        return True, "no previous capture"
+    if previous.get("fingerprint") != rows_fingerprint(rows):
+        return True, "pricing data changed"
+
+    try:
+        captured_at = datetime.fromisoformat(previous["captured_at"])
+    except (KeyError, ValueError):
+        return True, "unknown capture date"
+    if datetime.now() - captured_at >= get_max_age():
+        return True, f"{MAX_AGE_REASON_PREFIX} {get_max_age().days} day(s)"
+    return False, f"pricing data unchanged since {captured_at:%Y-%m-%d}"
+
+def _entry_name(entry):
+    return entry[0] if isinstance(entry, tuple) else os.path.basename(entry)
+
+def record_capture(handler_name, rows):
+    """
+    スクリーンショットを撮ったときのデータを保留しておく。
+    track_uploads() で渡したファイルがすべてアップロードされるまでは記録しない（失敗した場合は次回また撮影する）。
+    """
+    if not rows:
+        return
+    with _state_lock:
+        _pending[handler_name] = [{
+            "fingerprint": rows_fingerprint(rows),
+            "captured_at": datetime.now().isoformat(timespec="seconds"),
+            "rows": len(rows),
+        }, set()]
+
+def track_uploads(handler_name, entries):
+    """保留中の撮影記録に、アップロードするスクリーンショット（圧縮後のパス、または (ファイル名, バイト列)）を結びつける"""
+    with _state_lock:
+        pending = _pending.get(handler_name)
+        if pending is not None:
+            pending[1].update(_entry_name(entry) for entry in entries)
+
+def record_uploaded(entry):
+    """
+    アップロードが成功したスクリーンショットを記録する（drive_upload の on_uploaded から呼ぶ）。
+    ハンドラのスクリーンショットがすべてアップロードされたら、そのハンドラの撮影記録を確定する。
+    """
+    global _state_dirty
+    name = _entry_name(entry)
+    with _state_lock:
+        for handler_name, (value, remaining) in list(_pending.items()):
+            if name not in remaining:
+                continue
+            remaining.discard(name)
+            if not remaining:
+                _state[handler_name] = value
+                _state_dirty = True
+                del _pending[handler_name]
+            return
@@ -0,0 +1,110 @@
+import json
+import re
+import threading
+from datetime import datetime, timedelta
+
+# フォルダのパス（親フォルダID/名前/...）とDriveのフォルダIDの対応を実行をまたいで保存しておく
+CACHE_BUCKET = "gcs-bucket-for-html"
+CACHE_BLOB_PATH = "drive_folder_cache.json"
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+# 日付のフォルダ（例: "2025-08-08"）のIDは、この日数より古いものをキャッシュから消す（毎日1つずつ増えるため）
+DATED_FOLDER_RETENTION_DAYS = 7
+_DATED_SEGMENT = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+_cache = None
+_cache_dirty = False
+_lock = threading.RLock()
+
+def _cache_blob():
+    from google.cloud import storage
+    return storage.Client().bucket(CACHE_BUCKET).blob(CACHE_BLOB_PATH)
+
+def _load_cache():
+    global _cache
+    if _cache is not None:
+        return
+    _cache = {}
+    try:
+        blob = _cache_blob()
+        if blob.exists():
+            _cache = json.loads(blob.download_as_text())
+            print(f"Loaded {len(_cache)} cached Drive folder ID(s).")
+    except Exception as e:
+        print(f"WARNING: Could not load Drive folder cache: {e}. Resolving folders live.")
+
+def _prune_dated_keys():
+    """古い日付のフォルダ（とその配下）のキーを消す。消したキーの数を返す。_lock を持った状態で呼ぶ"""
+    oldest = (datetime.now() - timedelta(days=DATED_FOLDER_RETENTION_DAYS)).strftime('%Y-%m-%d')
+    stale = [
+        key for key in _cache
+        if any(_DATED_SEGMENT.match(segment) and segment < oldest for segment in key.split("/")[1:])
+    ]
+    for key in stale:
+        del _cache[key]
+    return len(stale)
+
+def save_cache():
+    """この実行で新しく解決したフォルダIDをGCSに保存する（古い日付のフォルダのIDは消してから保存する）"""
+    global _cache_dirty
+    with _lock:
+        if not _cache_dirty:
+            return
+        pruned = _prune_dated_keys()
+        if pruned:
+            print(f"Pruned {pruned} Drive folder ID(s) older than {DATED_FOLDER_RETENTION_DAYS} day(s) from the cache.")
+        payload = json.dumps(_cache, ensure_ascii=False, indent=1, sort_keys=True)
+        _cache_dirty = False
+    try:
+        _cache_blob().upload_from_string(payload, content_type="application/json")
+    except Exception as e:
+        print(f"WARNING: Could not save Drive folder cache: {e}")
+
+def _cache_key(parent_id, names):
+    return "/".join((parent_id,) + tuple(names))
+
+def _find_or_create_folder(service, parent_id, name):
+    query = f"'{parent_id}' in parents and name='{name}' and mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
+    response = service.files().list(q=query, spaces='drive', fields='files(id, name)', supportsAllDrives=True, includeItemsFromAllDrives=True).execute()
+    items = response.get('files', [])
+    if items:
+        return items[0].get('id')
+
+    print(f"Creating '{name}' folder...")
+    folder_meta = {'name': name, 'mimeType': FOLDER_MIME_TYPE, 'parents': [parent_id]}
+    folder = service.files().create(body=folder_meta, fields='id', supportsAllDrives=True).execute()
+    return folder.get('id')
+
+def resolve_folder(service, parent_id, *names):
+    """
+    parent_id の下の names（例: "MONITORING", "runpod"）のフォルダIDを返す。なければ作成する。
+    キャッシュにあればDrive APIを呼ばない。
+    """
+    global _cache_dirty
+    with _lock:
+        _load_cache()
+        folder_id = parent_id
+        for depth in range(1, len(names) + 1):
+            key = _cache_key(parent_id, names[:depth])
+            cached_id = _cache.get(key)
+            if cached_id:
+                folder_id = cached_id
+                continue
+            folder_id = _find_or_create_folder(service, folder_id, names[depth - 1])
+            _cache[key] = folder_id
+            _cache_dirty = True
+        return folder_id
+
+def invalidate(parent_id, *names):
+    """キャッシュしたIDが古かった場合（削除・移動された場合）に、そのフォルダと配下のキャッシュを消す"""
+    global _cache_dirty
+    key = _cache_key(parent_id, names)
+    with _lock:
+        _load_cache()
+        for cached_key in [k for k in _cache if k == key or k.startswith(key + "/")]:
+            del _cache[cached_key]
+            _cache_dirty = True
+
+def is_not_found_error(error):
+    """アップロード先のフォルダが見つからない（キャッシュが古い）エラーかどうか"""
+    response = getattr(error, "resp", None)
+    return getattr(response, "status", None) == 404
@@ -0,0 +1,124 @@
+import io
+import mimetypes
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+
+from utils import drive_folders
+
+DEFAULT_CONCURRENCY = 4
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 1.0
+CHUNK_SIZE_BYTES = 8 * 1024 * 1024 # レジューム可能アップロードの1チャンク
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('image/avif', '.avif')
+
+def get_concurrency():
+    """同時アップロード数。環境変数 DRIVE_UPLOAD_CONCURRENCY で変更できる"""
+    env_value = os.getenv("DRIVE_UPLOAD_CONCURRENCY")
+    try:
+        return max(1, int(env_value)) if env_value else DEFAULT_CONCURRENCY
+    except ValueError:
+        print(f"WARNING: Invalid DRIVE_UPLOAD_CONCURRENCY value '{env_value}'. Falling back to default.")
+        return DEFAULT_CONCURRENCY
+
+def entry_name(entry):
+    """アップロード対象（ファイルパス、または (ファイル名, PNGバイト列)）のファイル名"""
+    return entry[0] if isinstance(entry, tuple) else os.path.basename(entry or "")
+
+def _entry_size(entry):
+    return len(entry[1]) if isinstance(entry, tuple) else os.path.getsize(entry)
+
+def _mimetype(entry):
+    # 圧縮後の .webp / .avif もあるため、拡張子から判定する
+    return mimetypes.guess_type(entry_name(entry))[0] or 'image/png'
+
+def _create_media(entry):
+    if isinstance(entry, tuple):
+        return MediaIoBaseUpload(io.BytesIO(entry[1]), mimetype=_mimetype(entry), chunksize=CHUNK_SIZE_BYTES, resumable=True)
+    return MediaFileUpload(entry, mimetype=_mimetype(entry), chunksize=CHUNK_SIZE_BYTES, resumable=True)
+
+def _is_retryable(error):
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRYABLE_STATUS
+    # ファイルが読めないなどの OSError は再試行しても直らないため、ネットワークのエラーだけ再試行する
+    return isinstance(error, (ConnectionError, TimeoutError, socket.timeout))
+
+def _upload_one(service, parent_folder_id, folder_path, entry):
+    """
+    1ファイルをレジューム可能なセッションでアップロードする。失敗した場合はバックオフして再試行する。
+    再試行では同じリクエストの next_chunk() を呼び、送信済みのチャンクの続きから再開する。
+    """
+    attempt = 0
+    request = None
+    while True:
+        attempt += 1
+        if request is None:
+            folder_id = drive_folders.resolve_folder(service, parent_folder_id, *folder_path)
+            file_meta = {'name': entry_name(entry), 'parents': [folder_id]}
+            request = service.files().create(body=file_meta, media_body=_create_media(entry), fields='id', supportsAllDrives=True)
+        try:
+            response = None
+            while response is None:
+                _, response = request.next_chunk()
+            return attempt
+        except Exception as e:
+            if drive_folders.is_not_found_error(e) and attempt == 1:
+                # キャッシュしたフォルダIDが古い場合は、解決し直してリクエストを作り直し、すぐに再試行する
+                print(f"  -> Cached Drive folder for '{'/'.join(folder_path)}' is stale. Resolving it again.")
+                drive_folders.invalidate(parent_folder_id, folder_path[0])
+                request = None
+                continue
+            if attempt >= MAX_ATTEMPTS or not _is_retryable(e):
+                raise
+            delay = BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)) + random.uniform(0, 0.5)
+            print(f"  -> Upload of {entry_name(entry)} failed ({e}). Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+def upload_files(service_factory, parent_folder_id, uploads, concurrency=None, on_uploaded=None):
+    """
+    uploads（(フォルダのパス, アップロード対象) のリスト）をスレッドプールで並行してアップロードする。
+    Driveのサービスオブジェクトはスレッドセーフではないため、service_factory でスレッドごとに作る。
+    on_uploaded を渡すと、アップロードに成功したアップロード対象ごとに呼ぶ。戻り値は (成功数, 失敗数)。
+    """
+    if not uploads:
+        return 0, 0
+    concurrency = min(concurrency or get_concurrency(), len(uploads))
+    local = threading.local()
+
+    def get_service():
+        if not hasattr(local, "service"):
+            local.service = service_factory()
+        return local.service
+
+    def run(folder_path, entry):
+        name = entry_name(entry)
+        started = time.monotonic()
+        try:
+            size_mb = _entry_size(entry) / 1_000_000
+            attempts = _upload_one(get_service(), parent_folder_id, folder_path, entry)
+        except Exception as e:
+            print(f"!!! FAILED to upload {name}: {e}")
+            return False
+        elapsed = time.monotonic() - started
+        retry_note = f", {attempts} attempts" if attempts > 1 else ""
+        print(f"Uploaded {name} to '{'/'.join(folder_path)}' ({size_mb:.1f} MB in {elapsed:.1f}s{retry_note}).")
+        if on_uploaded is not None:
+            on_uploaded(entry)
+        return True
+
+    started = time.monotonic()
+    print(f"Uploading {len(uploads)} file(s) to Google Drive with {concurrency} parallel upload(s)...")
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="drive-upload") as executor:
+        results = list(executor.map(lambda upload: run(*upload), uploads))
+    successful = sum(results)
+    print(f"Drive upload finished in {time.monotonic() - started:.1f}s.")
+    return successful, len(results) - successful
@@ -0,0 +1,107 @@
+import os
+import threading
+from datetime import datetime
+
+# 為替レートはプロセス内で1日1度だけ読み込み、全ハンドラの非USDの行をまとめて変換する
+# ECBの「当日分のみ」のファイルを日付つきで保存しておき、同じ日はそれを使う（同梱の全期間の履歴は読み込まない）
+DEFAULT_CACHE_DIR = "/tmp/exchange_rates"
+DOWNLOAD_TIMEOUT_SECONDS = 10
+TARGET_CURRENCY = "USD"
+
+# 変換する価格の項目（数値の場合だけ変換する）
+PRICE_FIELDS = (
+    "total_price",
+    "hourly_rate",
+    "commitment_1_month",
+    "commitment_3_month",
+    "commitment_6_month",
+    "commitment_12_month",
+)
+
+_converter = None # (日付, CurrencyConverter)。日付が変わったら読み込み直す
+_rates = {} # (通貨, 変換先) -> (レート, レートの日付)。_converter と同じ日の分だけ持つ
+_lock = threading.Lock()
+
+def _snapshot_path(date_str):
+    cache_dir = os.environ.get("EXCHANGE_RATES_CACHE_DIR", DEFAULT_CACHE_DIR)
+    return os.path.join(cache_dir, f"eurofxref_{date_str}.zip")
+
+def _today():
+    return datetime.now().strftime('%Y-%m-%d')
+
+def _load_converter(date_str):
+    import urllib.request
+    from currency_converter import SINGLE_DAY_ECB_URL, CurrencyConverter
+
+    path = _snapshot_path(date_str)
+    try:
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with urllib.request.urlopen(SINGLE_DAY_ECB_URL, timeout=DOWNLOAD_TIMEOUT_SECONDS) as response:
+                content = response.read()
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            print(f"Downloaded exchange-rate snapshot to {path}.")
+        return CurrencyConverter(path)
+    except Exception as e:
+        print(f"WARNING: Could not load exchange-rate snapshot ({e}). Falling back to the bundled ECB history.")
+        return CurrencyConverter(fallback_on_missing_rate=True)
+
+def get_converter():
+    """プロセス内で共有する CurrencyConverter（その日に最初に使うときに読み込む）"""
+    global _converter
+    today = _today()
+    with _lock:
+        if _converter is None or _converter[0] != today:
+            _converter = (today, _load_converter(today))
+            _rates.clear()
+        return _converter[1]
+
+def get_rate(currency, target=TARGET_CURRENCY):
+    """1 currency あたりの target の額と、そのレートの日付 (YYYY-MM-DD) を返す"""
+    converter = get_converter()
+    key = (currency, target)
+    with _lock:
+        if key in _rates:
+            return _rates[key]
+    rate_date = converter.bounds[currency].last_date
+    result = (converter.convert(1, currency, target, date=rate_date), rate_date.isoformat())
+    with _lock:
+        if _converter is not None and _converter[1] is converter:
+            _rates[key] = result
+    return result
+
+def convert_records(records, target=TARGET_CURRENCY):
+    """
+    通貨が target 以外の PriceRecord の価格を target に変換する。
+    レートは通貨ごとに1度だけ求め、使ったレートと日付を各行に記録する。変換できない行は除く。
+    """
+    rates = {}
+    converted = []
+    for record in records:
+        currency = (record.currency or target).upper()
+        if currency == target:
+            converted.append(record)
+            continue
+        if currency not in rates:
+            try:
+                rates[currency] = get_rate(currency, target)
+                print(f"Converting {currency} rows to {target} at {rates[currency][0]:.6f} ({rates[currency][1]}).")
+            except Exception as e:
+                print(f"WARNING: No exchange rate for {currency} -> {target} ({e}). Skipping its rows.")
+                rates[currency] = None
+        if rates[currency] is None:
+            continue
+        rate, rate_date = rates[currency]
+        for name in PRICE_FIELDS:
+            value = getattr(record, name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                setattr(record, name, round(value * rate, 4))
+        record.original_currency = currency
+        record.exchange_rate = rate
+        record.exchange_rate_date = rate_date
+        record.currency = target
+        converted.append(record)
+    return converted
@@ -0,0 +1,101 @@
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml があればそれを使う（html.parser より数倍速い）。環境変数 HTML_PARSER で比較用に切り替えられる
+_DEFAULT_PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+PARSER = os.environ.get("HTML_PARSER", _DEFAULT_PARSER)
+
+# 1回の実行（リクエスト）の中で同じHTMLを何度もパースしないよう、直近のパース結果を保持する
+CACHE_MAX_ENTRIES = 32
+
+# "div", "#id", ".class", "div#id", "div.class" のような単純なセレクタだけ SoupStrainer に変換できる
+_SIMPLE_SELECTOR = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*)?(?:#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+))?$")
+
+_cache = OrderedDict()
+_stats = {"parses": 0, "cache_hits": 0, "seconds": 0.0, "bytes": 0}
+_lock = threading.Lock()
+
+def strainer_for(selector):
+    """単純なCSSセレクタを SoupStrainer に変換する。変換できない場合は None を返す"""
+    if not selector:
+        return None
+    match = _SIMPLE_SELECTOR.match(selector.strip())
+    if not match or not any(match.groupdict().values()):
+        return None
+    tag, element_id, class_name = match.group("tag"), match.group("id"), match.group("cls")
+    attrs = {}
+    if element_id:
+        attrs["id"] = element_id
+    if class_name:
+        attrs["class"] = class_name
+    return SoupStrainer(tag or True, attrs=attrs)
+
+def is_simple_selector(selector):
+    return strainer_for(selector) is not None
+
+def parse_html(html, parse_only=None, cache=True):
+    """
+    HTMLをパースして BeautifulSoup を返す。
+    parse_only に SoupStrainer（またはセレクタ文字列）を渡すと、その要素の部分木だけをパースする。
+    cache=True の場合、同じHTMLのパース結果を使い回すため、返された soup を変更してはいけない
+    （decompose などで書き換える場合は cache=False を指定する）。
+    """
+    if isinstance(parse_only, str):
+        strainer_key = parse_only
+        parse_only = strainer_for(parse_only)
+    else:
+        strainer_key = repr(parse_only) if parse_only is not None else None
+
+    html = html or ""
+    cache_key = None
+    if cache:
+        cache_key = (hashlib.sha1(html.encode("utf-8", "surrogatepass")).hexdigest(), strainer_key)
+        with _lock:
+            soup = _cache.get(cache_key)
+            if soup is not None:
+                _cache.move_to_end(cache_key)
+                _stats["cache_hits"] += 1
+                return soup
+
+    started = time.perf_counter()
+    soup = BeautifulSoup(html, PARSER, parse_only=parse_only)
+    elapsed = time.perf_counter() - started
+
+    with _lock:
+        _stats["parses"] += 1
+        _stats["seconds"] += elapsed
+        _stats["bytes"] += len(html)
+        if cache_key is not None:
+            _cache[cache_key] = soup
+            while len(_cache) > CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+    if os.environ.get("HTML_PARSE_TIMING"):
+        print(f"  -> Parsed {len(html)} chars with {PARSER}{' (partial)' if parse_only is not None else ''} in {elapsed * 1000:.1f}ms.")
+    return soup
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+def reset():
+    """リクエストごとにキャッシュと集計を初期化する（Cloud Runのインスタンスが再利用されても前回の分を持ち越さない）"""
+    with _lock:
+        _cache.clear()
+        _stats.update(parses=0, cache_hits=0, seconds=0.0, bytes=0)
+
+def report_stats():
+    """この実行でのパース回数・キャッシュヒット数・合計時間を表示する"""
+    with _lock:
+        stats = dict(_stats)
+    average_ms = stats["seconds"] / stats["parses"] * 1000 if stats["parses"] else 0.0
+    print(
+        f"HTML parse stats ({PARSER}): {stats['parses']} parse(s), {stats['cache_hits']} cache hit(s), "
+        f"{stats['bytes'] / 1_000_000:.1f}M chars, {stats['seconds']:.2f}s total ({average_ms:.1f}ms/page)."
+    )
@@ -0,0 +1,50 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ブラウザ版と同じユーザーエージェントを使い、bot判定でHTMLが変わらないようにする
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36'
+DEFAULT_TIMEOUT_SECONDS = 20
+POOL_MAXSIZE = 10
+
+# ハンドラが「ブラウザ不要」を宣言するための値（各ハンドラの FETCH_TIER に設定する）
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """keep-aliveで接続を使い回す共有 requests.Session を返す（プロセス内で1つ）"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+            adapter = HTTPAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9,ja;q=0.8",
+            })
+            _session = session
+        return _session
+
+def fetch_html(url, timeout=DEFAULT_TIMEOUT_SECONDS):
+    """URLのHTMLをHTTPで取得する。失敗した場合は None を返す"""
+    try:
+        response = get_session().get(url, timeout=timeout)
+        response.raise_for_status()
+        print(f"  -> Fetched {url} over HTTP ({len(response.content)} bytes).")
+        return response.text
+    except Exception as e:
+        print(f"  -> HTTP fetch failed for {url}: {e}")
+        return None
+
+def get_fetch_tier(handler):
+    """ハンドラが宣言している取得方式を返す（未宣言ならブラウザ）"""
+    return getattr(handler, "FETCH_TIER", TIER_BROWSER)
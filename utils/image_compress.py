@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from PIL import Image, features
+
+# 保存形式（環境変数 SCREENSHOT_FORMAT）
+#   png           : 撮影したPNGをそのまま使う（圧縮しない）
+#   png8          : 256色に減色したPNG
+#   webp-lossless : 可逆圧縮のWebP（既定）
+#   webp / avif   : 非可逆圧縮。品質は SCREENSHOT_QUALITY（既定80）
+FORMAT_PNG = "png"
+FORMAT_PNG8 = "png8"
+FORMAT_WEBP_LOSSLESS = "webp-lossless"
+FORMAT_WEBP = "webp"
+FORMAT_AVIF = "avif"
+DEFAULT_FORMAT = FORMAT_WEBP_LOSSLESS
+DEFAULT_QUALITY = 80
+
+# WebPは縦横とも16383pxまでしか扱えない。これを超える縦長のページはPNGのまま最適化する
+WEBP_MAX_DIMENSION = 16383
+
+_EXTENSIONS = {FORMAT_PNG8: ".png", FORMAT_WEBP_LOSSLESS: ".webp", FORMAT_WEBP: ".webp", FORMAT_AVIF: ".avif"}
+
+def get_format():
+    fmt = os.environ.get("SCREENSHOT_FORMAT", DEFAULT_FORMAT).lower()
+    if fmt not in (FORMAT_PNG, *_EXTENSIONS):
+        print(f"WARNING: Unknown SCREENSHOT_FORMAT '{fmt}'. Falling back to {DEFAULT_FORMAT}.")
+        return DEFAULT_FORMAT
+    return fmt
+
+def get_quality():
+    env_value = os.getenv("SCREENSHOT_QUALITY")
+    try:
+        return max(1, min(100, int(env_value))) if env_value else DEFAULT_QUALITY
+    except ValueError:
+        print(f"WARNING: Invalid SCREENSHOT_QUALITY value '{env_value}'. Falling back to default.")
+        return DEFAULT_QUALITY
+
+def _save_optimized_png(image, output_path):
+    image.save(output_path, format="PNG", optimize=True)
+
+def compress_file(path, fmt, quality):
+    """
+    【プロセスプールで実行】PNGを指定の形式で保存し直し、元のファイルを削除する。
+    戻り値は (新しいパス, 圧縮前のバイト数, 圧縮後のバイト数)。
+    """
+    before = os.path.getsize(path)
+    base, _ = os.path.splitext(path)
+    output_path = base + _EXTENSIONS[fmt]
+    if output_path == path:
+        output_path = base + ".min.png"
+
+    with Image.open(path) as image:
+        image.load()
+        too_large_for_webp = max(image.size) > WEBP_MAX_DIMENSION
+        if fmt == FORMAT_AVIF and not features.check("avif"):
+            # AVIFに対応していないPillowではWebPで代用する
+            fmt, output_path = FORMAT_WEBP, base + ".webp"
+
+        if fmt == FORMAT_PNG8:
+            image.convert("RGB").quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(output_path, format="PNG", optimize=True)
+        elif fmt in (FORMAT_WEBP_LOSSLESS, FORMAT_WEBP) and too_large_for_webp:
+            output_path = base + ".min.png"
+            _save_optimized_png(image, output_path)
+        elif fmt == FORMAT_WEBP_LOSSLESS:
+            image.save(output_path, format="WEBP", lossless=True, method=4)
+        elif fmt == FORMAT_WEBP:
+            image.convert("RGB").save(output_path, format="WEBP", quality=quality, method=4)
+        else:
+            image.convert("RGB").save(output_path, format="AVIF", quality=quality)
+
+    after = os.path.getsize(output_path)
+    if after >= before:
+        # 小さくならなかった場合は元のPNGを使う
+        os.remove(output_path)
+        return path, before, before
+    os.remove(path)
+    return output_path, before, after
+
+def start_pool(max_workers=None):
+    """
+    圧縮用のプロセスプールを作る（圧縮しない設定の場合は None）。
+    ブラウザのスレッドが動いている中で fork しないよう、spawn でワーカーを起動する。
+    """
+    if get_format() == FORMAT_PNG:
+        return None
+    max_workers = max_workers or max(1, min(2, (os.cpu_count() or 1) - 1))
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+def submit(pool, path):
+    """スクリーンショットの圧縮を開始して Future を返す（ブラウザ処理と並行して進む）"""
+    if pool is None or not path:
+        future = Future()
+        future.set_result((path, 0, 0))
+        return future
+    return pool.submit(compress_file, path, get_format(), get_quality())
+
+def resolve(futures, original_paths, label=""):
+    """圧縮結果のパスの一覧を返す。失敗したファイルは元のPNGのパスを使う"""
+    paths = []
+    total_before = total_after = 0
+    for future, original_path in zip(futures, original_paths):
+        try:
+            path, before, after = future.result()
+            total_before += before
+            total_after += after
+            paths.append(path)
+        except Exception as e:
+            print(f"  -> WARNING: Failed to compress {os.path.basename(original_path)}: {e}. Using the original PNG.")
+            paths.append(original_path)
+    if total_before:
+        print(f"  -> Compressed {label} screenshots ({get_format()}): {total_before / 1_000_000:.1f} MB -> {total_after / 1_000_000:.1f} MB.")
+    return paths
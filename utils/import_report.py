@@ -0,0 +1,88 @@
+"""
+import にかかる時間を `python -X importtime` で計測し、まとめて表示する。
+
+    python -m utils.import_report                 # main の import 時間の上位を表示
+    python -m utils.import_report --budget-ms 800 # 合計が予算を超えたら終了コード 1（CIでの回帰チェック用）
+    python -m utils.import_report providers.runpod_handler --top 30
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+DEFAULT_MODULE = "main"
+DEFAULT_BUDGET_MS = 1000 # main の import にかけてよい時間の目安。IMPORT_TIME_BUDGET_MS で変更できる
+DEFAULT_TOP = 15
+
+# import time: self [us] | cumulative | imported package
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure(module, cwd=None):
+    """
+    別プロセスで module を import し、(モジュール名, 自身の時間[us], 累積時間[us], 深さ) のリストを返す。
+    import に失敗した場合は RuntimeError。
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    if result.returncode != 0:
+        error = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed:\n" + "\n".join(error[-10:]))
+    return entries
+
+def summarize(entries, top=DEFAULT_TOP):
+    """合計時間と、累積時間の大きいトップレベルのパッケージ（深さ0で最初の名前ごと）を返す"""
+    total_us = sum(self_us for _, self_us, _, _ in entries)
+    packages = {}
+    for name, _, cumulative_us, depth in entries:
+        if depth == 0:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + cumulative_us
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return total_us, ranked
+
+def get_budget_ms():
+    env_value = os.getenv("IMPORT_TIME_BUDGET_MS")
+    try:
+        return float(env_value) if env_value else DEFAULT_BUDGET_MS
+    except ValueError:
+        print(f"WARNING: Invalid IMPORT_TIME_BUDGET_MS value '{env_value}'. Falling back to default.")
+        return DEFAULT_BUDGET_MS
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize `python -X importtime` for a module.")
+    parser.add_argument("module", nargs="?", default=DEFAULT_MODULE)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if the total import time exceeds this")
+    parser.add_argument("--runs", type=int, default=3, help="take the fastest of N runs to reduce noise")
+    args = parser.parse_args(argv)
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        runs = [summarize(measure(args.module, cwd=project_root), args.top) for _ in range(max(1, args.runs))]
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        return 2
+    total_us, ranked = min(runs, key=lambda run: run[0])
+
+    print(f"Import time for '{args.module}': {total_us / 1000:.1f} ms (fastest of {len(runs)} run(s))")
+    for package, cumulative_us in ranked:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {package}")
+
+    budget_ms = args.budget_ms if args.budget_ms is not None else get_budget_ms()
+    if total_us / 1000 > budget_ms:
+        print(f"FAILED: import time {total_us / 1000:.1f} ms exceeds the budget of {budget_ms:.0f} ms.")
+        return 1
+    print(f"OK: within the budget of {budget_ms:.0f} ms.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
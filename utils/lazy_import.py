@@ -0,0 +1,29 @@
+import importlib
+import threading
+
+# Cloud Runのコールドスタートを短くするため、重いSDKやモジュールは最初に使うときに import する
+_lock = threading.Lock()
+
+class LazyModule:
+    """最初に属性を参照したときにモジュールを import するプロキシ"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_module(name):
+    return LazyModule(name)
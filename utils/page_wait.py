@@ -0,0 +1,117 @@
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+DEFAULT_TIMEOUT_SECONDS = 5 # 従来の time.sleep(5) と同じ上限
+DEFAULT_DOM_QUIET_MS = 500
+POLL_INTERVAL_SECONDS = 0.1
+
+# DOMの最終変更時刻を記録するMutationObserverを仕込む（同じページでは一度だけ）。
+# 呼び出し時点を起点にするため、最終変更時刻は毎回リセットする。
+_INSTALL_MUTATION_OBSERVER_JS = """
+window.__harvesterLastMutation = performance.now();
+if (!window.__harvesterMutationObserver) {
+    window.__harvesterMutationObserver = new MutationObserver(() => {
+        window.__harvesterLastMutation = performance.now();
+    });
+    window.__harvesterMutationObserver.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+"""
+
+# [DOMが最後に変化してからの経過ms, これまでに完了したリソース数]
+_PAGE_ACTIVITY_JS = """
+return [
+    performance.now() - (window.__harvesterLastMutation || 0),
+    performance.getEntriesByType('resource').length
+];
+"""
+
+def _locator(selector):
+    """'/' で始まるセレクタはXPath、それ以外はCSSセレクタとして扱う"""
+    if selector.startswith("/") or selector.startswith("("):
+        return (By.XPATH, selector)
+    return (By.CSS_SELECTOR, selector)
+
+def _remaining(deadline):
+    return max(0.0, deadline - time.monotonic())
+
+def _wait_for_document_complete(driver, deadline):
+    while True:
+        try:
+            if driver.execute_script("return document.readyState") == "complete":
+                return True
+        except Exception:
+            pass
+        if _remaining(deadline) <= 0:
+            return False
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+def _wait_for_selector(driver, selector, deadline):
+    try:
+        WebDriverWait(driver, _remaining(deadline), poll_frequency=POLL_INTERVAL_SECONDS).until(
+            EC.presence_of_element_located(_locator(selector))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+def _wait_for_quiet(driver, deadline, dom_quiet_ms, network_idle_ms):
+    """DOMの変更とリソースの読み込みが、それぞれ指定時間止まるまで待つ"""
+    driver.execute_script(_INSTALL_MUTATION_OBSERVER_JS)
+    last_resource_count = None
+    resource_count_changed_at = time.monotonic()
+
+    while True:
+        dom_quiet_elapsed_ms, resource_count = driver.execute_script(_PAGE_ACTIVITY_JS)
+        now = time.monotonic()
+        if resource_count != last_resource_count:
+            last_resource_count = resource_count
+            resource_count_changed_at = now
+
+        dom_ready = not dom_quiet_ms or dom_quiet_elapsed_ms >= dom_quiet_ms
+        network_ready = not network_idle_ms or (now - resource_count_changed_at) * 1000 >= network_idle_ms
+        if dom_ready and network_ready:
+            return True
+        if _remaining(deadline) <= 0:
+            return False
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+def wait_for_page_ready(driver, selector=None, network_idle_ms=None, dom_quiet_ms=DEFAULT_DOM_QUIET_MS, timeout=DEFAULT_TIMEOUT_SECONDS):
+    """
+    固定の time.sleep の代わりに、ページの準備ができるまで待つ。
+    document.readyState が complete になった後、指定された条件（セレクタの出現、
+    ネットワークの静止、DOM変更の静止）をすべて満たした時点で戻る。
+    timeout 秒を超えた場合は待機を打ち切って処理を続行する。戻り値は条件を満たしたかどうか。
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+
+    try:
+        ready = _wait_for_document_complete(driver, deadline)
+        if ready and selector:
+            ready = _wait_for_selector(driver, selector, deadline)
+        if ready and (dom_quiet_ms or network_idle_ms):
+            ready = _wait_for_quiet(driver, deadline, dom_quiet_ms, network_idle_ms)
+    except Exception as e:
+        print(f"  -> WARNING: Readiness check failed ({e}). Proceeding anyway.")
+        return False
+
+    elapsed = time.monotonic() - started
+    if ready:
+        print(f"  -> Page ready after {elapsed:.1f}s.")
+    else:
+        condition = f"selector '{selector}'" if selector else "page to settle"
+        print(f"  -> WARNING: Timed out after {timeout}s waiting for {condition}. Proceeding anyway.")
+    return ready
+
+def wait_for_dom_quiet(driver, quiet_ms=300, timeout=2):
+    """クリックやウィンドウサイズ変更の後、DOMの変更が quiet_ms だけ止まるまで待つ（最大 timeout 秒）"""
+    deadline = time.monotonic() + timeout
+    try:
+        return _wait_for_quiet(driver, deadline, quiet_ms, None)
+    except Exception as e:
+        print(f"  -> WARNING: DOM quiet check failed ({e}). Proceeding anyway.")
+        return False
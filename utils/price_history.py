@@ -0,0 +1,144 @@
+import json
+import os
+import uuid
+from datetime import datetime
+
+from utils import price_record
+
+# 全実行の価格データを、日付・プロバイダごとに分割したParquetファイルとしても保存する（分析用）
+# 保存先は環境変数 PRICE_HISTORY_URI（ローカルパス、または gs://bucket/path）。"off" で無効化
+DEFAULT_HISTORY_URI = "gs://gcs-bucket-for-html/price_history"
+
+STRING_COLUMNS = [
+    "Provider Name",
+    "Currency",
+    "Service Provided",
+    "Region",
+    "GPU (H100 or H200 or L40S)",
+    "GPU Variant Name",
+    "GPU ID",
+    "Display Name(GPU Type)",
+    "API_TYPE",
+    "Period",
+    "Memory (GB)",
+    "Amount of Storage",
+    "Storage Option",
+    "Network Performance (Gbps)",
+    "Notes / Features",
+    "Original Currency",
+    "Exchange Rate Date",
+]
+INT_COLUMNS = ["Number of Chips"]
+FLOAT_COLUMNS = [
+    "Total Price ($)",
+    "Effective Hourly Rate ($/hr)",
+    "Commitment Discount - 1 Month Price ($/hr per GPU)",
+    "Commitment Discount - 3 Month Price ($/hr per GPU)",
+    "Commitment Discount - 6 Month Price ($/hr per GPU)",
+    "Commitment Discount - 12 Month Price ($/hr per GPU)",
+    "Exchange Rate",
+]
+KNOWN_COLUMNS = set(STRING_COLUMNS + INT_COLUMNS + FLOAT_COLUMNS)
+PARTITION_COLUMNS = ["date", "provider"]
+
+def get_history_uri():
+    uri = os.environ.get("PRICE_HISTORY_URI", DEFAULT_HISTORY_URI)
+    return None if uri.lower() in ("", "off", "false", "none") else uri
+
+def _schema():
+    import pyarrow as pa
+    fields = [pa.field(name, pa.string()) for name in STRING_COLUMNS]
+    fields += [pa.field(name, pa.int64()) for name in INT_COLUMNS]
+    fields += [pa.field(name, pa.float64()) for name in FLOAT_COLUMNS]
+    fields += [
+        pa.field("extra", pa.string()), # スキーマにないキーはJSONでまとめて保存する
+        pa.field("captured_at", pa.timestamp("s")),
+        pa.field("date", pa.string()),
+        pa.field("provider", pa.string()),
+    ]
+    return pa.schema(fields)
+
+def _to_float(value):
+    try:
+        return float(str(value).replace(",", "").replace("$", "").strip())
+    except (TypeError, ValueError):
+        return None
+
+def _to_int(value):
+    number = _to_float(value)
+    return int(number) if number is not None and number.is_integer() else None
+
+def _to_string(value):
+    return None if value is None else str(value)
+
+def _to_record(row, captured_at, date_str):
+    row = price_record.to_dict(row)
+    record = {name: _to_string(row.get(name)) for name in STRING_COLUMNS}
+    record.update({name: _to_int(row.get(name)) for name in INT_COLUMNS})
+    record.update({name: _to_float(row.get(name)) for name in FLOAT_COLUMNS})
+    extra = {key: value for key, value in row.items() if key not in KNOWN_COLUMNS}
+    record["extra"] = json.dumps(extra, ensure_ascii=False, default=str) if extra else None
+    record["captured_at"] = captured_at
+    record["date"] = date_str
+    record["provider"] = row.get("Provider Name") or "unknown"
+    return record
+
+def _filesystem_and_path(uri):
+    from pyarrow import fs
+    if "://" in uri:
+        return fs.FileSystem.from_uri(uri)
+    os.makedirs(uri, exist_ok=True)
+    return fs.LocalFileSystem(), os.path.abspath(uri)
+
+def write_rows(rows, captured_at=None):
+    """
+    今回の価格データを date=YYYY-MM-DD/provider=名前/ に分割してParquetで保存する。
+    pyarrow がインストールされていない場合や保存先が無効の場合は何もしない。
+    """
+    uri = get_history_uri()
+    if not uri or not rows:
+        return False
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow is not installed. Skipping Parquet price history.")
+        return False
+
+    captured_at = (captured_at or datetime.now()).replace(microsecond=0)
+    date_str = captured_at.strftime('%Y-%m-%d')
+    try:
+        table = pa.Table.from_pylist([_to_record(row, captured_at, date_str) for row in price_record.expand(price_record.from_rows(rows))], schema=_schema())
+        filesystem, path = _filesystem_and_path(uri)
+        pq.write_to_dataset(
+            table,
+            root_path=path,
+            partition_cols=PARTITION_COLUMNS,
+            filesystem=filesystem,
+            basename_template=f"part-{captured_at:%H%M%S}-{uuid.uuid4().hex[:8]}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        print(f"Saved {table.num_rows} rows to Parquet price history at {uri}.")
+        return True
+    except Exception as e:
+        print(f"WARNING: Could not write Parquet price history: {e}")
+        return False
+
+def read_history(start_date=None, end_date=None, provider=None, columns=None):
+    """
+    保存済みの価格履歴を pyarrow.Table で返す。
+    日付・プロバイダの条件はパーティションで絞り込むため、対象外のファイルは読まない。
+    """
+    import pyarrow.dataset as ds
+
+    filesystem, path = _filesystem_and_path(get_history_uri())
+    dataset = ds.dataset(path, filesystem=filesystem, format="parquet", partitioning="hive", schema=_schema())
+    condition = None
+    for expression in (
+        ds.field("date") >= start_date if start_date else None,
+        ds.field("date") <= end_date if end_date else None,
+        ds.field("provider") == provider if provider else None,
+    ):
+        if expression is not None:
+            condition = expression if condition is None else condition & expression
+    return dataset.to_table(columns=columns, filter=condition)
@@ -0,0 +1,196 @@
+import sys
+from dataclasses import dataclass, replace
+
+# 属性名と、ハンドラがこれまで使ってきた行の辞書のキーの対応
+FIELD_KEYS = {
+    "provider_name": "Provider Name",
+    "currency": "Currency",
+    "service_provided": "Service Provided",
+    "region": "Region",
+    "gpu_id": "GPU ID",
+    "gpu_family": "GPU (H100 or H200 or L40S)",
+    "memory_gb": "Memory (GB)",
+    "display_name": "Display Name(GPU Type)",
+    "gpu_variant": "GPU Variant Name",
+    "storage_option": "Storage Option",
+    "amount_of_storage": "Amount of Storage",
+    "network_performance": "Network Performance (Gbps)",
+    "commitment_1_month": "Commitment Discount - 1 Month Price ($/hr per GPU)",
+    "commitment_3_month": "Commitment Discount - 3 Month Price ($/hr per GPU)",
+    "commitment_6_month": "Commitment Discount - 6 Month Price ($/hr per GPU)",
+    "commitment_12_month": "Commitment Discount - 12 Month Price ($/hr per GPU)",
+    "notes": "Notes / Features",
+    "api_type": "API_TYPE",
+    "num_chips": "Number of Chips",
+    "period": "Period",
+    "total_price": "Total Price ($)",
+    "hourly_rate": "Effective Hourly Rate ($/hr)",
+    "chip_counts": "Chip Counts",
+    "original_currency": "Original Currency",
+    "exchange_rate": "Exchange Rate",
+    "exchange_rate_date": "Exchange Rate Date",
+}
+KEY_FIELDS = {key: name for name, key in FIELD_KEYS.items()}
+
+# 多くの行で同じ値になる文字列は intern して1つのオブジェクトを共有する
+_INTERNED_FIELDS = (
+    "provider_name", "currency", "service_provided", "region", "gpu_family", "gpu_variant",
+    "storage_option", "amount_of_storage", "network_performance", "api_type", "period",
+    "original_currency", "exchange_rate_date",
+)
+
+# 展開する行の GPU ID / Display Name に含めると、展開後の行のチップ数に置き換える
+NUM_CHIPS_PLACEHOLDER = "{num_chips}"
+
+SHEET_HEADER = ['Date', 'Company', 'Variation', 'Region', 'GPU_Type', 'API_TYPE', 'Size', 'Price']
+
+@dataclass(slots=True)
+class PriceRecord:
+    """価格データ1行分。ハンドラの行の辞書と相互に変換できる"""
+    provider_name: str = None
+    currency: str = None
+    service_provided: str = None
+    region: str = None
+    gpu_id: str = None
+    gpu_family: str = None
+    memory_gb: object = None
+    display_name: str = None
+    gpu_variant: str = None
+    storage_option: str = None
+    amount_of_storage: str = None
+    network_performance: str = None
+    commitment_1_month: object = None
+    commitment_3_month: object = None
+    commitment_6_month: object = None
+    commitment_12_month: object = None
+    notes: str = None
+    api_type: str = None
+    num_chips: object = None
+    period: str = None
+    total_price: object = None
+    hourly_rate: object = None
+    # チップ数ごとの行に展開する前の「1GPUあたりの価格」の行の場合、展開するチップ数 (例: (1, 2, 4, 8))
+    chip_counts: tuple = None
+    # USD以外の価格を変換した場合の元の通貨、1単位あたりのUSDのレートとその日付
+    original_currency: str = None
+    exchange_rate: float = None
+    exchange_rate_date: str = None
+    extra: dict = None # 上記以外のキー
+
+    def __post_init__(self):
+        if not self.provider_name:
+            raise ValueError("PriceRecord requires a provider name")
+        for name in _INTERNED_FIELDS:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
+
+    @classmethod
+    def from_dict(cls, row):
+        values = {}
+        extra = {}
+        for key, value in row.items():
+            name = KEY_FIELDS.get(key)
+            if name:
+                values[name] = value
+            else:
+                extra[key] = value
+        return cls(**values, extra=extra or None)
+
+    def to_dict(self):
+        """ハンドラの行の辞書と同じキーの辞書に戻す（値のない項目は含めない）"""
+        row = {}
+        for name, key in FIELD_KEYS.items():
+            value = getattr(self, name)
+            if value is not None:
+                row[key] = value
+        if self.extra:
+            row.update(self.extra)
+        return row
+
+    def get(self, key, default=None):
+        """行の辞書と同じように、元のキー名で値を取得する"""
+        name = KEY_FIELDS.get(key)
+        if name:
+            value = getattr(self, name)
+            return default if value is None else value
+        return (self.extra or {}).get(key, default)
+
+    def row_count(self):
+        """展開後の行数"""
+        return len(self.chip_counts) if self.chip_counts else 1
+
+    def expand(self):
+        """
+        1GPUあたりの価格の行を、chip_counts のチップ数ごとの行に展開する。
+        Total Price ($) は hourly_rate × チップ数。GPU ID と Display Name の NUM_CHIPS_PLACEHOLDER はチップ数に置き換える。
+        展開しない行はそのまま返す。
+        """
+        if not self.chip_counts:
+            return [self]
+        rate = self.hourly_rate
+        is_numeric = isinstance(rate, (int, float))
+        return [
+            replace(
+                self,
+                chip_counts=None,
+                num_chips=num_chips,
+                gpu_id=_fill_num_chips(self.gpu_id, num_chips),
+                display_name=_fill_num_chips(self.display_name, num_chips),
+                total_price=round(rate * num_chips, 4) if is_numeric else rate,
+                hourly_rate=round(rate, 4) if is_numeric else rate,
+            )
+            for num_chips in self.chip_counts
+        ]
+
+    def to_sheet_row(self, date_str):
+        """スプレッドシートの行 (Date, Company, Variation, Region, GPU_Type, API_TYPE, Size, Price) に変換する"""
+        is_api_data = self.api_type and self.api_type != "N/A"
+        if is_api_data:
+            # APIデータの場合は GPU_Type を空にし、Size に "Per 1M Tokens" などの単位を入れる
+            return [
+                date_str,
+                self.get("Provider Name", "N/A"),
+                self.get("GPU Variant Name", "N/A"),
+                self.get("Region", "N/A"),
+                "",
+                self.api_type,
+                self.get("Period", "N/A"),
+                self.get("Total Price ($)", "N/A"),
+            ]
+        return [
+            date_str,
+            self.get("Provider Name", "N/A"),
+            self.get("GPU Variant Name", "N/A"),
+            self.get("Region", "N/A"),
+            self.get("GPU (H100 or H200 or L40S)", "N/A"),
+            "",
+            f'{self.get("Number of Chips", "N/A")}x',
+            self.get("Total Price ($)", "N/A"),
+        ]
+
+def _fill_num_chips(value, num_chips):
+    if isinstance(value, str) and NUM_CHIPS_PLACEHOLDER in value:
+        return sys.intern(value.replace(NUM_CHIPS_PLACEHOLDER, str(num_chips)))
+    return value
+
+def to_record(row):
+    return row if isinstance(row, PriceRecord) else PriceRecord.from_dict(row)
+
+def to_dict(row):
+    return row.to_dict() if isinstance(row, PriceRecord) else row
+
+def expand(records):
+    """出力時にだけ、チップ数ごとの行に展開しながら順に返す"""
+    for record in records:
+        yield from record.expand()
+
+def from_rows(rows, source=""):
+    """ハンドラが返した行（辞書または PriceRecord）を PriceRecord のリストにそろえる。形式が不正な行は除く"""
+    records = []
+    for row in rows or []:
+        try:
+            records.append(to_record(row))
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"  -> WARNING: Dropping invalid price row{f' from {source}' if source else ''}: {e}")
+    return records
@@ -0,0 +1,216 @@
+import base64
+import io
+import threading
+from contextlib import contextmanager
+
+from PIL import Image
+
+# Chromeが1回のキャプチャで扱える高さの目安。これを超えるページは縦に分割して撮影する
+MAX_CAPTURE_HEIGHT = 16384
+
+_HIDE_ELEMENTS_JS = """
+for (const selector of arguments[0]) {
+    for (const el of document.querySelectorAll(selector)) {
+        el.dataset.harvesterDisplay = el.style.display;
+        el.style.display = 'none';
+    }
+}
+"""
+
+_RESTORE_ELEMENTS_JS = """
+for (const selector of arguments[0]) {
+    for (const el of document.querySelectorAll(selector)) {
+        if (el.dataset.harvesterDisplay !== undefined) {
+            el.style.display = el.dataset.harvesterDisplay;
+            delete el.dataset.harvesterDisplay;
+        }
+    }
+}
+"""
+
+_CONTAINER_METRICS_JS = """
+const el = document.querySelector(arguments[0]);
+if (!el) return null;
+const rect = el.getBoundingClientRect();
+return {
+    left: rect.left, top: rect.top,
+    clientWidth: el.clientWidth, clientHeight: el.clientHeight, scrollHeight: el.scrollHeight,
+    viewportWidth: window.innerWidth, viewportHeight: window.innerHeight
+};
+"""
+
+# ワーカーのスレッドごとに「撮影しない」状態を持つ（データ取得だけのパスで使う）
+_suppression = threading.local()
+
+# スクロール後、2フレーム描画されるのを待つ（固定のsleepの代わり）
+_WAIT_FOR_PAINT_JS = "const done = arguments[arguments.length - 1]; requestAnimationFrame(() => requestAnimationFrame(done));"
+
+def _capture_clip_png(driver, x, y, width, height):
+    """指定範囲をビューポート外も含めて撮影し、PNGのバイト列を返す"""
+    result = driver.execute_cdp_cmd("Page.captureScreenshot", {
+        "format": "png",
+        "captureBeyondViewport": True,
+        "clip": {"x": x, "y": y, "width": width, "height": height, "scale": 1},
+    })
+    return base64.b64decode(result["data"])
+
+def _encode_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def _capture_region_png(driver, x, y, width, height):
+    """範囲を撮影してPNGのバイト列を返す。高すぎるページは分割して撮影し、メモリ上で縦に結合する"""
+    width, height = int(width), int(height)
+    if height <= MAX_CAPTURE_HEIGHT:
+        return _capture_clip_png(driver, x, y, width, height)
+
+    stitched_image = Image.new('RGB', (width, height))
+    offset = 0
+    while offset < height:
+        tile_height = min(MAX_CAPTURE_HEIGHT, height - offset)
+        with Image.open(io.BytesIO(_capture_clip_png(driver, x, y + offset, width, tile_height))) as tile:
+            stitched_image.paste(tile, (0, offset))
+        offset += tile_height
+    return _encode_png(stitched_image)
+
+def _capture_page_png(driver):
+    metrics = driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+    content_size = metrics.get("cssContentSize") or metrics["contentSize"]
+    viewport = metrics.get("cssLayoutViewport") or metrics["layoutViewport"]
+    return _capture_region_png(driver, 0, 0, viewport["clientWidth"], content_size["height"])
+
+def _capture_container_png(driver, container_selector, clip_to_container):
+    """
+    内部スクロールするコンテナを撮影する。
+    ビューポートをコンテナの全長が収まる高さにエミュレートしてから1回で撮影し、最後に元に戻す。
+    """
+    container = driver.execute_script(_CONTAINER_METRICS_JS, container_selector)
+    if not container:
+        print(f"  -> Scroll container '{container_selector}' not found. Capturing the whole page instead.")
+        return _capture_page_png(driver)
+
+    hidden_height = max(0, container["scrollHeight"] - container["clientHeight"])
+    expanded_height = int(container["viewportHeight"] + hidden_height)
+    driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+        "width": int(container["viewportWidth"]),
+        "height": expanded_height,
+        "deviceScaleFactor": 1,
+        "mobile": False,
+    })
+    try:
+        driver.execute_async_script(_WAIT_FOR_PAINT_JS)
+        if clip_to_container:
+            expanded = driver.execute_script(_CONTAINER_METRICS_JS, container_selector)
+            return _capture_region_png(driver, expanded["left"], expanded["top"], expanded["clientWidth"], expanded["scrollHeight"])
+        return _capture_region_png(driver, 0, 0, container["viewportWidth"], expanded_height)
+    finally:
+        driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+
+def _stitch_scrolling_png(driver, container_selector=None, clip_to_container=False):
+    """
+    【フォールバック】ページ（またはコンテナ）をスクロールしながら撮影し、メモリ上で1枚の画像に結合する。
+    各スライスは get_screenshot_as_png() のバイト列から直接読み込み、一時ファイルは使わない。
+    """
+    print("  -> Falling back to scroll-and-stitch screenshot...")
+    scroll_target = "document.querySelector(arguments[0])" if container_selector else "null"
+    total_height = driver.execute_script(f"const el = {scroll_target}; return el ? el.scrollHeight : document.body.parentNode.scrollHeight", container_selector)
+    viewport_width = driver.execute_script("return window.innerWidth")
+    viewport_height = driver.execute_script("return window.innerHeight")
+
+    crop_box = None
+    if container_selector and clip_to_container:
+        rect = driver.execute_script(_CONTAINER_METRICS_JS, container_selector)
+        if rect:
+            crop_box = (int(rect["left"]), int(rect["top"]), int(rect["left"] + rect["clientWidth"]), int(rect["top"] + rect["clientHeight"]))
+    image_width = crop_box[2] - crop_box[0] if crop_box else viewport_width
+    step = crop_box[3] - crop_box[1] if crop_box else viewport_height
+
+    stitched_image = Image.new('RGB', (image_width, total_height))
+    scroll_position = 0
+    while scroll_position < total_height:
+        driver.execute_script(f"const el = {scroll_target}; if (el) el.scrollTo(0, arguments[1]); else window.scrollTo(0, arguments[1]);", container_selector, scroll_position)
+        driver.execute_async_script(_WAIT_FOR_PAINT_JS)
+
+        with Image.open(io.BytesIO(driver.get_screenshot_as_png())) as screenshot_part:
+            part = screenshot_part.crop(crop_box) if crop_box else screenshot_part
+            paste_height = min(step, total_height - scroll_position)
+            stitched_image.paste(part.crop((0, 0, image_width, paste_height)), (0, scroll_position))
+        scroll_position += step
+
+    return _encode_png(stitched_image)
+
+def _capture(driver, container_selector, clip_to_container, hide_selectors):
+    hide_selectors = hide_selectors or []
+    try:
+        if hide_selectors:
+            driver.execute_script(_HIDE_ELEMENTS_JS, hide_selectors)
+
+        try:
+            if container_selector:
+                return _capture_container_png(driver, container_selector, clip_to_container), True
+            return _capture_page_png(driver), True
+        except Exception as e:
+            print(f"  -> CDP screenshot failed: {e}")
+
+        try:
+            png_bytes = _stitch_scrolling_png(driver, container_selector, clip_to_container)
+            print("  -> Scrolling screenshot stitched.")
+            return png_bytes, True
+        except Exception as e:
+            print(f"  -> Failed to take scrolling screenshot: {e}")
+            # 失敗した場合は、見える範囲だけでも撮影しておく
+            return driver.get_screenshot_as_png(), False
+    finally:
+        if hide_selectors:
+            try:
+                driver.execute_script(_RESTORE_ELEMENTS_JS, hide_selectors)
+            except Exception:
+                pass
+
+def capture_full_page_png(driver, container_selector=None, clip_to_container=False, hide_selectors=None):
+    """
+    ページ全体を Chrome DevTools の Page.captureScreenshot (captureBeyondViewport) で1回で撮影し、
+    PNGのバイト列を返す（ディスクには書き込まない）。
+    container_selector を指定すると、その要素の内部スクロール領域を全長で撮影する
+    （clip_to_container=True ならコンテナ部分だけを切り出す）。
+    hide_selectors の要素は撮影中だけ非表示にする（固定ヘッダーの写り込み対策）。
+    CDPでの撮影に失敗した場合はスクロール＆結合方式、それも失敗した場合は見えている範囲だけを返す。
+    """
+    png_bytes, _ = _capture(driver, container_selector, clip_to_container, hide_selectors)
+    return png_bytes
+
+@contextmanager
+def capture_suppressed():
+    """
+    このブロック内では、このスレッドの capture_full_page() / capture_viewport() は何も保存しない。
+    ハンドラを変更せずに、データ取得だけのパスとして実行するために使う。
+    """
+    previous = getattr(_suppression, "active", False)
+    _suppression.active = True
+    try:
+        yield
+    finally:
+        _suppression.active = previous
+
+def is_capture_suppressed():
+    return getattr(_suppression, "active", False)
+
+def capture_viewport(driver, filepath):
+    """見えている範囲だけを filepath に保存する（driver.save_screenshot の代わり）"""
+    if is_capture_suppressed():
+        return False
+    return driver.save_screenshot(filepath)
+
+def capture_full_page(driver, filepath, container_selector=None, clip_to_container=False, hide_selectors=None):
+    """
+    capture_full_page_png() で撮影した画像を filepath に保存する。
+    戻り値は全体を撮影できたかどうか（見えている範囲だけになった場合は False）。
+    capture_suppressed() の中では撮影せずに False を返す。
+    """
+    if is_capture_suppressed():
+        return False
+    png_bytes, complete = _capture(driver, container_selector, clip_to_container, hide_selectors)
+    with open(filepath, "wb") as f:
+        f.write(png_bytes)
+    return complete
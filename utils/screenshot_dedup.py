@@ -0,0 +1,173 @@
+import io
+import json
+import math
+import os
+import re
+import threading
+from datetime import datetime
+
+import numpy as np
+from PIL import Image
+
+# 前回アップロードしたスクリーンショットの知覚ハッシュ（dHash）をURL/ページごとに保存しておく
+INDEX_BUCKET = "gcs-bucket-for-html"
+INDEX_BLOB_PATH = "screenshot_hashes/index.json"
+
+HASH_SIZE = 8 # 1ブロック = 8x8 = 64ビット
+MAX_BLOCKS = 64 # 縦長のページは縦方向に複数ブロックに分けてハッシュを取る
+DEFAULT_MAX_DISTANCE_PER_BLOCK = 3 # 64ビットあたり、この数までのビットの違いは「変化なし」とみなす
+
+# ファイル名から撮影日時の部分を除いて、同じURL/ページのスクリーンショットを同じキーにまとめる
+#   runpod.io_pricing_2025-08-08_10-00-00.webp -> runpod.io_pricing
+#   runpod_homepage_diff_20250808-100000.png   -> runpod_homepage
+_TIMESTAMP_SUFFIX = re.compile(r"(_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}|_base|_diff_\d{8}-\d{6})(\.min)?\.\w+$")
+
+_index = None
+_index_dirty = False
+_pending = {} # アップロード待ちのスクリーンショットのファイル名 -> (インデックスのキー, ハッシュ)
+_lock = threading.Lock()
+
+def is_enabled():
+    return os.environ.get("SCREENSHOT_DEDUP", "true").lower() not in ("0", "false", "no")
+
+def get_max_distance_per_block():
+    env_value = os.getenv("SCREENSHOT_DEDUP_MAX_DISTANCE")
+    try:
+        return int(env_value) if env_value else DEFAULT_MAX_DISTANCE_PER_BLOCK
+    except ValueError:
+        print(f"WARNING: Invalid SCREENSHOT_DEDUP_MAX_DISTANCE value '{env_value}'. Falling back to default.")
+        return DEFAULT_MAX_DISTANCE_PER_BLOCK
+
+def screenshot_key(filename):
+    return _TIMESTAMP_SUFFIX.sub("", os.path.basename(filename))
+
+def dhash(image):
+    """
+    縮小したグレースケール画像の隣り合う画素の大小からハッシュを作る（dHash）。
+    縦長の画像は縦横比に応じて縦に複数ブロック分のハッシュを取る。戻り値は (ビット列, ブロック数)。
+    """
+    width, height = image.size
+    blocks = max(1, min(MAX_BLOCKS, math.ceil(height / max(1, width))))
+    small = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE * blocks), Image.BOX)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return np.packbits(bits.flatten()), blocks
+
+def hamming_distance(hash_a, hash_b):
+    return int(np.unpackbits(np.bitwise_xor(hash_a, hash_b)).sum())
+
+def block_distances(hash_a, hash_b, blocks):
+    """ブロック（64ビット = 8バイト）ごとのハミング距離のリスト"""
+    xor = np.bitwise_xor(hash_a, hash_b).reshape(blocks, HASH_SIZE * HASH_SIZE // 8)
+    return np.unpackbits(xor, axis=1).sum(axis=1).tolist()
+
+def _open_image(entry):
+    if isinstance(entry, tuple):
+        return Image.open(io.BytesIO(entry[1]))
+    return Image.open(entry)
+
+def _entry_name(entry):
+    return entry[0] if isinstance(entry, tuple) else os.path.basename(entry)
+
+def _index_blob():
+    from google.cloud import storage
+    return storage.Client().bucket(INDEX_BUCKET).blob(INDEX_BLOB_PATH)
+
+def _load_index():
+    global _index
+    if _index is not None:
+        return
+    _index = {}
+    try:
+        blob = _index_blob()
+        if blob.exists():
+            _index = json.loads(blob.download_as_text())
+    except Exception as e:
+        print(f"WARNING: Could not load screenshot hash index: {e}. Uploading all screenshots.")
+
+def save_index():
+    """record_uploaded() で記録したハッシュをGCSに保存する（アップロードの後に呼ぶ）"""
+    global _index_dirty
+    with _lock:
+        if not _index_dirty:
+            return
+        payload = json.dumps(_index, indent=1, sort_keys=True)
+        _index_dirty = False
+    try:
+        _index_blob().upload_from_string(payload, content_type="application/json")
+    except Exception as e:
+        print(f"WARNING: Could not save screenshot hash index: {e}")
+
+def is_unchanged(entry):
+    """
+    前回アップロードしたスクリーンショットと見た目がほぼ同じ（どのブロックもハミング距離がしきい値以内）なら True を返す。
+    変化していた場合は、このスクリーンショットのハッシュを保留しておき、アップロードが成功したら record_uploaded() でインデックスに記録する。
+    """
+    name = _entry_name(entry)
+    key = screenshot_key(name)
+    with _open_image(entry) as image:
+        current_hash, blocks = dhash(image)
+
+    with _lock:
+        _load_index()
+        previous = _index.get(key)
+        if previous and previous.get("blocks") == blocks:
+            # 1つのブロック（例: 価格表の部分）だけが大きく変わった場合も検知できるよう、ブロックごとに比べる
+            distances = block_distances(current_hash, np.frombuffer(bytes.fromhex(previous["hash"]), dtype=np.uint8), blocks)
+            if max(distances) <= get_max_distance_per_block():
+                print(f"  -> {name} looks unchanged since {previous.get('updated_at', 'last upload')} (max block distance {max(distances)}). Skipping upload.")
+                return True
+
+        # 前回と比べるのは「最後にアップロードした画像」なので、アップロードが成功するまでは記録しない
+        _stage(name, key, current_hash, blocks)
+    return False
+
+def _stage(name, key, current_hash, blocks):
+    _pending[name] = (key, {"hash": current_hash.tobytes().hex(), "blocks": blocks, "updated_at": datetime.now().isoformat(timespec="seconds")})
+
+def remember(entries):
+    """
+    重複を除かずに必ずアップロードするスクリーンショットも、次回の比較のためにハッシュを保留しておく
+    （アップロードが成功したら record_uploaded() で記録される）。
+    """
+    if not is_enabled():
+        return
+    for entry in entries:
+        name = _entry_name(entry)
+        try:
+            with _open_image(entry) as image:
+                current_hash, blocks = dhash(image)
+        except Exception as e:
+            print(f"  -> WARNING: Could not hash {name}: {e}")
+            continue
+        with _lock:
+            _load_index()
+            _stage(name, screenshot_key(name), current_hash, blocks)
+
+def record_uploaded(entry):
+    """アップロードが成功したスクリーンショットのハッシュをインデックスに記録する（drive_upload の on_uploaded から呼ぶ）"""
+    global _index_dirty
+    with _lock:
+        pending = _pending.pop(_entry_name(entry), None)
+        if pending is None:
+            return
+        key, value = pending
+        _index[key] = value
+        _index_dirty = True
+
+def filter_unchanged(entries):
+    """アップロード対象から、前回と見た目が変わっていないスクリーンショットを除く"""
+    if not is_enabled() or not entries:
+        return entries
+    changed = []
+    for entry in entries:
+        try:
+            if not is_unchanged(entry):
+                changed.append(entry)
+        except Exception as e:
+            print(f"  -> WARNING: Could not hash {_entry_name(entry)}: {e}. Uploading it anyway.")
+            changed.append(entry)
+    skipped = len(entries) - len(changed)
+    if skipped:
+        print(f"Skipped {skipped} unchanged screenshot(s) by perceptual hash.")
+    return changed
@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Secret Managerの値をプロセス内でキャッシュする（Cloud Runのインスタンスが再利用される間はAPIを呼ばない）
+KNOWN_SECRETS = ("SLACK_WEBHOOK_URL", "SHEET_URL")
+DEFAULT_TTL_SECONDS = 3600
+
+_client = None
+_cache = {} # (project_id, secret_id, version_id) -> (値, 期限)
+_inflight = {} # 取得中の (project_id, secret_id, version_id) -> Future
+_executor = None
+_lock = threading.RLock()
+
+def get_ttl():
+    env_value = os.getenv("SECRET_CACHE_TTL_SECONDS")
+    try:
+        return float(env_value) if env_value else DEFAULT_TTL_SECONDS
+    except ValueError:
+        print(f"WARNING: Invalid SECRET_CACHE_TTL_SECONDS value '{env_value}'. Falling back to default.")
+        return DEFAULT_TTL_SECONDS
+
+def _get_client():
+    global _client
+    with _lock:
+        if _client is None:
+            from google.cloud import secretmanager
+            _client = secretmanager.SecretManagerServiceClient()
+        return _client
+
+def _get_cached(key):
+    entry = _cache.get(key)
+    if entry and entry[1] > time.monotonic():
+        return entry[0]
+    return None
+
+def _access(key):
+    project_id, secret_id, version_id = key
+    name = f"projects/{project_id}/secrets/{secret_id}/versions/{version_id}"
+    response = _get_client().access_secret_version(request={"name": name})
+    value = response.payload.data.decode("UTF-8")
+    with _lock:
+        _cache[key] = (value, time.monotonic() + get_ttl())
+    return value
+
+def _start_fetch(key):
+    """取得中でなければ取得を開始する。_lock を持った状態で呼ぶ"""
+    global _executor
+    future = _inflight.get(key)
+    if future is None:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=len(KNOWN_SECRETS), thread_name_prefix="secret-fetch")
+        future = _executor.submit(_access, key)
+        _inflight[key] = future
+        future.add_done_callback(lambda _, key=key: _forget_inflight(key))
+    return future
+
+def _forget_inflight(key):
+    with _lock:
+        _inflight.pop(key, None)
+
+def prefetch(project_id, secret_ids=KNOWN_SECRETS, version_id="latest"):
+    """起動時に、キャッシュにないシークレットの取得を並行して開始しておく（待たない）"""
+    with _lock:
+        for secret_id in secret_ids:
+            key = (project_id, secret_id, version_id)
+            if _get_cached(key) is None:
+                _start_fetch(key)
+
+def get_secret(project_id, secret_id, version_id="latest"):
+    """Secret Managerからシークレットの値を取得する（TTLの間はキャッシュを返す）"""
+    key = (project_id, secret_id, version_id)
+    with _lock:
+        value = _get_cached(key)
+        if value is not None:
+            return value
+        future = _start_fetch(key)
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"  -> ERROR: Failed to access secret: {secret_id}. Reason: {e}")
+        # ローカル実行時など、フォールバックとして環境変数を試す
+        fallback = os.getenv(secret_id.upper())
+        if fallback:
+            print(f"  -> INFO: Using fallback environment variable for {secret_id.upper()}")
+            return fallback
+        raise e
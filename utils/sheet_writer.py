@@ -0,0 +1,60 @@
+import random
+import threading
+import time
+
+import gspread
+
+APPEND_CHUNK_ROWS = 500 # 1回の append_rows で送る最大行数
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 2.0
+RETRYABLE_STATUS = (429, 500, 502, 503)
+# 追記は5xxの場合に書き込み済みの可能性があるため、重複を避けて429だけ再試行する
+RETRYABLE_WRITE_STATUS = (429,)
+
+# ヘッダーを確認済みのワークシート（Cloud Runのインスタンスが再利用される間は確認し直さない）
+_header_checked = set()
+_lock = threading.Lock()
+
+def _status_code(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+def with_backoff(operation, description, retry_status=RETRYABLE_STATUS):
+    """Sheets APIの呼び出しを、429（クォータ超過）や5xxの場合に指数バックオフで再試行する"""
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return operation()
+        except gspread.exceptions.APIError as e:
+            if attempt >= MAX_ATTEMPTS or _status_code(e) not in retry_status:
+                raise
+            delay = BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)) + random.uniform(0, 1)
+            print(f"  -> {description} failed with HTTP {_status_code(e)}. Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+def ensure_header(worksheet, header):
+    """
+    1行目が空の場合だけヘッダーを書き込む。
+    シート全体を取得する get_all_values() の代わりに1行目だけを読み、結果はプロセス内で覚えておく。
+    """
+    key = (worksheet.spreadsheet.id, worksheet.id)
+    with _lock:
+        if key in _header_checked:
+            return
+    first_row = with_backoff(lambda: worksheet.row_values(1), "Header check")
+    if not first_row:
+        print("Worksheet is empty. Writing header.")
+        with_backoff(lambda: worksheet.append_row(header), "Header write", RETRYABLE_WRITE_STATUS)
+    with _lock:
+        _header_checked.add(key)
+
+def append_rows_chunked(worksheet, rows, chunk_size=APPEND_CHUNK_ROWS, value_input_option='USER_ENTERED'):
+    """行を chunk_size 行ずつ append_rows で追記する"""
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        with_backoff(
+            lambda: worksheet.append_rows(chunk, value_input_option=value_input_option),
+            f"Appending rows {start + 1}-{start + len(chunk)}",
+            RETRYABLE_WRITE_STATUS,
+        )
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# ブログ記事のタイトルと概要から、Geminiで内容の要約を生成する
+# 要約はタイトルと概要のハッシュをキーにキャッシュし、同じ記事でAPIを呼び直さない
+VERTEX_MODEL_NAME = "gemini-2.5-flash"
+STUDIO_MODEL_NAME = "gemini-1.5-flash-latest"
+PROMPT_VERSION = "v1" # プロンプトを変えたときは上げて、古い要約を使わないようにする
+
+# GCP環境ではGCS、ローカルではファイルにキャッシュを保存する
+CACHE_BUCKET = "gcs-bucket-for-html"
+CACHE_BLOB_PATH = "gemini_summaries/cache.json"
+DEFAULT_LOCAL_CACHE_PATH = os.path.join(os.getcwd(), "tmp_local_test", "gemini_summary_cache.json")
+MAX_CACHE_ENTRIES = 2000
+
+_models = {}
+_cache = None
+_cache_env = None
+_cache_dirty = False
+_lock = threading.RLock()
+
+def build_prompt(title, description):
+    return (
+        "あなたはIT分野の専門家です。以下のブログ記事のタイトルと概要から、"
+        "どのような内容の記事か、技術者向けに簡潔な日本語で3行の要約を生成してください。\n\n"
+        f"【タイトル】\n{title}\n\n"
+        f"【概要】\n{description}"
+    )
+
+def cache_key(title, description):
+    return hashlib.sha256(f"{PROMPT_VERSION}\0{title}\0{description or ''}".encode("utf-8")).hexdigest()
+
+def get_model(env, project_id=None, location=None, credentials=None):
+    """
+    プロセス内で共有するモデルのクライアント。環境ごとに最初の1回だけ初期化する。
+    ローカルでAPIキーがない場合は None を返す。
+    """
+    key = (env, project_id, location)
+    with _lock:
+        if key in _models:
+            return _models[key]
+        if env == 'gcp':
+            from google.cloud import aiplatform
+            from vertexai.generative_models import GenerativeModel
+            print("  -> Initializing Vertex AI model client (production mode)")
+            aiplatform.init(project=project_id, location=location, credentials=credentials)
+            model = GenerativeModel(VERTEX_MODEL_NAME)
+        else:
+            # ローカル実行時は環境変数からAPIキーを読み込む
+            api_key = os.getenv('GEMINI_API_KEY')
+            if not api_key:
+                return None
+            import google.generativeai as genai
+            print("  -> Initializing Google AI Studio model client (local mode)")
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel(STUDIO_MODEL_NAME)
+        _models[key] = model
+        return model
+
+def _local_cache_path():
+    return os.environ.get("SUMMARY_CACHE_PATH", DEFAULT_LOCAL_CACHE_PATH)
+
+def _cache_blob():
+    from google.cloud import storage
+    return storage.Client().bucket(CACHE_BUCKET).blob(CACHE_BLOB_PATH)
+
+def _load_cache(env):
+    global _cache, _cache_env
+    if _cache is not None:
+        return
+    _cache = {}
+    _cache_env = env
+    try:
+        if env == 'gcp':
+            blob = _cache_blob()
+            if blob.exists():
+                _cache = json.loads(blob.download_as_text())
+        elif os.path.exists(_local_cache_path()):
+            with open(_local_cache_path(), encoding="utf-8") as f:
+                _cache = json.load(f)
+    except Exception as e:
+        print(f"WARNING: Could not load Gemini summary cache: {e}")
+
+def save_cache():
+    """この実行で新しく生成した要約を保存する"""
+    global _cache_dirty
+    with _lock:
+        if not _cache_dirty:
+            return
+        # 古いものから捨てる（dict は挿入順）
+        entries = list(_cache.items())[-MAX_CACHE_ENTRIES:]
+        payload = json.dumps(dict(entries), ensure_ascii=False, indent=1)
+        env = _cache_env
+        _cache_dirty = False
+    try:
+        if env == 'gcp':
+            _cache_blob().upload_from_string(payload, content_type="application/json")
+        else:
+            path = _local_cache_path()
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(payload)
+    except Exception as e:
+        print(f"WARNING: Could not save Gemini summary cache: {e}")
+
+def get_cached(title, description, env):
+    with _lock:
+        _load_cache(env)
+        return _cache.get(cache_key(title, description))
+
+def store(title, description, summary):
+    global _cache_dirty
+    with _lock:
+        _cache[cache_key(title, description)] = summary
+        _cache_dirty = True
+
+def summarize_with_gemini(title: str, description: str, project_id: str, location: str, env: str, credentials=None) -> str:
+    """Gemini APIを使って、ブログタイトルから内容の要約を生成する（同じタイトルと概要ならキャッシュを返す）"""
+    cached = get_cached(title, description, env)
+    if cached:
+        print(f"  -> Using cached Gemini summary for: '{title}'")
+        return cached
+
+    print(f"  -> Summarizing title with Gemini: '{title}'")
+    try:
+        model = get_model(env, project_id, location, credentials)
+        if model is None:
+            return "Error: GEMINI_API_KEY environment variable not set for local execution."
+        response = model.generate_content(build_prompt(title, description))
+        summary = response.text.strip()
+    except Exception as e:
+        print(f"  -> Gemini API call failed: {e}")
+        return f"Error summarizing title: {e}"
+
+    # 失敗した場合の結果はキャッシュしない（次回もう一度試す）
+    store(title, description, summary)
+    return summary
+
+# --- バックグラウンドでの要約 ---
+# 変更を検知したらすぐに要約を投入し、ブラウザは次のページの確認に進む。Slackのメッセージを組み立てるときに結果を待つ
+DEFAULT_WORKERS = 4
+DEFAULT_TIMEOUT_SECONDS = 60
+# 複数の記事をまとめて1回のリクエストで要約する（1 でまとめない）
+DEFAULT_BATCH_SIZE = 5
+
+_executor = None
+_pending = {} # (env, project_id, location) -> [(title, description, credentials, Future)]
+
+def _int_env(name, default):
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_int_env("SUMMARY_WORKERS", DEFAULT_WORKERS), thread_name_prefix="gemini-summary")
+        return _executor
+
+def build_batch_prompt(posts):
+    """posts は (id, タイトル, 概要) のリスト。記事ごとの要約をIDをキーにしたJSONで返すように指示する"""
+    items = [{"id": post_id, "title": title, "description": description} for post_id, title, description in posts]
+    return (
+        "あなたはIT分野の専門家です。以下のJSON配列の各ブログ記事について、タイトルと概要から"
+        "どのような内容の記事か、技術者向けに簡潔な日本語で3行の要約を生成してください。\n"
+        "回答は、各記事の id をキー、要約の文字列を値とするJSONオブジェクトだけを返してください。\n\n"
+        f"{json.dumps(items, ensure_ascii=False, indent=1)}"
+    )
+
+def parse_batch_response(text):
+    """バッチの回答（JSONオブジェクト。```json で囲まれていてもよい）を {id: 要約} にする。解釈できなければ ValueError"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.index("\n") + 1:] if "\n" in text else text
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("batch response is not a JSON object")
+    return {str(key): str(value).strip() for key, value in data.items() if isinstance(value, str) and value.strip()}
+
+def _run_single(key, item):
+    env, project_id, location = key
+    title, description, credentials, future = item
+    try:
+        future.set_result(summarize_with_gemini(title, description, project_id, location, env, credentials))
+    except Exception as e:
+        future.set_exception(e)
+
+def _run_batch(key, items):
+    """まとめて要約し、記事ごとの Future に結果を入れる。回答を解釈できなかった記事は1件ずつ要約し直す"""
+    env, project_id, location = key
+    print(f"  -> Summarizing {len(items)} titles with Gemini in one request...")
+    summaries = {}
+    try:
+        model = get_model(env, project_id, location, items[0][2])
+        if model is not None:
+            prompt = build_batch_prompt([(str(i), title, description) for i, (title, description, _, _) in enumerate(items, 1)])
+            response = model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
+            summaries = parse_batch_response(response.text)
+    except Exception as e:
+        print(f"  -> Batched Gemini request could not be used ({e}). Falling back to one request per title.")
+
+    for i, item in enumerate(items, 1):
+        title, description, _, future = item
+        summary = summaries.get(str(i))
+        if summary:
+            store(title, description, summary)
+            future.set_result(summary)
+        else:
+            _run_single(key, item)
+
+def _dispatch(key):
+    with _lock:
+        items = _pending.pop(key, [])
+    if len(items) == 1:
+        _get_executor().submit(_run_single, key, items[0])
+    elif items:
+        _get_executor().submit(_run_batch, key, items)
+
+def flush():
+    """まだ送っていない要約のリクエストをすべて送る"""
+    with _lock:
+        keys = list(_pending)
+    for key in keys:
+        _dispatch(key)
+
+def submit(title, description, project_id, location, env, credentials=None):
+    """
+    要約をバックグラウンドで開始して Future を返す。キャッシュにあれば完了済みの Future を返す。
+    SUMMARY_BATCH_SIZE 件たまるか flush() が呼ばれたら、まとめて1回のリクエストで要約する。
+    """
+    future = Future()
+    cached = get_cached(title, description, env)
+    if cached:
+        print(f"  -> Using cached Gemini summary for: '{title}'")
+        future.set_result(cached)
+        return future
+    key = (env, project_id, location)
+    with _lock:
+        _pending.setdefault(key, []).append((title, description, credentials, future))
+        is_full = len(_pending[key]) >= _int_env("SUMMARY_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    if is_full:
+        _dispatch(key)
+    return future
+
+def wait_for_summary(future, timeout=None):
+    """submit() の結果を待つ。時間内に終わらなければエラーメッセージを返す（Slackの通知は止めない）"""
+    flush()
+    if timeout is None:
+        try:
+            timeout = float(os.getenv("SUMMARY_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS))
+        except ValueError:
+            timeout = DEFAULT_TIMEOUT_SECONDS
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        print(f"  -> Gemini summary did not finish within {timeout:.0f}s.")
+        return f"Error summarizing title: timed out after {timeout:.0f}s"
+    except Exception as e:
+        return f"Error summarizing title: {e}"